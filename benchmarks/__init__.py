@@ -0,0 +1,15 @@
+"""无界面的基准测试：数据集加载、概念模型构建、概念集合加载、继承图与 echarts 配置生成
+
+    python -m benchmarks --output outputs/benchmarks/latest.json --baseline outputs/benchmarks/previous.json
+"""
+from .harness import BenchmarkResult, BenchmarkReport, measure, compare_reports
+from .cases import BenchmarkContext, CASE_GROUPS
+
+__all__ = [
+    "BenchmarkResult",
+    "BenchmarkReport",
+    "measure",
+    "compare_reports",
+    "BenchmarkContext",
+    "CASE_GROUPS",
+]
@@ -0,0 +1,65 @@
+import sys
+import json
+import argparse
+import logging
+
+from ifc_schema_viewer.core import install_parse_lock
+from ifc_schema_viewer.core.loader import DEFAULT_SCHEMA_PATH, DEFAULT_ONTOLOGY_PATHS
+from .harness import BenchmarkReport, compare_reports
+from .cases import BenchmarkContext, CASE_GROUPS
+from .synthetic import get_synthetic_schema_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the IFC schema viewer")
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA_PATH, help="Path to the IFC schema TriG file")
+    parser.add_argument("--scale", type=float, default=None, help="Run on a synthetic dataset of this scale instead of --schema")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic dataset")
+    parser.add_argument("--ontology", action="append", default=None, help="Extra ontology file (RDF/XML), repeatable")
+    parser.add_argument("--group", action="append", choices=list(CASE_GROUPS), default=None, help="Case group to run, repeatable; all by default")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured repetitions per case")
+    parser.add_argument("--output", default="./outputs/benchmarks/latest.json", help="Path of the JSON report")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    # timer_wrapper 的调试日志不输出
+    logging.basicConfig(level=logging.ERROR)
+    # 用例在 bare 模式下渲染页面，streamlit 每次调用命令都会警告 "missing ScriptRunContext"；
+    # streamlit 解析配置后会按 logger.level 重设其日志级别，设置级别无效，只能禁用该 logger
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+    # 预热用例在多个线程中同时执行查询，与应用一样串行化解析
+    install_parse_lock()
+    # 合成数据集按规模与种子缓存在 outputs/synthetic 下
+    schema_path = get_synthetic_schema_path(args.scale, args.seed) if args.scale is not None else args.schema
+    context = BenchmarkContext(
+        schema_path=schema_path,
+        ontology_paths=args.ontology if args.ontology is not None else list(DEFAULT_ONTOLOGY_PATHS),
+        repeat=args.repeat,
+    )
+    context.prepare_session()
+
+    report = BenchmarkReport(metadata={
+        "schema_path": schema_path,
+        "scale": args.scale,
+        "seed": args.seed if args.scale is not None else None,
+        "dataset_version": context.loaded_schema.dataset_version,
+        "triples": len(context.loaded_schema.dataset),
+        "repeat": args.repeat,
+    })
+    for group in args.group or list(CASE_GROUPS):
+        for result in CASE_GROUPS[group](context):
+            report.add(result)
+    report.save(args.output)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report.to_json(), baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']}: {regression['baseline_ms']} ms -> {regression['current_ms']} ms (x{regression['ratio']})")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
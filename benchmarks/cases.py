@@ -0,0 +1,140 @@
+import json
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import rdflib
+from rdflib import RDFS
+
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Iterator, Callable
+
+from ifc_schema_viewer.core import LoadedSchema, load_ifc_schema, CollectionMembers, InheritanceGraph, SchemaQueryService, CacheWarmer
+from ifc_schema_viewer.utils import EchartsUtility
+from .harness import BenchmarkResult, measure
+
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+# 具有代表性的概念：深继承树的根、常用实体、属性集模板与派生类型
+REPRESENTATIVE_CONCEPTS = ["IfcRoot", "IfcWall", "Pset_WallCommon", "IfcLabel"]
+
+class BenchmarkContext(BaseModel):
+    """各用例共享的数据集与会话状态，数据集只加载一次"""
+    schema_path: str = Field(description="Path to the IFC schema TriG file")
+    ontology_paths: List[str] = Field(default_factory=list, description="Extra ontology files (RDF/XML)")
+    repeat: int = Field(default=5, description="Measured repetitions per case")
+    loaded_schema: Any = Field(default=None, description="LoadedSchema stored in the session state")
+
+    def prepare_session(self):
+        # 与 parse_ifc_schema_dataset 相同地初始化会话状态，Streamlit 以 bare 模式运行
+        from ifc_schema_viewer.apps.viewer import IfcSchemaViewerApp
+        self.loaded_schema = load_ifc_schema(self.schema_path, self.ontology_paths)
+        IfcSchemaViewerApp.store_loaded_schema(self.loaded_schema)
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.loaded_schema.dataset.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+def _load_in_child(schema_path: str, ontology_paths: List[str]) -> Dict[str, Any]:
+    loaded_schema = load_ifc_schema(schema_path, ontology_paths)
+    return {
+        "seconds": loaded_schema.load_seconds,
+        "rss_delta_bytes": loaded_schema.memory_bytes,
+        # Linux 上 ru_maxrss 以 KB 计
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "triples": len(loaded_schema.dataset),
+    }
+
+def load_cases(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """TriG 解析及类/属性/子图统计，每次在新的子进程中加载，常驻内存的增量不受前一次加载影响"""
+    samples, runs = [], []
+    for _ in range(context.repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            run = executor.submit(_load_in_child, context.schema_path, context.ontology_paths).result()
+        samples.append(run["seconds"] * 1000)
+        runs.append(run)
+    yield BenchmarkResult(
+        name="load.load_ifc_schema", group="load", samples_ms=samples,
+        rss_delta_bytes=max(run["rss_delta_bytes"] for run in runs),
+        extra={"triples": runs[-1]["triples"], "peak_rss_bytes": max(run["peak_rss_bytes"] for run in runs)},
+    )
+
+def concept_info_cases(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """各 ConceptInfo 子类的构建：cold 时清空共享的概念缓存（索引保持已构建），warm 时直接命中缓存"""
+    from ifc_schema_viewer.apps.caches import get_query_service
+    from ifc_schema_viewer.apps.subpages.ifc_schema.individuals import concept_info_map
+    service = get_query_service()
+    for name in REPRESENTATIVE_CONCEPTS:
+        iri = service.find_by_name(name)
+        if iri is None:
+            yield BenchmarkResult(name=f"concept_info.{name}", group="concept_info", skipped="concept not in dataset")
+            continue
+        concept_info_class = concept_info_map[service.get_express_type(iri)]
+        construct = lambda: concept_info_class(iri=iri, rdf_graph=context.ifc_schema_graph)
+        prefix = f"concept_info.{concept_info_class.__name__}.{name}"
+        yield measure(f"{prefix}.cold", "concept_info", construct, repeat=context.repeat, setup=service.evict_concepts)
+        yield measure(f"{prefix}.warm", "concept_info", construct, repeat=context.repeat)
+
+def collection_cases(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """共享成员表的构建，以及五个概念集合在成员表已构建时的加载"""
+    from ifc_schema_viewer.apps.subpages.ifc_schema import (
+        PSetCollectionInfo,
+        EntityCollectionInfo,
+        DerivedTypeCollectionInfo,
+        EnumerationCollectionInfo,
+        SelectTypeCOllectionInfo
+    )
+    def build_members():
+        members = CollectionMembers(rdf_graph=context.loaded_schema.dataset)
+        return {"members": sum(len(bucket) for bucket in members.buckets.values())}
+    yield measure("collection.members_index", "collection", build_members, repeat=context.repeat)
+    for collection_class in [PSetCollectionInfo, EntityCollectionInfo, DerivedTypeCollectionInfo,
+                             EnumerationCollectionInfo, SelectTypeCOllectionInfo]:
+        def load_collection():
+            return {"members": len(collection_class(rdf_graph=context.ifc_schema_graph).members)}
+        yield measure(f"collection.{collection_class.__name__}", "collection", load_collection, repeat=context.repeat)
+
+def _hierarchy_inputs(context: BenchmarkContext) -> Dict[str, Any]:
+    # 与 SchemaQueryService.class_hierarchy / property_hierarchy 使用相同的谓词与节点范围
+    properties = context.loaded_schema.properties
+    return {
+        "classes": (RDFS.subClassOf, context.loaded_schema.classes),
+        "properties": (RDFS.subPropertyOf, [prop for props in properties.values() for prop in props]),
+    }
+
+def hierarchy_cases(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """类与属性继承图的节点、边构建（InheritanceGraph）"""
+    for name, (predicate, obj_range) in _hierarchy_inputs(context).items():
+        def build():
+            echarts_graph_info = InheritanceGraph(rdf_graph=context.loaded_schema.dataset, predicate=predicate, obj_range=obj_range).echarts_graph_info
+            return {"nodes": len(echarts_graph_info["nodes"]), "links": len(echarts_graph_info["links"])}
+        yield measure(f"hierarchy.{name}", "hierarchy", build, repeat=context.repeat)
+
+def echarts_cases(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """由继承图生成 echarts 配置并序列化为 JSON，即 st_echarts 发送给前端的负载"""
+    for name, (predicate, obj_range) in _hierarchy_inputs(context).items():
+        echarts_graph_info = InheritanceGraph(rdf_graph=context.loaded_schema.dataset, predicate=predicate, obj_range=obj_range).echarts_graph_info
+        def build():
+            options = EchartsUtility.create_normal_echart_options(echarts_graph_info, f"{name} hierarchy", label_visible=False)
+            return {"payload_bytes": len(json.dumps(options))}
+        yield measure(f"echarts.{name}_hierarchy", "echarts", build, repeat=context.repeat)
+
+def warmup_cases(context: BenchmarkContext) -> Iterator[BenchmarkResult]:
+    """后台预热全部任务的总耗时，每次使用新的查询服务（索引与概念缓存均为空）"""
+    def warm():
+        service = SchemaQueryService(rdf_graph=context.loaded_schema.dataset, dataset_version=context.loaded_schema.dataset_version, cache_dir=None)
+        cache_warmer = CacheWarmer(query_service=service)
+        cache_warmer.start()
+        cache_warmer.wait()
+        progress = cache_warmer.get_progress()
+        return {key: progress[key] for key in ("total", "done", "skipped", "failed")}
+    yield measure("warmup.cache_warmer", "warmup", warm, repeat=context.repeat)
+
+CASE_GROUPS: Dict[str, Callable[[BenchmarkContext], Iterator[BenchmarkResult]]] = {
+    "load": load_cases,
+    "concept_info": concept_info_cases,
+    "collection": collection_cases,
+    "hierarchy": hierarchy_cases,
+    "echarts": echarts_cases,
+    "warmup": warmup_cases,
+}
@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import json
+import platform
+import statistics
+import subprocess
+
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Callable
+
+from ifc_schema_viewer.utils import get_rss_bytes
+
+class BenchmarkResult(BaseModel):
+    """单个基准用例的结果，耗时单位为毫秒"""
+    name: str = Field(description="Case name, e.g. concept_info.EntityInfo.IfcWall.cold")
+    group: str = Field(description="Case group, e.g. load, concept_info, collection, hierarchy, echarts")
+    samples_ms: List[float] = Field(default_factory=list, description="Wall time of each measured repetition")
+    rss_delta_bytes: int = Field(default=0, description="Resident memory growth over all repetitions")
+    extra: Dict[str, Any] = Field(default_factory=dict, description="Case specific figures such as node or triple counts")
+    skipped: Optional[str] = Field(default=None, description="Reason the case was not run")
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.samples_ms) if self.samples_ms else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        samples = self.samples_ms
+        return {
+            "name": self.name,
+            "group": self.group,
+            "repeat": len(samples),
+            "min_ms": round(min(samples), 3) if samples else None,
+            "median_ms": round(self.median_ms, 3) if samples else None,
+            "mean_ms": round(statistics.fmean(samples), 3) if samples else None,
+            "max_ms": round(max(samples), 3) if samples else None,
+            "stdev_ms": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "extra": self.extra,
+            **({"skipped": self.skipped} if self.skipped else {}),
+        }
+
+def measure(name: str, group: str, func: Callable[[], Any], repeat: int = 5, warmup: int = 1,
+            setup: Optional[Callable[[], Any]] = None) -> BenchmarkResult:
+    """先预热 warmup 次，再计时 repeat 次；setup 在每次执行前调用且不计入耗时，用于清空缓存等"""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    samples = []
+    rss_start = get_rss_bytes()
+    value = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        time_start = time.perf_counter()
+        value = func()
+        samples.append((time.perf_counter() - time_start) * 1000)
+    result = BenchmarkResult(name=name, group=group, samples_ms=samples, rss_delta_bytes=max(get_rss_bytes() - rss_start, 0))
+    if isinstance(value, dict):
+        # 用例可返回规模等附加信息，随结果一同输出
+        result.extra = value
+    return result
+
+def get_git_commit() -> Optional[str]:
+    try:
+        # 以代码所在仓库为准，而不是当前工作目录
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class BenchmarkReport(BaseModel):
+    """一次基准测试的全部结果及运行环境，写出为 JSON 以便在提交之间比较"""
+    results: List[BenchmarkResult] = Field(default_factory=list)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+    def add(self, result: BenchmarkResult):
+        self.results.append(result)
+        if result.skipped:
+            print(f"{result.name:<60} skipped: {result.skipped}", flush=True)
+        else:
+            print(f"{result.name:<60} median {result.median_ms:10.3f} ms  (n={len(result.samples_ms)})", flush=True)
+
+    def to_json(self) -> Dict[str, Any]:
+        import rdflib
+        import pydantic
+        return {
+            "metadata": {
+                "timestamp": time.time(),
+                "commit": get_git_commit(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "rdflib": rdflib.__version__,
+                "pydantic": pydantic.__version__,
+                **self.metadata,
+            },
+            "results": [result.summary() for result in self.results],
+        }
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """逐个用例比较中位数耗时，返回比基线慢 threshold（比例）以上的用例"""
+    baseline_results = {result["name"]: result for result in baseline.get("results", [])}
+    regressions = []
+    for result in current.get("results", []):
+        previous = baseline_results.get(result["name"], None)
+        if previous is None or not result.get("median_ms") or not previous.get("median_ms"):
+            continue
+        ratio = result["median_ms"] / previous["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "name": result["name"],
+                "baseline_ms": previous["median_ms"],
+                "current_ms": result["median_ms"],
+                "ratio": round(ratio, 3),
+            })
+    return regressions
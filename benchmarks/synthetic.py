@@ -0,0 +1,382 @@
+"""按比例生成 CoALA4IFC 形状的合成数据集，用于在 1×、10×、100× 规模下测量加载、索引与页面
+
+    python -m benchmarks.synthetic --scale 1 10 100 --output-dir outputs/synthetic
+
+生成的 TriG 文件与 resources/knowledge_graphs/ifc_schema.trig 结构一致：默认图为本体（含扩展类与属性），
+IFC_SCHEMA_GRAPH 中为实体（express:subClassOf 继承树、直接/反向属性）、派生类型链、枚举、选择类型、
+属性枚举、属性集/数量集模板及概念分组，另有若干 CC_ 通用概念子图。1× 的各类概念数量与 IFC4.3 相近。
+"""
+import os
+import random
+import argparse
+
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Dict, Any, Optional, TextIO
+
+PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+    "express": "http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#",
+    "ifc": "http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#",
+    "syn": "http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Synthetic_Ext#",
+}
+
+# 1× 时各类概念的数量，与 IFC4.3 相近
+BASE_COUNTS = {
+    "entities": 876,
+    "derived_types": 130,
+    "enums": 243,
+    "selects": 60,
+    "property_enumerations": 180,
+    "pset_templates": 480,
+    "qset_templates": 100,
+    "conceptual_groups": 50,
+    "common_concept_graphs": 100,
+    "extension_classes": 150,
+    "extension_properties": 80,
+}
+
+# 固定名称的概念，保证基准测试中的代表性概念在任意规模下都存在
+FIXED_ENTITY_CHAIN = ["IfcRoot", "IfcObjectDefinition", "IfcObject", "IfcProduct", "IfcElement", "IfcBuiltElement", "IfcWall", "IfcWallStandardCase"]
+FIXED_DERIVED_TYPES = [
+    ("IfcText", "STRING"), ("IfcLabel", "IfcText"), ("IfcIdentifier", "STRING"),
+    ("IfcLengthMeasure", "REAL"), ("IfcPositiveLengthMeasure", "IfcLengthMeasure"),
+    ("IfcCountMeasure", "INTEGER"), ("IfcBoolean", "BOOLEAN"), ("IfcLogical", "LOGICAL"),
+]
+PRIMITIVE_TYPES = ["STRING", "REAL", "INTEGER", "BOOLEAN", "LOGICAL", "NUMBER", "BINARY"]
+LAYERS = ["Core", "Shared", "Domain", "Resource"]
+
+EXPRESS_CLASSES = [
+    ("SchematicConcept", None), ("Entity", "SchematicConcept"), ("Type", "SchematicConcept"),
+    ("Enum", "Type"), ("Select", "Type"), ("DerivedType", "Type"),
+    ("PropertySetTemplate", "SchematicConcept"), ("QuantitySetTemplate", "SchematicConcept"),
+    ("PropertyEnumeration", "SchematicConcept"), ("Attribute", None), ("EnumValue", None),
+    ("IfcSchema", None), ("Layer", None), ("Group", None),
+]
+EXPRESS_OBJECT_PROPERTIES = [
+    "hasDirectAttribute", "hasInverseAttribute", "attrRange", "hasValue", "derivedFrom", "applicableTo",
+    "hasPropTemplate", "dataType", "hasConceptualGroup", "hasConcept",
+]
+# 概念分组通过 hasConcept 的子属性关联各类概念
+HAS_CONCEPT_SUB_PROPERTIES = ["hasEntity", "hasType", "hasPropertySet", "hasQuantitySet", "hasPropertyEnumeration"]
+EXPRESS_DATATYPE_PROPERTIES = [
+    "name", "direct_attr_num", "cardinality", "is_optional", "data_type", "property_type",
+    "major", "minor", "addendums", "corrigendum",
+]
+EXPRESS_ANNOTATION_PROPERTIES = ["definitions", "description"]
+
+def _literal(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    return '"%s"' % str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+class _TrigWriter:
+    """逐行写出 TriG，主语与谓词均用前缀名，不在内存中构建图"""
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.triples = 0
+
+    def prefixes(self):
+        for prefix, namespace in PREFIXES.items():
+            self.f.write(f"@prefix {prefix}: <{namespace}> .\n")
+        self.f.write("\n")
+
+    def add(self, s: str, p: str, o: str, indent: str = "  "):
+        self.f.write(f"{indent}{s} {p} {o} .\n")
+        self.triples += 1
+
+    def open_graph(self, name: str):
+        self.f.write(f"\n{name} {{\n")
+
+    def close_graph(self):
+        self.f.write("}\n")
+
+class SyntheticSchemaGenerator(BaseModel):
+    """CoALA4IFC 形状的合成数据集生成器，相同的 scale 与 seed 总是生成相同的文件"""
+    scale: float = Field(default=1.0, description="Multiplier applied to the IFC4.3-sized base counts")
+    seed: int = Field(default=0, description="Seed of the random structure")
+
+    _counts: Dict[str, int] = PrivateAttr(default_factory=dict)
+    @property
+    def counts(self) -> Dict[str, int]:
+        return self._counts
+
+    _rng: random.Random = PrivateAttr(default=None)
+    _entities: List[str] = PrivateAttr(default_factory=list)
+    _derived_types: List[str] = PrivateAttr(default_factory=list)
+    _enums: List[str] = PrivateAttr(default_factory=list)
+    _selects: List[str] = PrivateAttr(default_factory=list)
+    _property_enumerations: List[str] = PrivateAttr(default_factory=list)
+    _psets: List[str] = PrivateAttr(default_factory=list)
+    _qsets: List[str] = PrivateAttr(default_factory=list)
+
+    def _concept(self, w: _TrigWriter, name: str, express_type: str):
+        iri = f"ifc:{name}"
+        w.add(iri, "rdf:type", f"express:{express_type}")
+        w.add(iri, "rdf:type", "owl:NamedIndividual")
+        w.add(iri, "express:name", _literal(name))
+        w.add(iri, "express:definitions", _literal(f"Synthetic {express_type} {name}."))
+        return iri
+
+    def _write_ontology(self, w: _TrigWriter):
+        for name, parent in EXPRESS_CLASSES:
+            w.add(f"express:{name}", "rdf:type", "owl:Class", indent="")
+            if parent is not None:
+                w.add(f"express:{name}", "rdfs:subClassOf", f"express:{parent}", indent="")
+        for name in EXPRESS_OBJECT_PROPERTIES:
+            w.add(f"express:{name}", "rdf:type", "owl:ObjectProperty", indent="")
+        for name in HAS_CONCEPT_SUB_PROPERTIES:
+            w.add(f"express:{name}", "rdf:type", "owl:ObjectProperty", indent="")
+            w.add(f"express:{name}", "rdfs:subPropertyOf", "express:hasConcept", indent="")
+        w.add("express:subClassOf", "rdf:type", "owl:ObjectProperty", indent="")
+        w.add("express:subClassOf", "rdf:type", "owl:TransitiveProperty", indent="")
+        w.add("express:superClassOf", "rdf:type", "owl:ObjectProperty", indent="")
+        w.add("express:superClassOf", "owl:inverseOf", "express:subClassOf", indent="")
+        for name in EXPRESS_DATATYPE_PROPERTIES:
+            w.add(f"express:{name}", "rdf:type", "owl:DatatypeProperty", indent="")
+        for name in EXPRESS_ANNOTATION_PROPERTIES:
+            w.add(f"express:{name}", "rdf:type", "owl:AnnotationProperty", indent="")
+
+        # 扩展本体：类继承树与属性继承树，规模随比例增长
+        for i in range(self._counts["extension_classes"]):
+            iri = f"syn:ExtClass{i}"
+            w.add(iri, "rdf:type", "owl:Class", indent="")
+            w.add(iri, "rdfs:label", _literal(f"Extension class {i}"), indent="")
+            w.add(iri, "rdfs:subClassOf", f"syn:ExtClass{self._rng.randrange(i)}" if i else "express:SchematicConcept", indent="")
+        property_kinds = ["owl:ObjectProperty", "owl:DatatypeProperty", "owl:AnnotationProperty"]
+        for i in range(self._counts["extension_properties"]):
+            iri = f"syn:extProperty{i}"
+            w.add(iri, "rdf:type", property_kinds[i % 3], indent="")
+            if i >= 3:
+                # 同类属性之间构成继承关系
+                w.add(iri, "rdfs:subPropertyOf", f"syn:extProperty{self._rng.randrange(i % 3, i, 3)}", indent="")
+            if property_kinds[i % 3] == "owl:ObjectProperty":
+                w.add(iri, "rdfs:domain", f"syn:ExtClass{self._rng.randrange(self._counts['extension_classes'])}", indent="")
+                w.add(iri, "rdfs:range", f"syn:ExtClass{self._rng.randrange(self._counts['extension_classes'])}", indent="")
+
+    def _write_types(self, w: _TrigWriter):
+        rng = self._rng
+        for name, base in FIXED_DERIVED_TYPES:
+            self._write_derived_type(w, name, base)
+        for i in range(max(self._counts["derived_types"] - len(FIXED_DERIVED_TYPES), 0)):
+            # 约三成派生自已有的派生类型，形成多级派生链
+            base = rng.choice(self._derived_types) if rng.random() < 0.3 else rng.choice(PRIMITIVE_TYPES)
+            self._write_derived_type(w, f"IfcSyn{i}Measure", base)
+
+        for i in range(self._counts["enums"]):
+            name = "IfcWallTypeEnum" if i == 0 else f"IfcSyn{i}TypeEnum"
+            iri = self._concept(w, name, "Enum")
+            values = ["SOLIDWALL", "USERDEFINED", "NOTDEFINED"] if i == 0 else [f"VALUE{j}" for j in range(rng.randint(2, 15))] + ["NOTDEFINED"]
+            for value in values:
+                self._write_enum_value(w, iri, f"{name}_{value}", value)
+            self._enums.append(iri)
+
+        for i in range(self._counts["property_enumerations"]):
+            name = "PEnum_Status" if i == 0 else f"PEnum_Syn{i}"
+            iri = self._concept(w, name, "PropertyEnumeration")
+            for j in range(rng.randint(2, 8)):
+                self._write_enum_value(w, iri, f"{name}_VALUE{j}", f"VALUE{j}")
+            self._property_enumerations.append(iri)
+
+    def _write_derived_type(self, w: _TrigWriter, name: str, base: str):
+        iri = self._concept(w, name, "DerivedType")
+        w.add(iri, "express:derivedFrom", f"ifc:{base}")
+        w.add(iri, "express:cardinality", _literal("1"))
+        self._derived_types.append(iri)
+
+    def _write_enum_value(self, w: _TrigWriter, owner: str, name: str, value: str):
+        w.add(owner, "express:hasValue", f"ifc:{name}")
+        w.add(f"ifc:{name}", "rdf:type", "express:EnumValue")
+        w.add(f"ifc:{name}", "express:name", _literal(value))
+        w.add(f"ifc:{name}", "express:description", _literal(f"Synthetic value {value}."))
+
+    def _write_entities(self, w: _TrigWriter):
+        rng = self._rng
+        count = max(self._counts["entities"], len(FIXED_ENTITY_CHAIN))
+        names = FIXED_ENTITY_CHAIN + [f"IfcSyn{i}Element" for i in range(count - len(FIXED_ENTITY_CHAIN))]
+        self._entities = [f"ifc:{name}" for name in names]
+        for i, name in enumerate(names):
+            iri = self._concept(w, name, "Entity")
+            if i < len(FIXED_ENTITY_CHAIN):
+                parent = self._entities[i - 1] if i else None
+            elif rng.random() < 0.03:
+                # 少数实体为独立的根
+                parent = None
+            else:
+                # 偏向较近的实体作为父实体，使继承树具有与 IFC 相近的深度
+                parent = self._entities[rng.randrange(max(0, i - 40), i)]
+            if parent is not None:
+                w.add(iri, "express:subClassOf", parent)
+                w.add(parent, "express:superClassOf", iri)
+
+    def _write_selects(self, w: _TrigWriter):
+        rng = self._rng
+        for i in range(self._counts["selects"]):
+            iri = self._concept(w, "IfcValue" if i == 0 else f"IfcSyn{i}Select", "Select")
+            candidates = self._derived_types + self._entities
+            for member in rng.sample(candidates, min(rng.randint(2, 8), len(candidates))):
+                w.add(iri, "express:hasValue", member)
+            self._selects.append(iri)
+
+    def _write_attributes(self, w: _TrigWriter):
+        rng = self._rng
+        ranges = [self._derived_types, self._enums, self._selects, self._entities]
+        for entity in self._entities:
+            name = entity[len("ifc:"):]
+            for j in range(rng.randint(0, 6)):
+                self._write_attribute(w, entity, "express:hasDirectAttribute", f"{name}_Attr{j}", f"Attr{j}",
+                                      rng.choice(rng.choices(ranges, weights=[6, 2, 1, 3])[0]), j + 1)
+            if rng.random() < 0.3:
+                for j in range(rng.randint(1, 3)):
+                    self._write_attribute(w, entity, "express:hasInverseAttribute", f"{name}_Inverse{j}", f"Inverse{j}",
+                                          rng.choice(self._entities), None)
+
+    def _write_attribute(self, w: _TrigWriter, entity: str, predicate: str, name: str, label: str, attr_range: str,
+                         number: Optional[int]):
+        iri = f"ifc:{name}"
+        w.add(entity, predicate, iri)
+        w.add(iri, "rdf:type", "express:Attribute")
+        w.add(iri, "express:name", _literal(label))
+        if number is not None:
+            w.add(iri, "express:direct_attr_num", _literal(number))
+        w.add(iri, "express:cardinality", _literal("1" if number is not None else "S[0:?]"))
+        w.add(iri, "express:is_optional", _literal(self._rng.random() < 0.5))
+        w.add(iri, "express:description", _literal(f"Synthetic attribute {label}."))
+        w.add(iri, "express:attrRange", attr_range)
+
+    def _write_templates(self, w: _TrigWriter):
+        rng = self._rng
+        for kind, count, target in (("PropertySetTemplate", self._counts["pset_templates"], self._psets),
+                                    ("QuantitySetTemplate", self._counts["qset_templates"], self._qsets)):
+            for i in range(count):
+                if kind == "PropertySetTemplate":
+                    name = "Pset_WallCommon" if i == 0 else f"Pset_Syn{i}Common"
+                else:
+                    name = "Qto_WallBaseQuantities" if i == 0 else f"Qto_Syn{i}BaseQuantities"
+                iri = self._concept(w, name, kind)
+                applicable = ["ifc:IfcWall"] if i == 0 else rng.sample(self._entities, rng.randint(1, 3))
+                for entity in applicable:
+                    w.add(iri, "express:applicableTo", entity)
+                for j in range(rng.randint(2, 12) if kind == "PropertySetTemplate" else rng.randint(2, 8)):
+                    self._write_prop_template(w, iri, f"{name}_Prop{j}", f"Prop{j}", kind == "QuantitySetTemplate")
+                target.append(iri)
+
+    def _write_prop_template(self, w: _TrigWriter, template: str, name: str, label: str, quantity: bool):
+        rng = self._rng
+        iri = f"ifc:{name}"
+        roll = rng.random()
+        if quantity or roll < 0.8:
+            data_type, property_type = rng.choice(self._derived_types), "P_SINGLEVALUE"
+        elif roll < 0.95:
+            data_type, property_type = rng.choice(self._property_enumerations), "P_ENUMERATEDVALUE"
+        else:
+            data_type, property_type = rng.choice(self._entities), "P_REFERENCEVALUE"
+        w.add(template, "express:hasPropTemplate", iri)
+        w.add(iri, "express:name", _literal(label))
+        w.add(iri, "express:data_type", _literal(data_type[len("ifc:"):]))
+        w.add(iri, "express:description", _literal(f"Synthetic property {label}."))
+        w.add(iri, "express:dataType", data_type)
+        if not quantity:
+            w.add(iri, "express:property_type", _literal(property_type))
+
+    def _write_groups(self, w: _TrigWriter):
+        rng = self._rng
+        w.add("ifc:IFC4X3", "rdf:type", "express:IfcSchema")
+        w.add("ifc:IFC4X3", "express:name", _literal("IFC4X3"))
+        for key, value in (("major", 4), ("minor", 3), ("addendums", 2), ("corrigendum", 0)):
+            w.add("ifc:IFC4X3", f"express:{key}", _literal(value))
+        layers = []
+        for layer in LAYERS:
+            iri = f"ifc:{layer}Layer"
+            w.add(iri, "rdf:type", "express:Layer")
+            w.add(iri, "skos:inScheme", "ifc:IFC4X3")
+            w.add(iri, "express:name", _literal(layer))
+            layers.append(iri)
+        groups = []
+        for i in range(self._counts["conceptual_groups"]):
+            iri = f"ifc:IfcSyn{i}Domain"
+            w.add(iri, "rdf:type", "express:Group")
+            w.add(iri, "express:name", _literal(f"IfcSyn{i}Domain"))
+            w.add(iri, "express:definitions", _literal(f"Synthetic conceptual group {i}."))
+            w.add(layers[i % len(layers)], "express:hasConceptualGroup", iri)
+            groups.append(iri)
+        # 每个概念归属一个分组
+        for predicate, concepts in (("express:hasEntity", self._entities),
+                                    ("express:hasType", self._derived_types + self._enums + self._selects),
+                                    ("express:hasPropertySet", self._psets),
+                                    ("express:hasQuantitySet", self._qsets),
+                                    ("express:hasPropertyEnumeration", self._property_enumerations)):
+            for concept in concepts:
+                w.add(rng.choice(groups), predicate, concept)
+
+    def _write_common_concepts(self, w: _TrigWriter):
+        rng = self._rng
+        for i in range(self._counts["common_concept_graphs"]):
+            name = "Wall" if i == 0 else f"Syn{i}"
+            w.open_graph(f"ifc:CC_{name}_Graph")
+            hub = f"ifc:CC_{name}"
+            w.add(hub, "rdf:type", "skos:Concept")
+            w.add(hub, "skos:prefLabel", _literal(f"{name} concept"))
+            w.add(hub, "skos:definition", _literal(f"Synthetic common concept {name}."))
+            for entity in (["ifc:IfcWall"] if i == 0 else []) + rng.sample(self._entities, min(rng.randint(3, 25), len(self._entities))):
+                w.add(hub, "skos:related", entity)
+                w.add(entity, "rdfs:comment", _literal(f"Used by common concept {name}."))
+            for pset in rng.sample(self._psets, min(rng.randint(0, 5), len(self._psets))):
+                w.add(hub, "skos:related", pset)
+            w.close_graph()
+
+    def write(self, path: str) -> Dict[str, int]:
+        """写出 TriG 文件，返回各类概念数量及三元组总数"""
+        self._rng = random.Random(self.seed)
+        for name in ["_entities", "_derived_types", "_enums", "_selects", "_property_enumerations", "_psets", "_qsets"]:
+            setattr(self, name, [])
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            w = _TrigWriter(f)
+            w.prefixes()
+            self._write_ontology(w)
+            w.open_graph("ifc:IFC_SCHEMA_GRAPH")
+            # 实体先于类型生成名称，属性的值域可以引用实体
+            self._write_entities(w)
+            self._write_types(w)
+            self._write_selects(w)
+            self._write_attributes(w)
+            self._write_templates(w)
+            self._write_groups(w)
+            w.close_graph()
+            self._write_common_concepts(w)
+        os.replace(temp_path, path)
+        return {**self._counts, "triples": w.triples}
+
+    def model_post_init(self, __context):
+        if self.scale <= 0:
+            raise ValueError("scale must be positive")
+        self._counts = {name: max(int(round(count * self.scale)), 1) for name, count in BASE_COUNTS.items()}
+
+def get_synthetic_schema_path(scale: float, seed: int = 0, output_dir: str = "./outputs/synthetic") -> str:
+    """指定规模的合成数据集路径，文件不存在时先生成"""
+    path = os.path.join(output_dir, f"ifc_schema_x{scale:g}_seed{seed}.trig")
+    if not os.path.isfile(path):
+        SyntheticSchemaGenerator(scale=scale, seed=seed).write(path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate CoALA4IFC-shaped synthetic datasets at several scales")
+    parser.add_argument("--scale", type=float, nargs="+", default=[1.0, 10.0, 100.0], help="Scale factors relative to IFC4.3")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="./outputs/synthetic")
+    args = parser.parse_args()
+    for scale in args.scale:
+        path = os.path.join(args.output_dir, f"ifc_schema_x{scale:g}_seed{args.seed}.trig")
+        counts = SyntheticSchemaGenerator(scale=scale, seed=args.seed).write(path)
+        print(f"{path}: {counts['triples']} triples, {counts['entities']} entities, {counts['pset_templates']} property set templates")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import os
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import rdflib
+from rdflib import Dataset
+
+from ifc_schema_viewer.core import (
+    OntologyMetadata,
+    CollectionMembers,
+    PsetApplicability,
+    AttributeReferences,
+    DatatypeUsages,
+    DerivedTypeChains,
+    SchemaValidators,
+    GraphStatistics,
+    DatasetProfile,
+    InheritanceGraph,
+    SchemaQueryService,
+    QueryWorkerPool,
+    QueryScheduler,
+    CacheWarmer,
+    AccessLog,
+    DEFAULT_HOT_CONCEPTS,
+    LoadedSchema,
+    ProgressiveSchemaLoader,
+    compute_dataset_version,
+    INTERACTIVE
+)
+from ifc_schema_viewer.core.loader import DEFAULT_SCHEMA_PATH, get_source_paths
+from typing import Optional, Callable, Any, List, Tuple
+from .sessions import SessionRegistry
+from .widget_keys import get_render_path
+
+# 以下资源在进程内所有会话之间共享，以数据集版本号为缓存键，数据源变化时自动重建
+# 参数名以下划线开头的对象不参与 streamlit 的哈希计算
+# 各索引由 SchemaQueryService 持有，批处理任务直接使用 core 层即可得到同样的索引
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _start_schema_loader(schema_path: str, ontology_paths: Tuple[str, ...], dataset_version: str) -> ProgressiveSchemaLoader:
+    schema_loader = ProgressiveSchemaLoader(schema_path=schema_path, ontology_paths=list(ontology_paths))
+    schema_loader.start()
+    return schema_loader
+
+def start_schema_loader(schema_path: str = DEFAULT_SCHEMA_PATH, ontology_paths: Optional[List[str]] = None) -> ProgressiveSchemaLoader:
+    """在后台开始（或取回进行中的）数据集加载并立即返回，所有会话共享同一次加载；源文件缺失时抛出 FileNotFoundError"""
+    paths = get_source_paths(schema_path, ontology_paths)
+    return _start_schema_loader(paths[0], tuple(paths[1:]), compute_dataset_version(paths))
+
+def restart_schema_loader():
+    """丢弃失败的加载，下次调用 start_schema_loader 时重新加载"""
+    _start_schema_loader.clear()
+
+def load_shared_schema(schema_path: str = DEFAULT_SCHEMA_PATH, ontology_paths: Optional[List[str]] = None) -> LoadedSchema:
+    """解析后的数据集由所有会话共享（只读），源文件未变化时不再重复解析；源文件缺失时抛出 FileNotFoundError，解析失败时抛出 RuntimeError"""
+    schema_loader = start_schema_loader(schema_path, ontology_paths)
+    if not schema_loader.wait():
+        raise RuntimeError(f"Failed to load IFC Schema: {schema_loader.error}")
+    return schema_loader.result
+
+@st.cache_resource(show_spinner=False)
+def _build_query_service(_dataset: Dataset, dataset_version: str) -> SchemaQueryService:
+    return SchemaQueryService(rdf_graph=_dataset, dataset_version=dataset_version)
+
+def get_query_service() -> SchemaQueryService:
+    return _build_query_service(st.session_state.ifc_schema_dataset, st.session_state.dataset_version)
+
+
+@st.cache_resource(show_spinner="正在启动查询进程...")
+def _build_query_workers(_dataset: Dataset, dataset_version: str, workers: int) -> QueryWorkerPool:
+    query_service = _build_query_service(_dataset, dataset_version)
+    worker_pool = QueryWorkerPool(workers=workers)
+    worker_pool.start(query_service)
+    query_service.attach_worker_pool(worker_pool)
+    return worker_pool
+
+def start_query_workers(workers: int) -> QueryWorkerPool:
+    """启动（或取回已启动的）查询进程池，并挂接到共享的查询服务上"""
+    return _build_query_workers(st.session_state.ifc_schema_dataset, st.session_state.dataset_version, workers)
+
+def get_query_workers() -> Optional[QueryWorkerPool]:
+    """当前会话所用的查询进程池，未启用时返回 None"""
+    workers = st.session_state.get("query_workers", 0)
+    return start_query_workers(workers) if workers > 0 else None
+
+@st.cache_resource(show_spinner=False)
+def _start_cache_warmer(_dataset: Dataset, dataset_version: str, workers: int, _hot_concepts: List[str]) -> CacheWarmer:
+    cache_warmer = CacheWarmer(query_service=_build_query_service(_dataset, dataset_version), max_workers=workers, hot_concepts=_hot_concepts)
+    cache_warmer.start()
+    return cache_warmer
+
+def start_cache_warmer(workers: int) -> CacheWarmer:
+    """启动（或取回已启动的）后台缓存预热，提交任务后立即返回；预热的概念取自访问记录的热点集合，记录不足时以常用概念补足"""
+    access_log = get_access_log()
+    hot_concepts = access_log.get_hot_concepts()
+    accessed_names = {rdflib.URIRef(iri).fragment for iri in hot_concepts}
+    hot_concepts += [name for name in DEFAULT_HOT_CONCEPTS if name not in accessed_names]
+    return _start_cache_warmer(st.session_state.ifc_schema_dataset, st.session_state.dataset_version, workers,
+                               hot_concepts[:max(access_log.hot_set_size, len(DEFAULT_HOT_CONCEPTS))])
+
+def get_cache_warmer() -> Optional[CacheWarmer]:
+    """当前数据集版本的后台预热，未启用时返回 None"""
+    workers = st.session_state.get("warmup_workers", 0)
+    return start_cache_warmer(workers) if workers > 0 else None
+
+@st.cache_resource(show_spinner=False)
+def _load_access_log(output_dir: str) -> AccessLog:
+    return AccessLog(path=os.path.join(output_dir, "access_log.json"))
+
+def get_access_log() -> AccessLog:
+    """进程内所有会话共享的概念访问记录，保存在应用的输出目录中"""
+    return _load_access_log(st.session_state.get("output_dir", "./outputs"))
+
+def record_concept_access(iri, name: Optional[str] = None, express_type: Optional[str] = None):
+    """记录当前会话打开的概念；同一会话在同一标签页中打开同一概念只计一次，重新运行不会重复计数"""
+    render_path = get_render_path()
+    tab = render_path[0] if render_path else ""
+    if st.session_state.get("accessed_concepts", None) is None:
+        st.session_state.accessed_concepts = set()
+    if (tab, str(iri)) in st.session_state.accessed_concepts:
+        return
+    st.session_state.accessed_concepts.add((tab, str(iri)))
+    get_access_log().record(iri, tab=tab, name=name, express_type=express_type)
+
+@st.cache_resource(show_spinner=False)
+def get_query_scheduler() -> QueryScheduler:
+    """进程内唯一的查询调度器，所有会话共享"""
+    return QueryScheduler()
+
+@st.cache_resource(show_spinner=False)
+def get_session_registry() -> SessionRegistry:
+    """进程内唯一的会话登记表，所有会话共享"""
+    return SessionRegistry()
+
+def run_scheduled(func: Callable[[], Any], priority: str = INTERACTIVE) -> Any:
+    """以当前会话的身份经调度器执行查询"""
+    ctx = get_script_run_ctx()
+    return get_query_scheduler().run(func, priority=priority, session_id=ctx.session_id if ctx is not None else "")
+
+def _get_index(name: str, spinner_text: str):
+    service = get_query_service()
+    if service.is_index_built(name):
+        return getattr(service, name)
+    with st.spinner(spinner_text):
+        return getattr(service, name)
+
+def get_ontology_metadata() -> OntologyMetadata:
+    return _get_index("ontology_metadata", "正在构建本体元数据缓存...")
+
+def get_collection_members() -> CollectionMembers:
+    return _get_index("collection_members", "正在构建概念集合成员表...")
+
+def get_pset_applicability() -> PsetApplicability:
+    return _get_index("pset_applicability", "正在构建属性集适用性索引...")
+
+def get_attribute_references() -> AttributeReferences:
+    return _get_index("attribute_references", "正在构建属性引用反向索引...")
+
+def get_datatype_usages() -> DatatypeUsages:
+    return _get_index("datatype_usages", "正在构建数据类型使用索引...")
+
+def get_derived_type_chains() -> DerivedTypeChains:
+    return _get_index("derived_type_chains", "正在解析派生类型链...")
+
+def get_schema_validators() -> SchemaValidators:
+    return _get_index("schema_validators", "正在编译类型校验器...")
+
+def get_class_hierarchy() -> InheritanceGraph:
+    return _get_index("class_hierarchy", "正在构建类继承图...")
+
+def get_property_hierarchy() -> InheritanceGraph:
+    return _get_index("property_hierarchy", "正在构建属性继承图...")
+
+def get_graph_statistics() -> GraphStatistics:
+    """子图统计在加载数据集时已算好，随会话状态保存；缺失时回退到共享查询服务的索引"""
+    statistics = st.session_state.get("graph_statistics", None)
+    if statistics is not None:
+        return statistics
+    return _get_index("graph_statistics", "正在统计子图...")
+
+def get_dataset_profile() -> DatasetProfile:
+    """VoID 风格的数据集画像，源文件未变化时直接读取磁盘缓存"""
+    return _get_index("dataset_profile", "正在生成数据集画像...")
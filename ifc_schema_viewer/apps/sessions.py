@@ -0,0 +1,241 @@
+import os
+import sys
+import time
+import logging
+import weakref
+import threading
+
+import rdflib
+import pandas as pd
+
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Dict, Any, Optional, Set
+
+from ifc_schema_viewer.utils import get_metrics_registry
+from ifc_schema_viewer.core import (
+    Concept,
+    SchemaQueryService,
+    OntologyMetadata,
+    CollectionMembers,
+    PsetApplicability,
+    AttributeReferences,
+    DatatypeUsages,
+    DerivedTypeChains,
+    SchemaValidators,
+    TypeValidator,
+    GraphStatistics,
+    DatasetProfile,
+    InheritanceGraph,
+    QueryWorkerPool,
+    LoadedSchema
+)
+
+# 会话状态中与其他会话共享的对象（数据集、进程级缓存的服务等），不计入单个会话的内存
+SHARED_SESSION_KEYS = {"ifc_schema_dataset", "classes", "properties", "graph_statistics", "logger", "last_rerun_trace"}
+# 由共享查询服务缓存、各会话共用的 core 层对象：会话中的 ConceptInfo 等引用它们，但逐出会话缓存并不能释放这部分内存
+SHARED_OBJECT_TYPES = (
+    rdflib.Graph, Concept, SchemaQueryService, OntologyMetadata, CollectionMembers, PsetApplicability, AttributeReferences,
+    DatatypeUsages, DerivedTypeChains, SchemaValidators, TypeValidator, GraphStatistics, DatasetProfile, InheritanceGraph,
+    QueryWorkerPool, LoadedSchema,
+)
+# 可从共享数据集重建的缓存项：被逐出后，会话下次访问时按需重新构建；查询结果与历史属于用户数据，不逐出
+EVICTABLE_SESSION_KEYS = ["psets", "entities", "enumerations", "derived_types", "select_types", "cached_concept_info"]
+
+def estimate_object_size(obj: Any, max_objects: int = 200_000) -> int:
+    """有界的深度大小估计：沿容器与对象属性遍历，不进入共享对象（SHARED_OBJECT_TYPES），访问对象数超过 max_objects 时提前结束"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, SHARED_OBJECT_TYPES + (type,)):
+            continue
+        seen.add(id(current))
+        if isinstance(current, (pd.DataFrame, pd.Series)):
+            total += int(current.memory_usage(deep=True).sum()) if isinstance(current, pd.DataFrame) else int(current.memory_usage(deep=True))
+            continue
+        try:
+            total += sys.getsizeof(current)
+        except TypeError:
+            continue
+        if isinstance(current, (str, bytes, int, float, bool)):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, BaseModel):
+            stack.extend(current.__dict__.values())
+            stack.extend((current.__pydantic_private__ or {}).values())
+        elif hasattr(current, "__dict__"):
+            stack.extend(vars(current).values())
+    return total
+
+def estimate_session_memory(session_state) -> Dict[str, int]:
+    """会话状态中各键占用的内存估计（字节），共享对象不计入"""
+    sizes = {}
+    for key in list(session_state.keys()):
+        if key in SHARED_SESSION_KEYS:
+            continue
+        sizes[str(key)] = estimate_object_size(session_state[key])
+    return sizes
+
+class SessionRegistry(BaseModel):
+    """进程内各会话的最近活动、重新运行耗时与内存估计，供性能监控页展示
+
+    各会话估计内存之和超出预算时，标记空闲会话逐出其可重建的缓存项（EVICTABLE_SESSION_KEYS）；
+    会话状态不是线程安全的，缓存项在该会话下次运行时由其自己的脚本线程删除。
+    """
+    active_timeout: float = Field(default=300.0, description="Seconds without rerun after which a session is no longer active")
+    memory_estimate_interval: float = Field(default=10.0, description="Minimum seconds between two memory estimates of the same session")
+    memory_budget_mb: float = Field(
+        default_factory=lambda: float(os.environ.get("IFC_SCHEMA_VIEWER_SESSION_BUDGET_MB", 512)),
+        description="Budget for the estimated memory of all sessions, idle sessions are evicted above it")
+    idle_eviction_seconds: float = Field(
+        default_factory=lambda: float(os.environ.get("IFC_SCHEMA_VIEWER_SESSION_IDLE_SECONDS", 600)),
+        description="Seconds without rerun after which a session's cached entries may be evicted")
+
+    _sessions: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    # 会话状态的弱引用：会话被 streamlit 回收后自动失效，登记表不延长其生命周期
+    _session_states: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def needs_memory_estimate(self, session_id: str) -> bool:
+        # 深度遍历会话状态开销不小，同一会话在间隔内只估计一次
+        with self._lock:
+            session = self._sessions.get(session_id, None)
+        return session is None or time.time() - session["memory_estimated_at"] >= self.memory_estimate_interval
+
+    def touch(self, session_id: str, rerun_seconds: float, memory_bytes: Optional[Dict[str, int]] = None,
+              session_state: Any = None):
+        """记录一次重新运行；memory_bytes 为各会话状态键的内存估计，None 时沿用上次的估计；
+        session_state 为该会话的状态对象，用于发现已关闭的会话"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id, None)
+            if session is None:
+                session = self._sessions[session_id] = {
+                    "session_id": session_id, "started_at": now, "reruns": 0,
+                    "memory_bytes": {}, "memory_estimated_at": 0.0,
+                    "evictions": 0, "evicted_bytes": 0,
+                    "pending_eviction": None, "pending_bytes": 0,
+                }
+            session["last_seen"] = now
+            session["reruns"] += 1
+            session["last_rerun_seconds"] = rerun_seconds
+            if memory_bytes is not None:
+                session["memory_bytes"] = memory_bytes
+                session["memory_estimated_at"] = now
+            if session_state is not None:
+                # SafeSessionState 随每次运行的 ScriptRunner 重建，引用其包装的、与会话同寿命的 SessionState，仅用于发现已关闭的会话
+                self._session_states[session_id] = weakref.ref(getattr(session_state, "_state", session_state))
+
+    def remove(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._session_states.pop(session_id, None)
+
+    def get_total_memory_bytes(self) -> int:
+        with self._lock:
+            return sum(sum(session["memory_bytes"].values()) for session in self._sessions.values())
+
+    def _prune_closed_sessions(self):
+        # 会话状态已被回收的会话不再占用内存，从登记表中移除
+        with self._lock:
+            closed = [session_id for session_id, state_ref in self._session_states.items() if state_ref() is None]
+        for session_id in closed:
+            self.remove(session_id)
+
+    def request_eviction(self, session_id: str, keep_concepts: Optional[Set[str]] = None) -> int:
+        """标记某个会话逐出其可重建的缓存项，返回按上次估计可释放的字节数；会话不存在或已标记时返回 0
+
+        keep_concepts 为热点概念的 IRI，其 ConceptInfo 在逐出时保留。
+        """
+        with self._lock:
+            session = self._sessions.get(session_id, None)
+            if session is None or session["pending_eviction"] is not None:
+                return 0
+            pending_bytes = sum(session["memory_bytes"].get(key, 0) for key in EVICTABLE_SESSION_KEYS)
+            if not pending_bytes:
+                return 0
+            session["pending_eviction"] = set(keep_concepts or ())
+            session["pending_bytes"] = pending_bytes
+        return pending_bytes
+
+    def apply_pending_eviction(self, session_id: str, session_state: Any) -> int:
+        """在会话自己的脚本线程中执行已标记的逐出，返回按上次估计释放的字节数；未标记时返回 0"""
+        with self._lock:
+            session = self._sessions.get(session_id, None)
+            if session is None or session["pending_eviction"] is None:
+                return 0
+            keep_concepts = session["pending_eviction"]
+            session["pending_eviction"], session["pending_bytes"] = None, 0
+        remaining_bytes = {}
+        for key in EVICTABLE_SESSION_KEYS:
+            if key not in session_state:
+                continue
+            value = session_state[key]
+            if key == "cached_concept_info" and keep_concepts and isinstance(value, dict):
+                kept = {iri: concept_info for iri, concept_info in value.items() if str(iri) in keep_concepts}
+                if len(kept) == len(value):
+                    continue
+                if kept:
+                    session_state[key] = kept
+                    remaining_bytes[key] = estimate_object_size(kept)
+                    continue
+            del session_state[key]
+            remaining_bytes[key] = 0
+        with self._lock:
+            freed = 0
+            for key, remaining in remaining_bytes.items():
+                freed += max(session["memory_bytes"].get(key, 0) - remaining, 0)
+                if remaining:
+                    session["memory_bytes"][key] = remaining
+                else:
+                    session["memory_bytes"].pop(key, None)
+            if remaining_bytes:
+                session["evictions"] += 1
+                session["evicted_bytes"] += freed
+        if remaining_bytes:
+            get_metrics_registry().increment("session_eviction")
+            logging.info("[APP] evicted %s from session %s, freed about %.1f MB" % (
+                ", ".join(remaining_bytes), session_id[:8], freed / 1024 / 1024))
+        return freed
+
+    def enforce_budget(self, current_session_id: Optional[str] = None, keep_concepts: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """估计内存之和（扣除已标记待逐出的部分）超出预算时，按空闲时间从长到短标记空闲会话逐出缓存项（热点概念除外），
+        直至回到预算之内；当前会话与未空闲足够久的会话不受影响。返回各被标记会话的 session_id 与预计释放的字节数"""
+        self._prune_closed_sessions()
+        budget_bytes = self.memory_budget_mb * 1024 * 1024
+        sessions = self.get_sessions()
+        total = sum(session["total_memory_bytes"] - session["pending_bytes"] for session in sessions)
+        if total <= budget_bytes:
+            return []
+        candidates = [session for session in sessions
+                      if session["session_id"] != current_session_id
+                      and session["pending_eviction"] is None
+                      and session["idle_seconds"] >= self.idle_eviction_seconds
+                      and any(key in session["memory_bytes"] for key in EVICTABLE_SESSION_KEYS)]
+        evicted = []
+        for session in sorted(candidates, key=lambda session: session["idle_seconds"], reverse=True):
+            freed = self.request_eviction(session["session_id"], keep_concepts)
+            if freed:
+                evicted.append({"session_id": session["session_id"], "freed_bytes": freed})
+                total -= freed
+            if total <= budget_bytes:
+                break
+        return evicted
+
+    def get_sessions(self, active_only: bool = False) -> List[Dict[str, Any]]:
+        """各会话的概况，按最近活动时间降序"""
+        now = time.time()
+        with self._lock:
+            sessions = [dict(session) for session in self._sessions.values()]
+        for session in sessions:
+            session["idle_seconds"] = now - session["last_seen"]
+            session["active"] = session["idle_seconds"] < self.active_timeout
+            session["total_memory_bytes"] = sum(session["memory_bytes"].values())
+        if active_only:
+            sessions = [session for session in sessions if session["active"]]
+        return sorted(sessions, key=lambda session: session["last_seen"], reverse=True)
@@ -1,3 +1,5 @@
 from .base import SubPage
 from .graph_status import GraphStatusSubPage
-from .schema_concept_exploration import SchemaExplorationSubPage
\ No newline at end of file
+from .schema_concept_exploration import SchemaExplorationSubPage
+from .performance_dashboard import PerformanceDashboardSubPage
+from .schema_loading import SchemaLoadingSubPage
\ No newline at end of file
@@ -12,43 +12,40 @@ import pandas as pd
 
 from .base import SubPage
 
-from ifc_schema_viewer.utils import EchartsUtility, GraphAlgoUtility, timer_wrapper
+from ifc_schema_viewer.utils import EchartsUtility, timer_wrapper
+from ifc_schema_viewer.core.graph_statistics import IFC_SCHEMA_GRAPH_NAME, DEFAULT_GRAPH_NAME
+from ..caches import get_graph_statistics, get_dataset_profile, get_class_hierarchy, get_property_hierarchy
 
 class GraphStatusSubPage(SubPage):
     @timer_wrapper
     def display_basic_info(self):
-        graphs = self.ifc_schema_dataset.graphs()
-        graphs = {str(graph.identifier.n3(self.ifc_schema_dataset.namespace_manager)): graph for graph in graphs}
-            
-        triplet_count = len(self.ifc_schema_dataset)
+        statistics = get_graph_statistics()
         with st.container(border=True):
             grid = st_grid([1,1], [1,1], [1,1])
-            grid.metric(label="子图数量", value=len(graphs))
-            grid.metric(label="三元组数量", value=triplet_count)
-            CC_graphs = [graph_name for graph_name in graphs.keys() if graph_name.startswith("ifc:CC")]
-            grid.metric(label="通用概念子图数量", value=len(CC_graphs))
-            grid.metric(label="通用概念子图三元组数量", value=sum([len(graphs[graph_name]) for graph_name in CC_graphs]))
-            ifc_schema_subgraph = graphs["ifc:IFC_SCHEMA_GRAPH"]
-            grid.metric(label="IFC数据标准子图三元组数量", value=len(ifc_schema_subgraph))
-            grid.container()
+            grid.metric(label="子图数量", value=statistics.graph_count)
+            grid.metric(label="三元组数量", value=statistics.triple_count)
+            grid.metric(label="通用概念子图数量", value=len(statistics.common_concept_graphs))
+            grid.metric(label="通用概念子图三元组数量", value=statistics.common_concept_triple_count)
+            grid.metric(label="IFC数据标准子图三元组数量", value=statistics.get_triple_count(IFC_SCHEMA_GRAPH_NAME))
+            grid.metric(label="类 / 属性数量", value=f"{statistics.class_count} / {sum(statistics.property_counts.values())}")
     
     @st.fragment
     @timer_wrapper
     def display_subgraph_statistics(self):
         import math
-        graphs = self.ifc_schema_dataset.graphs()
-        graphs = {str(graph.identifier.n3(self.ifc_schema_dataset.namespace_manager)): graph for graph in graphs}
+        statistics = get_graph_statistics()
         
         grid = st_grid([1,1])
-        grid.metric("IFC4.3数据模式三元组数量", len(graphs["ifc:IFC_SCHEMA_GRAPH"]))
-        grid.metric("IFC4.3数据模式本体三元组数量", len(graphs["<urn:x-rdflib:default>"]))
+        grid.metric("IFC4.3数据模式三元组数量", statistics.get_triple_count(IFC_SCHEMA_GRAPH_NAME))
+        grid.metric("IFC4.3数据模式本体三元组数量", statistics.get_triple_count(DEFAULT_GRAPH_NAME))
         num_in_column = 4
         
         search_value = st.text_input("请输入查询关键词", key="search_subgraph")
         
         subgraph_info = {}
-        for i, graph_name in enumerate(graphs.keys()):
-            if graph_name in ["ifc:IFC_SCHEMA_GRAPH", "<urn:x-rdflib:default>"]:
+        subgraph_help = {}
+        for i, (graph_name, graph_stats) in enumerate(statistics.graphs.items()):
+            if graph_name in [IFC_SCHEMA_GRAPH_NAME, DEFAULT_GRAPH_NAME]:
                 continue
             if search_value:
                 if search_value.lower() not in graph_name.lower(): continue
@@ -56,7 +53,8 @@ class GraphStatusSubPage(SubPage):
                 name = graph_name[7:][:-6].replace("_", " ")
             else:
                 name = graph_name
-            subgraph_info[name] = len(graphs[graph_name])
+            subgraph_info[name] = graph_stats["triples"]
+            subgraph_help[name] = f"主语 {graph_stats['subjects']} 个，谓词 {graph_stats['predicates']} 个"
         
         with st.container(border=True):
             sort_option = st.radio("排序方式", ["按名称", "按大小(降序)","按大小(升序)"], horizontal=True, label_visibility="collapsed")
@@ -68,7 +66,56 @@ class GraphStatusSubPage(SubPage):
                 subgraph_info = {k: v for k, v in sorted(subgraph_info.items(), key=lambda item: item[1])}
             grid = st_grid(*[[1,]*num_in_column]*(math.ceil(1.0*len(subgraph_info)/num_in_column)))
             for i, (graph_name, size) in enumerate(subgraph_info.items()):
-                grid.metric(graph_name, size)
+                grid.metric(graph_name, size, help=subgraph_help[graph_name])
+    
+    @st.fragment
+    @timer_wrapper
+    def display_dataset_profile(self):
+        import json
+        profile = get_dataset_profile()
+        namespace_manager = self.ifc_schema_dataset.namespace_manager
+        def shorten(iri: str) -> str:
+            return rdflib.URIRef(iri).n3(namespace_manager)
+        
+        grid = st_grid([4, 1, 1])
+        graph_name = grid.selectbox("选择子图", list(profile.graphs.keys()), key="profile_graph", label_visibility="collapsed")
+        grid.download_button("下载JSON", json.dumps(profile.to_json(), ensure_ascii=False), 
+                             file_name=f"dataset_profile_{profile.dataset_version}.json", mime="application/json", use_container_width=True)
+        grid.download_button("下载VoID", profile.to_void().serialize(format="turtle"), 
+                             file_name=f"dataset_profile_{profile.dataset_version}.ttl", mime="text/turtle", use_container_width=True)
+        graph_profile = profile.get_graph_profile(graph_name)
+        if not graph_profile:
+            return
+        
+        grid = st_grid([1,1,1,1,1,1])
+        grid.metric("三元组", graph_profile["triples"])
+        grid.metric("实体", graph_profile["entities"])
+        grid.metric("不同主语", graph_profile["distinctSubjects"])
+        grid.metric("不同宾语", graph_profile["distinctObjects"])
+        grid.metric("谓词", graph_profile["properties"])
+        grid.metric("类", graph_profile["classes"])
+        
+        st.dataframe(
+            pd.DataFrame([
+                {"Predicate": shorten(predicate), "Triples": stats["triples"], "DistinctSubjects": stats["distinctSubjects"],
+                 "DistinctObjects": stats["distinctObjects"], "MaxPerSubject": stats["maxPerSubject"], "AvgPerSubject": round(stats["avgPerSubject"], 2)}
+                for predicate, stats in graph_profile["propertyPartition"].items()
+            ], columns=["Predicate", "Triples", "DistinctSubjects", "DistinctObjects", "MaxPerSubject", "AvgPerSubject"]).sort_values("Triples", ascending=False),
+            use_container_width=True,
+            hide_index=True,
+        )
+        grid = st_grid([2, 1, 1])
+        grid.dataframe(
+            pd.DataFrame({"Class": [shorten(clss) for clss in graph_profile["classPartition"].keys()], 
+                          "Entities": list(graph_profile["classPartition"].values())}).sort_values("Entities", ascending=False),
+            use_container_width=True, hide_index=True)
+        grid.dataframe(
+            pd.DataFrame({"Language": list(graph_profile["languages"].keys()), "Literals": list(graph_profile["languages"].values())}),
+            use_container_width=True, hide_index=True)
+        grid.dataframe(
+            pd.DataFrame({"Datatype": [shorten(datatype) for datatype in graph_profile["datatypes"].keys()], 
+                          "Literals": list(graph_profile["datatypes"].values())}),
+            use_container_width=True, hide_index=True)
     
     @st.fragment
     @timer_wrapper
@@ -87,90 +134,13 @@ class GraphStatusSubPage(SubPage):
             column_order=["Prefix", "Namespace"],
         )
     
-    @timer_wrapper
-    def _get_inheritance_map(self, echarts_graph_info, predicate: rdflib.URIRef, obj_range: List[str]):
-        import numpy as np
-        inheritance_map = {}
-        degrees = {}
-        pred_label = predicate.n3(self.ifc_schema_dataset.namespace_manager)
-        obj_range_copy = set(obj_range.copy())
-        category_map = {}
-        for s, o in self.ifc_schema_dataset.subject_objects(predicate=predicate, unique=True):
-            # 将RDF对象转换为缩写
-            s_label = s.n3(self.ifc_schema_dataset.namespace_manager)
-            o_label = o.n3(self.ifc_schema_dataset.namespace_manager)
-            if o not in obj_range:
-                if o_label.startswith("_:"):
-                    continue
-                else:
-                    obj_range_copy.add(o)
-            
-            if o_label not in inheritance_map:
-                inheritance_map[o_label] = []
-            inheritance_map[o_label].append(s_label)
-            if s_label not in degrees:
-                degrees[s_label] = 1
-            else:
-                degrees[s_label] += 1
-            if o_label not in degrees:
-                degrees[o_label] = 1
-            else:
-                degrees[o_label] += 1
-            # 在有向图中添加边，边的标签为谓词
-            echarts_graph_info["links"].append(
-                EchartsUtility.create_normal_edge(
-                    s_label, o_label, 
-                    label=pred_label
-                )
-            )
-        
-        refreshed_degrees = {}
-        
-        for label in degrees:
-            GraphAlgoUtility.refresh_degree(degrees, inheritance_map, label, refreshed_degrees)    
-        
-        nodes_initiated = set()
-        for i, clss in enumerate(obj_range_copy):
-            s_label = clss.n3(self.ifc_schema_dataset.namespace_manager)
-            if s_label in nodes_initiated:
-                continue
-            nodes_initiated.add(s_label)
-            namespace = s_label.split(':')[0]
-            if namespace not in category_map:
-                category_map[namespace] = len(category_map)
-                echarts_graph_info["categories"].append({
-                    "name": namespace
-                })
-            echarts_graph_info["nodes"].append({
-                "id": s_label,
-                "name": s_label,
-                "category": category_map[namespace],
-                "symbol": 'circle',
-                "symbolSize":10 + np.log(refreshed_degrees[s_label]) * 7 if s_label in refreshed_degrees else 10,
-                # "symbolSize":[200, 20],
-                "draggable": False,
-                "value": clss
-            })
-        
-    
     @st.fragment
     @timer_wrapper         
     def render_class_hierarchy(self, option_to_label_visualization: bool=False):
-        echarts_graph_info = {}
-        echarts_graph_info["nodes"] = []
-        echarts_graph_info["links"] = []
-        echarts_graph_info["categories"] = []
-        # echarts_graph_info["categories"].append({"name": "Class"})
-        
-        # id_map = {}
-        type_list = self.classes
-        
-        # id_map[RDFS.subClassOf.n3(self.ifc_schema_dataset.namespace_manager)] = RDFS.subClassOf
-        self._get_inheritance_map(echarts_graph_info, RDFS.subClassOf, type_list)
-        
-        # echarts_graph_info["label"] = 
+        # 继承图的节点与边由共享的查询服务构建一次，各会话直接复用
+        hierarchy = get_class_hierarchy()
         s = st_echarts(
-            EchartsUtility.create_normal_echart_options(echarts_graph_info, f"Class Hierarchy\n\nTotal:{len(type_list)}", label_visible=option_to_label_visualization), 
+            EchartsUtility.create_normal_echart_options(hierarchy.echarts_graph_info, f"Class Hierarchy\n\nTotal:{len(hierarchy.obj_range)}", label_visible=option_to_label_visualization), 
             height="500px",
             events={
                 "click": "function(params) { return params.value }",
@@ -181,26 +151,8 @@ class GraphStatusSubPage(SubPage):
     @st.fragment
     @timer_wrapper
     def render_property_hierarchy(self, option_to_label_visualization: bool=False):
-        echarts_graph_info = {}
-        echarts_graph_info["nodes"] = []
-        echarts_graph_info["links"] = []
-        echarts_graph_info["categories"] = []
-        # echarts_graph_info["categories"].append({"name": "Property"})
-        
-        properties = self.properties
-        
-        props_to_df = {"Namespace":[], "PropType":[], "LocalName":[], "URIRef":[]}
-        for prop_type in ["ObjectProperty", "DatatypeProperty", "AnnotationProperty"]:
-            for prop in properties[prop_type]:
-                prop_label = prop.n3(self.ifc_schema_dataset.namespace_manager)
-                props_to_df["Namespace"].append(prop_label.split(":")[0])
-                props_to_df["PropType"].append(prop_type)
-                props_to_df["LocalName"].append(prop_label)
-                props_to_df["URIRef"].append(prop)
-        self._get_inheritance_map(echarts_graph_info, RDFS.subPropertyOf, props_to_df["URIRef"])
-        
-        options = EchartsUtility.create_normal_echart_options(echarts_graph_info, f"Property Hierarchy\n\nTotal:{len(props_to_df['URIRef'])}", label_visible=option_to_label_visualization)
-        # st.write(options)
+        hierarchy = get_property_hierarchy()
+        options = EchartsUtility.create_normal_echart_options(hierarchy.echarts_graph_info, f"Property Hierarchy\n\nTotal:{len(hierarchy.obj_range)}", label_visible=option_to_label_visualization)
         s = st_echarts(
             options=options,
             height="500px",
@@ -506,6 +458,8 @@ class GraphStatusSubPage(SubPage):
         
         with maintab1.container():
             self.display_subgraph_statistics()
+            with st.expander("数据集画像（VoID）"):
+                self.display_dataset_profile()
             
         with maintab2.container():
             self.display_namespaces()
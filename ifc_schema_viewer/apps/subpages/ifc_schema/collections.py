@@ -11,6 +11,8 @@ from typing import List, Optional, Any, Dict, Annotated, Type
 
 from ifc_schema_viewer.utils import EchartsUtility, timer_wrapper
 
+from ...caches import get_collection_members
+from ...widget_keys import widget_key_scope
 from .individuals import IfcConceptRenderer
 
 ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
@@ -34,26 +36,8 @@ class ConceptCollectionInfo(BaseModel):
     
     @timer_wrapper
     def _retrieve_members(self):
-        filter_condition = " || ".join([f"?express_type = <{type}>" for type in self.express_types])
-        filter_condition = f"FILTER ({filter_condition})"
-        query_str = f"""
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX owl: <http://www.w3.org/2002/07/owl#>
-        SELECT DISTINCT ?individual ?individual_name ?express_type
-        WHERE {{
-            ?individual rdf:type ?express_type ;
-                <{ONT["name"]}> ?individual_name.
-            {filter_condition}
-        }}
-        """
-        results = self.rdf_graph.query(query_str)
-        for result in results:
-            self._members[result.individual_name] = {
-                "iri": result.individual,
-                "name": result.individual_name,
-                "express_type": result.express_type.n3(self.namespace_manager)
-            }
+        # 成员表由所有会话共享，单次扫描即可得到全部 express 类型的成员
+        self._members = get_collection_members().get_members(self.express_types)
 
     def model_post_init(self, __context):
         # Check if the rdf_graph is not None and isinstance of rdflib.Graph
@@ -82,7 +66,7 @@ class ConceptCollectionInfo(BaseModel):
                 containers = [st.container(),]
             for name, container in zip(selections, containers):
                 member = members[name]
-                with container:
+                with container, widget_key_scope(self.express_types[0]):
                     IfcConceptRenderer.display_selected_individual_info(
                         express_type=member["express_type"],
                         individual_iri=member["iri"],
@@ -9,7 +9,18 @@ from streamlit_extras.grid import grid as st_grid
 from pydantic import BaseModel, PrivateAttr, Field
 from typing import List, Optional, Any, Dict, Annotated, Type
 
-from ifc_schema_viewer.utils import EchartsUtility
+from ifc_schema_viewer.utils import EchartsUtility, timer_wrapper, span, get_metrics_registry
+from ifc_schema_viewer.core import PsetBatchValidator, Concept, INTERACTIVE
+from ...caches import (
+    get_attribute_references, 
+    get_datatype_usages,
+    get_schema_validators,
+    get_query_service,
+    record_concept_access,
+    run_scheduled
+)
+from ...widget_keys import allocate_widget_key, widget_key_scope
+import pandas as pd
 import random
 
 ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
@@ -32,16 +43,28 @@ class ConceptInfo(BaseModel):
         else:
             return self._definitions.replace("\n", "\n\n")
     
-    _seed: int = PrivateAttr(default=0)
-    @property
-    def seed(self):
-        return self._seed
-    
     rdf_graph: Any = Field(description="The RDF graph containing the concept information")
     
+    _concept: Optional[Concept] = PrivateAttr(default=None)
+    @property
+    def concept(self) -> Optional[Concept]:
+        return self._concept
+    
     def model_post_init(self, __context):
         if not isinstance(self.rdf_graph, rdflib.Graph):
             raise ValueError("rdf_graph must be an instance of rdflib.Graph")
+        # 概念数据由 core 层查询服务构建，并在会话之间共享；未缓存时作为交互式查询排队执行
+        query_service = get_query_service()
+        if query_service.is_concept_cached(self.iri):
+            self._concept = query_service.get_concept(self.iri, self.express_type)
+        else:
+            self._concept = run_scheduled(lambda: query_service.get_concept(self.iri, self.express_type), INTERACTIVE)
+        # IRI 不在图中或其 EXPRESS 类型无对应的概念模型时，查询服务返回 None
+        self._definitions = self._concept.definitions if self._concept is not None else None
+
+    @property
+    def found(self) -> bool:
+        return self._concept is not None
 
     @property
     def namespace_manager(self):
@@ -51,118 +74,82 @@ class ConceptInfo(BaseModel):
     def label(self):
         return rdflib.URIRef(self.iri).fragment
     
+    @property
+    def applicable_pset_templates(self):
+        """以该概念为数据类型的属性集模板及属性，由预计算的使用索引直接给出"""
+        return get_datatype_usages().get_usages(self.iri)
+    
+    def _display_referencing_pset_templates(self, container):
+        with container:
+            st.write("#### *Referencing Property Set Templates*")
+            selected = st.dataframe(
+                self.applicable_pset_templates,
+                hide_index=True,
+                use_container_width=True,
+                selection_mode="single-row",
+                on_select="rerun", column_order=["Property Set", "Property"],
+                key=allocate_widget_key(f"{self.iri}_referencing_pset_template")
+            )
+        if selected["selection"]["rows"]:
+            selected_index = selected["selection"]["rows"][0]
+            pset = self.applicable_pset_templates[selected_index]
+            IfcConceptRenderer.display_selected_individual_info(pset["express type"], pset["pset template iri"], self.rdf_graph)
+    
     def display(self, container):
         raise NotImplementedError("Subclasses must implement the display method")
 
 class TypeInfo(ConceptInfo):
     _express_type: str = PrivateAttr("express:Type")
     
-    _is_referenced_by_entities: List[str] = PrivateAttr(default_factory=list)
+    _is_referenced_by_entities: Optional[List[Dict[str, Any]]] = PrivateAttr(default=None)
     @property
     def is_referenced_by_entities(self):
+        # 继承展开开销较大，首次访问时才由反向索引生成
+        if self._is_referenced_by_entities is None:
+            self._is_referenced_by_entities = get_attribute_references().get_referencing_entities(self.iri)
         return self._is_referenced_by_entities
     
-    def model_post_init(self, __context):
-        super().model_post_init(__context)
-        
-        # 定义
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?definitions
-            WHERE {{
-                <{self.iri}> <{ONT["definitions"]}> ?definitions.
-            }}"""
-        )
-        for result_row in results:
-            self._definitions = result_row.definitions
-        
-        # 被哪些实体引用
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?entity_name ?entity ?attribute_name ?direct_attr_num ?cardinality
-            WHERE {{
-                ?attr <{ONT["attrRange"]}> <{self.iri}> ;
-                    <{ONT["name"]}> ?attribute_name;
-                    <{ONT["direct_attr_num"]}> ?direct_attr_num;
-                    <{ONT["cardinality"]}> ?cardinality.
-                ?direct_entity <{ONT["hasDirectAttribute"]}> ?attr;
-                    <{ONT["superClassOf"]}>* ?entity.
-                ?entity <{ONT["name"]}> ?entity_name.
-                
-            }}"""
-        )
-        for result_row in results:
-            self.is_referenced_by_entities.append({
-                "entity": result_row.entity_name,
-                "attribute": result_row.attribute_name,
-                "entity iri": result_row.entity,
-                "direct_attr_num": result_row.direct_attr_num,
-                "cardinality": result_row.cardinality
-            })
+    _page_size: int = PrivateAttr(default=100)
+    
     def display(self, container):
+        referencing_entities = self.is_referenced_by_entities
+        num_pages = max(1, -(-len(referencing_entities) // self._page_size))
         with container:
             st.write("#### *Referencing Entities*")
-            while True:
-                try:
-                    selected = st.dataframe(
-                        self.is_referenced_by_entities, hide_index=True, use_container_width=True,
-                        column_order=["entity", "direct_attr_num", "attribute", "cardinality"], selection_mode="single-row",
-                        on_select="rerun",
-                        key=f"{self.seed}_{self.iri}_referencing_entities"
-                    )
-                    break
-                except Exception as e:
-                    self._seed += 1
+            # 被引用的实体可能多达上千条，分页展示
+            if num_pages > 1:
+                page = st.number_input(
+                    f"共 {len(referencing_entities)} 条，页码 (1-{num_pages})", min_value=1, max_value=num_pages, value=1, step=1,
+                    key=allocate_widget_key(f"{self.iri}_referencing_entities_page")
+                )
+            else:
+                page = 1
+            page_start = (page - 1) * self._page_size
+            # 键中带页码：选中的行号是相对本页的，翻页后不沿用上一页的选择
+            selected = st.dataframe(
+                referencing_entities[page_start:page_start + self._page_size], hide_index=True, use_container_width=True,
+                column_order=["entity", "direct_attr_num", "attribute", "cardinality"], selection_mode="single-row",
+                on_select="rerun",
+                key=allocate_widget_key(f"{self.iri}_referencing_entities_{page}")
+            )
                 
         if selected["selection"]["rows"]:
-            selected_index = selected["selection"]["rows"][0]
-            entity = self.is_referenced_by_entities[selected_index]
+            selected_index = page_start + selected["selection"]["rows"][0]
+            entity = referencing_entities[selected_index]
             IfcConceptRenderer.display_selected_individual_info("express:Entity", entity["entity iri"], self.rdf_graph)
 
 
 class EnumInfo(TypeInfo):
-    _members: List[Dict[str, str]] = PrivateAttr(default_factory=list)
     @property
     def members(self):
-        return self._members
+        return self.concept.members
     
     _express_type: str = PrivateAttr("express:Enum")
     
-    def model_post_init(self, __context):
-        super().model_post_init(__context)
-        
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?member_name ?member_description
-            WHERE {{
-                <{self.iri}> <{ONT["hasValue"]}> ?member .
-                ?member a <{ONT["EnumValue"]}>;
-                    <{ONT["name"]}> ?member_name;
-                    <{ONT["description"]}> ?member_description.
-            }}
-            """
-        )
-        for result_row in results:
-            self.members.append({
-                "enum value": result_row.member_name,
-                "description": result_row.member_description
-            })
-    
     def recursive_to_input(self):
-        while True:
-            try:
-                value = st.selectbox(f"{self.seed}_{self.iri}_input", 
-                                     [mem["enum value"] for mem in self.members], 
-                                     label_visibility="collapsed")
-                break
-            except:
-                self._seed += 1
+        value = st.selectbox(f"{self.iri}_input", 
+                             [mem["enum value"] for mem in self.members], 
+                             label_visibility="collapsed", key=allocate_widget_key(f"{self.iri}_input"))
         return value
     
     def display(self, container):
@@ -177,79 +164,15 @@ class EnumInfo(TypeInfo):
             st.write(value)
             
 class PropertyEnumInfo(ConceptInfo):
-    _members: List[Dict[str, str]] = PrivateAttr(default_factory=list)
     @property
     def members(self):
-        return self._members
+        return self.concept.members
     
     _express_type: str = PrivateAttr("express:PropertyEnumeration")
-    
-    _applicable_pset_templates: List[Dict[str, str]] = PrivateAttr(default_factory=list)
-    @property
-    def applicable_pset_templates(self):
-        return self._applicable_pset_templates
 
-    def model_post_init(self, __context):
-        super().model_post_init(__context)
-
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?definitions
-            WHERE {{
-                <{self.iri}> <{ONT["definitions"]}> ?definitions.
-            }}"""
-        )
-        for result_row in results:
-            self._definitions = result_row.definitions
-
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?member_name ?member_description
-            WHERE {{
-                <{self.iri}> <{ONT["hasValue"]}> ?member .
-                ?member a <{ONT["EnumValue"]}>;
-                    <{ONT["name"]}> ?member_name;
-                    <{ONT["description"]}> ?member_description.
-            }}
-            """
-        )
-        for result_row in results:
-            self.members.append({
-                "enum value": result_row.member_name,
-                "description": result_row.member_description
-            })
-
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?pset_template ?pset_template_name ?prop ?prop_name
-            WHERE {{
-                ?prop <{ONT["dataType"]}> <{self.iri}>;
-                    <{ONT['name']}> ?prop_name.
-                ?pset_template <{ONT["hasPropTemplate"]}> ?prop ;
-                    <{ONT["name"]}> ?pset_template_name.
-            }}
-            """
-        )
-        for result_row in results:
-            self.applicable_pset_templates.append({
-                "pset template iri": result_row.pset_template,
-                "Property Set": result_row.pset_template_name,
-                "property iri": result_row.prop,
-                "Property": result_row.prop_name
-            })
     def recursive_to_input(self):
-        while True:
-            try:
-                value = st.selectbox(f"{self.seed}_{self.iri}_input", [mem["enum value"] for mem in self.members], label_visibility="collapsed")
-                break
-            except:
-                self._seed += 1
+        value = st.selectbox(f"{self.iri}_input", [mem["enum value"] for mem in self.members], label_visibility="collapsed",
+                             key=allocate_widget_key(f"{self.iri}_input"))
         return value
             
     def display(self, container):
@@ -258,25 +181,7 @@ class PropertyEnumInfo(ConceptInfo):
             st.write("#### *Enum Values*")
             st.dataframe(self.members, hide_index=True, use_container_width=True)
             
-        with container:
-            st.write("#### *Referencing Property Set Templates*")
-            while True:
-                try:
-                    selected = st.dataframe(
-                        self.applicable_pset_templates,
-                        hide_index=True,
-                        use_container_width=True,
-                        selection_mode="single-row",
-                        on_select="rerun", column_order=["Property Set", "Property"],
-                        key=f"{self.seed}_{self.iri}_referencing_pset_template"
-                    )
-                    break
-                except:
-                    self._seed += 1
-        if selected["selection"]["rows"]:
-            selected_index = selected["selection"]["rows"][0]
-            pset = self.applicable_pset_templates[selected_index]
-            IfcConceptRenderer.display_selected_individual_info("express:PropertySetTemplate", pset["pset template iri"], self.rdf_graph)
+        self._display_referencing_pset_templates(container)
             
         with container:
             st.write("#### *Test Instantiation*")
@@ -285,49 +190,21 @@ class PropertyEnumInfo(ConceptInfo):
 
 
 class SelectInfo(TypeInfo):
-    _members: List[Dict[str, str]] = PrivateAttr(default_factory=list)
     @property
     def members(self):
-        return self._members
+        return self.concept.members
 
     _express_type: str = PrivateAttr("express:Select")
 
-    def model_post_init(self, __context):
-        super().model_post_init(__context)
-
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?member ?member_name ?express_type
-            WHERE {{
-                <{self.iri}> <{ONT["hasValue"]}> ?member .
-                ?member <{ONT["name"]}> ?member_name;
-                    a ?express_type.
-                FILTER (STRSTARTS(str(?express_type), "{ONT}"))
-            }}
-            """
-        )
-        for result_row in results:
-            self.members.append({
-                "select value": result_row.member_name,
-                "express type": result_row.express_type.n3(self.namespace_manager),
-                "iri": result_row.member
-            })
     def display(self, container):
         with container:
             stoggle("Definitions", self.definitions)
             st.write(f"#### *Select Values*")
-            while True:
-                try:
-                    selected = st.dataframe(
-                        self.members, hide_index=True, 
-                        use_container_width=True, selection_mode="single-row",
-                        on_select="rerun", column_order=["select value", "express type"],
-                        key=f"{self.seed}_{self.iri}_select_members")
-                    break
-                except:
-                    self._seed += 1
+            selected = st.dataframe(
+                self.members, hide_index=True, 
+                use_container_width=True, selection_mode="single-row",
+                on_select="rerun", column_order=["select value", "express type"],
+                key=allocate_widget_key(f"{self.iri}_select_members"))
         if selected["selection"]["rows"]:
             selected_index = selected["selection"]["rows"][0]
             member = self.members[selected_index]
@@ -336,165 +213,22 @@ class SelectInfo(TypeInfo):
 
 class EntityInfo(ConceptInfo):
     _express_type: str = PrivateAttr("express:Entity")
-    _super_entities : List[Dict[str, str]] = PrivateAttr(default_factory=list)
-    _sub_entities : List[Dict[str, str]] = PrivateAttr(default_factory=list)
-    _direct_attributes : List[Dict[str, str]] = PrivateAttr(default_factory=list)
-    _inverse_attributes : List[Dict[str, str]] = PrivateAttr(default_factory=list)
-    _pset_templates: List[Dict[str, str]] = PrivateAttr(default_factory=list)
     
     @property
     def super_entities(self):
-        return self._super_entities
+        return self.concept.super_entities
     @property
     def sub_entities(self):
-        return self._sub_entities
+        return self.concept.sub_entities
     @property
     def direct_attributes(self):
-        return self._direct_attributes
+        return self.concept.direct_attributes
     @property
     def inverse_attributes(self):
-        return self._inverse_attributes
+        return self.concept.inverse_attributes
     @property
     def pset_templates(self):
-        return self._pset_templates
-
-    def model_post_init(self, __context):
-        super().model_post_init(__context)
-
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?definitions
-            WHERE {{
-                <{self.iri}> <{ONT["definitions"]}> ?definitions.
-            }}"""
-        )
-        for result_row in results:
-            self._definitions = result_row.definitions
-
-        # 父实体
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?super_entity ?super_entity_name ?definitions
-            WHERE {{
-                <{self.iri}> <{ONT["subClassOf"]}>+ ?super_entity .
-                ?super_entity <{ONT["name"]}> ?super_entity_name;
-                    <{ONT["definitions"]}> ?definitions.
-            }}"""
-        )
-        for result_row in results:
-            self.super_entities.append({
-                "type": "express:Entity",
-                "name": result_row.super_entity_name,
-                "iri": result_row.super_entity,
-                "definitions": result_row.definitions
-            })
-            
-        # 子实体
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?sub_entity ?sub_entity_name ?definitions
-            WHERE {{
-                ?sub_entity <{ONT["subClassOf"]}>+ <{self.iri}> .
-                ?sub_entity <{ONT["name"]}> ?sub_entity_name;
-                    <{ONT["definitions"]}> ?definitions.
-            }}"""
-        )
-        for result_row in results:
-            self.sub_entities.append({
-                "type": "express:Entity",
-                "name": result_row.sub_entity_name,
-                "iri": result_row.sub_entity,
-                "definitions": result_row.definitions
-            })
-        # 直接属性
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?attr_name ?description ?optional ?direct_attr_num ?cardinality ?attrRange ?express_type
-            WHERE {{
-                <{self.iri}> <{ONT["hasDirectAttribute"]}> ?attr .
-                ?attr <{ONT["name"]}> ?attr_name;
-                    <{ONT["is_optional"]}> ?optional;
-                    <{ONT["description"]}> ?description;
-                    <{ONT["direct_attr_num"]}> ?direct_attr_num;
-                    <{ONT["cardinality"]}> ?cardinality;
-                    <{ONT["attrRange"]}> ?attrRange.
-                ?attrRange a ?express_type.
-                FILTER (STRSTARTS(str(?express_type), "{ONT}"))
-            }}"""
-        )
-        for result_row in results:
-            self.direct_attributes.append({
-                "#": int(result_row.direct_attr_num),
-                "name": result_row.attr_name,
-                "optional": "T" if result_row.optional else "F",
-                "cardinality": result_row.cardinality,
-                "range": result_row.attrRange.fragment,
-                "express type": result_row.express_type.n3(self.rdf_graph.namespace_manager),
-                "attr datatype": result_row.attrRange,
-                "description": result_row.description,
-            })
-        self.direct_attributes.sort(key=lambda x: x["#"])
-        
-        # 间接属性
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?attr_name ?description ?optional ?direct_attr_num ?cardinality ?attrRange ?express_type
-            WHERE {{
-                <{self.iri}> <{ONT["hasInverseAttribute"]}> ?attr .
-                ?attr <{ONT["name"]}> ?attr_name;
-                    <{ONT["is_optional"]}> ?optional;
-                    <{ONT["description"]}> ?description;
-                    <{ONT["cardinality"]}> ?cardinality;
-                    <{ONT["attrRange"]}> ?attrRange.
-                ?attrRange a ?express_type.
-                FILTER (STRSTARTS(str(?express_type), "{ONT}"))
-            }}"""
-        )
-        
-        for result_row in results:
-            self.inverse_attributes.append({
-                "#": "",
-                "name": result_row.attr_name,
-                "optional": "T" if result_row.optional else "F",
-                "cardinality": result_row.cardinality,
-                "range": result_row.attrRange.fragment,
-                "express type": result_row.express_type.n3(self.namespace_manager),
-                "attr datatype": result_row.attrRange,
-                "description": result_row.description,
-            })
-            
-        # 关联的属性集模板
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?pset ?pset_name ?definitions ?express_type
-            WHERE {{
-                <{self.iri}> <{ONT['subClassOf']}>* ?ae.
-                ?pset a ?express_type;
-                    <{ONT["applicableTo"]}> ?ae;
-                    <{ONT["name"]}> ?pset_name;
-                    <{ONT["definitions"]}> ?definitions.
-                FILTER (STRSTARTS(str(?express_type), "{ONT}"))
-            }}"""
-        )
-        for result_row in results:
-            self.pset_templates.append({
-                "name": result_row.pset_name,
-                "iri": result_row.pset,
-                "definitions": result_row.definitions,
-                "express type": result_row.express_type.n3(self.namespace_manager)
-            })
+        return self.concept.pset_templates
     
     def _display_super_entities(self, container):
         with container:
@@ -502,16 +236,11 @@ class EntityInfo(ConceptInfo):
             st.write(f"#### *Super Entities*")
             selected_index = None
             if self.super_entities:
-                while True:
-                    try:
-                        selected = st.dataframe(
-                            self.super_entities, hide_index=True, 
-                            use_container_width=True, selection_mode="single-row",
-                            on_select="rerun", column_order=["type", "name", "definitions"],
-                            key=f"{self.seed}_{self.iri}_super_entities")
-                        break
-                    except:
-                        self._seed += 1
+                selected = st.dataframe(
+                    self.super_entities, hide_index=True, 
+                    use_container_width=True, selection_mode="single-row",
+                    on_select="rerun", column_order=["type", "name", "definitions"],
+                    key=allocate_widget_key(f"{self.iri}_super_entities"))
                         
                 if selected["selection"]["rows"]:
                     selected_index = selected["selection"]["rows"][0]
@@ -526,16 +255,11 @@ class EntityInfo(ConceptInfo):
             st.write(f"#### *Sub Entities*")
             selected_index = None
             if self.sub_entities:
-                while True:
-                    try:
-                        selected = st.dataframe(
-                            self.sub_entities, hide_index=True, 
-                            use_container_width=True, selection_mode="single-row",
-                            on_select="rerun", column_order=["type", "name", "definitions"],
-                            key=f"{self.seed}_{self.iri}_sub_entities")
-                        break
-                    except:
-                        self._seed += 1
+                selected = st.dataframe(
+                    self.sub_entities, hide_index=True, 
+                    use_container_width=True, selection_mode="single-row",
+                    on_select="rerun", column_order=["type", "name", "definitions"],
+                    key=allocate_widget_key(f"{self.iri}_sub_entities"))
                     
                 if selected["selection"]["rows"]:
                     selected_index = selected["selection"]["rows"][0]
@@ -548,17 +272,12 @@ class EntityInfo(ConceptInfo):
     def _display_direct_attributes(self, container):
         with container:
             st.write(f"#### *Direct Attributes*")
-            while True:
-                try:
-                    selected = st.dataframe(
-                        self.direct_attributes, hide_index=True,
-                        use_container_width=True,
-                        column_order=["#", "name", "optional", "cardinality", "range", "express type", "description"],
-                        selection_mode="single-row", on_select="rerun",
-                        key=f"{self.seed}_{self.iri}_direct_attributes")
-                    break
-                except:
-                    self._seed += 1
+            selected = st.dataframe(
+                self.direct_attributes, hide_index=True,
+                use_container_width=True,
+                column_order=["#", "name", "optional", "cardinality", "range", "express type", "description"],
+                selection_mode="single-row", on_select="rerun",
+                key=allocate_widget_key(f"{self.iri}_direct_attributes"))
             
         if selected["selection"]["rows"]:
             direct_attr_selected_index = selected["selection"]["rows"][0]
@@ -568,17 +287,12 @@ class EntityInfo(ConceptInfo):
     def _display_inverse_attributes(self, container):
         with container:
             st.write(f"#### *Inverse Attributes*")
-            while True:
-                try:
-                    selected = st.dataframe(
-                        self.inverse_attributes, hide_index=True,
-                        use_container_width=True,
-                        column_order=["#", "name", "optional", "cardinality", "range", "express type", "description"],
-                        selection_mode="single-row", on_select="rerun",
-                        key=f"{self.seed}_{self.iri}_inverse_attributes")
-                    break
-                except:
-                    self._seed += 1
+            selected = st.dataframe(
+                self.inverse_attributes, hide_index=True,
+                use_container_width=True,
+                column_order=["#", "name", "optional", "cardinality", "range", "express type", "description"],
+                selection_mode="single-row", on_select="rerun",
+                key=allocate_widget_key(f"{self.iri}_inverse_attributes"))
         if selected["selection"]["rows"]:
             inverse_attr_selected_index = selected["selection"]["rows"][0]
             selected = self.inverse_attributes[inverse_attr_selected_index]
@@ -587,17 +301,12 @@ class EntityInfo(ConceptInfo):
     def _display_pset_templates(self, container):
         with container:
             st.write(f"#### *Pset Templates*")
-            while True:
-                try:
-                    selected = st.dataframe(
-                        self.pset_templates, hide_index=True, 
-                        use_container_width=True,
-                        column_order=["name", "express type", "definitions"],
-                        selection_mode="single-row", on_select="rerun",
-                        key=f"{self.seed}_{self.iri}_pset_templates")
-                    break
-                except:
-                    self._seed += 1
+            selected = st.dataframe(
+                self.pset_templates, hide_index=True, 
+                use_container_width=True,
+                column_order=["name", "express type", "definitions"],
+                selection_mode="single-row", on_select="rerun",
+                key=allocate_widget_key(f"{self.iri}_pset_templates"))
     
         if selected["selection"]["rows"]:
             selected_index = selected["selection"]["rows"][0]
@@ -610,6 +319,22 @@ class EntityInfo(ConceptInfo):
         self._display_direct_attributes(container)
         self._display_inverse_attributes(container)
         self._display_pset_templates(container)
+        self._display_referencing_pset_templates(container)
+
+def primitive_to_input(base_type, label: str, key: str):
+    """根据 EXPRESS 基础类型生成测试实例化的输入控件"""
+    if base_type == "STRING":
+        return st.text_input(label, label_visibility="collapsed", key=key)
+    elif base_type == "REAL":
+        return st.number_input(label, format="%0.6f", label_visibility="collapsed", key=key)
+    elif base_type == "INTEGER":
+        return st.number_input(label, step=1, label_visibility="collapsed", key=key)
+    elif base_type == "BOOLEAN":
+        return st.checkbox(label, label_visibility="collapsed", key=key)
+    elif base_type == "LOGICAL":
+        return st.selectbox(label, ["UNKNOWN", "TRUE", "FALSE"], label_visibility="collapsed", key=key)
+    else:
+        return st.text_input(label, value=f"Unknown type of {base_type}", label_visibility="collapsed", key=key)
 
 class PropRange(BaseModel):
     _ranges: List[str] = PrivateAttr(default_factory=list)
@@ -637,6 +362,10 @@ class PropRange(BaseModel):
     def to_input(self):
         raise NotImplementedError("Subclass must implement this method")
     
+    def validation_spec(self) -> Dict[str, Any]:
+        """批量校验时该属性的约束描述，见 PsetBatchValidator"""
+        raise NotImplementedError("Subclass must implement this method")
+    
 class DerivedPropRange(PropRange):
     def model_post_init(self, __context):
         # check if the property range is a Derived Type
@@ -644,21 +373,9 @@ class DerivedPropRange(PropRange):
             raise ValueError("Property range is not a Derived Type")
     
     def recursive_to_input(self, prop_name, derived_from):
-        if derived_from == "STRING":
-            return st.text_input(f"{prop_name}_derived_type", label_visibility="collapsed")
-        elif derived_from == "REAL":
-            return st.number_input(f"{prop_name}_derived_type", format="%0.6f", label_visibility="collapsed")
-        elif derived_from == "INTEGER":
-            return st.number_input(f"{prop_name}_derived_type", step=1, label_visibility="collapsed")
-        elif derived_from == "BOOLEAN":
-            return st.checkbox(f"{prop_name}_derived_type", label_visibility="collapsed")
-        elif derived_from == "LOGICAL":
-            return st.selectbox(f"{prop_name}_derived_type", ["UNKNOWN", "TRUE", "FALSE"], label_visibility="collapsed")
-        elif derived_from.startswith("Ifc"):
-            self.concept_info = DerivedTypeInfo(iri=INST[derived_from], rdf_graph=self.rdf_graph)
-            return self.recursive_to_input(prop_name, self.concept_info.derived_from)
-        else:
-            return st.text_input(f"{prop_name}_derived_type", value=f"Unknown type of {self.concept_info.derived_from}", label_visibility="collapsed")
+        # 派生链已预先解析到基础类型，无需逐级构造 DerivedTypeInfo
+        base_type = self.concept_info.concept.base_type or derived_from
+        return primitive_to_input(base_type, f"{prop_name}_derived_type", allocate_widget_key(f"{prop_name}_derived_type"))
     
     def to_input(self):
         grid = st_grid([1,3])
@@ -666,9 +383,18 @@ class DerivedPropRange(PropRange):
         with param_name_container:
             st.write(f"**{self.name}**")
         with param_value_container:
-            if self.concept_info.cardinality.toPython() not in [1, "1"]:
+            if self.concept_info.cardinality is not None and self.concept_info.cardinality.toPython() not in [1, "1"]:
                 st.write(f"Cardinality: {self.concept_info.cardinality}")
             self._value = self.recursive_to_input(self.name, self.concept_info.derived_from)
+    
+    def validation_spec(self):
+        return {
+            "name": str(self.name),
+            "kind": "derived",
+            "base_type": self.concept_info.concept.base_type or self.concept_info.derived_from,
+            "cardinality": self.concept_info.cardinality,
+            "validator": get_schema_validators().get(self.concept_info.iri)
+        }
                 
 class PEnumPropRange(PropRange):
     def model_post_init(self, __context):
@@ -682,7 +408,16 @@ class PEnumPropRange(PropRange):
         with param_name_container:
             st.write(f"**{self.name}**")
         with param_value_container:
-            self._value = st.selectbox(f"{self.name}_enum_values", [mem["enum value"] for mem in self.concept_info.members], label_visibility="collapsed")
+            self._value = st.selectbox(f"{self.name}_enum_values", [mem["enum value"] for mem in self.concept_info.members], label_visibility="collapsed",
+                                       key=allocate_widget_key(f"{self.name}_enum_values"))
+    
+    def validation_spec(self):
+        return {
+            "name": str(self.name),
+            "kind": "enum",
+            "values": [mem["enum value"] for mem in self.concept_info.members],
+            "validator": get_schema_validators().get(self.concept_info.iri)
+        }
 
 class EntityPropRange(PropRange):
     def model_post_init(self, __context):
@@ -696,20 +431,22 @@ class EntityPropRange(PropRange):
         with param_name_container:
             st.write(f"**{self.name}** (reference)")
         with param_value_container:
-            self._value = st.number_input(f"{self.name}_instance_id", min_value=1, step=1, label_visibility="collapsed")
+            self._value = st.number_input(f"{self.name}_instance_id", min_value=1, step=1, label_visibility="collapsed",
+                                          key=allocate_widget_key(f"{self.name}_instance_id"))
+    
+    def validation_spec(self):
+        return {"name": str(self.name), "kind": "reference"}
 
 class PsetInfo(ConceptInfo):
     _express_type: str = PrivateAttr("express:PropertySetTemplate")
-    _props: List[Dict[str, str]] = PrivateAttr(default_factory=list)
-    _applicable_entities: List[str] = PrivateAttr(default_factory=list)
     _prop_ranges: List[PropRange] = PrivateAttr(default_factory=list)
     @property
     def props(self):
-        return self._props
+        return self.concept.props
     
     @property
     def applicable_entities(self):
-        return self._applicable_entities
+        return self.concept.applicable_entities
     
     @property
     def prop_ranges(self):
@@ -717,90 +454,37 @@ class PsetInfo(ConceptInfo):
     
     def model_post_init(self, __context):
         super().model_post_init(__context)
+        if not self.found:
+            return
         
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?definitions
-            WHERE {{
-                <{self.iri}> <{ONT["definitions"]}> ?definitions.
-            }}"""
-        )
-        for result_row in results:
-            self._definitions = result_row.definitions
-        
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?prop_name ?description ?data_type ?property_type ?dataType ?express_type ?dataType_express_type
-            WHERE {{
-                <{self.iri}> <{ONT["hasPropTemplate"]}> ?prop .
-                ?prop <{ONT["name"]}> ?prop_name;
-                    <{ONT["data_type"]}> ?data_type;
-                    <{ONT["description"]}> ?description;
-                    <{ONT["dataType"]}> ?dataType.
-                ?dataType a ?dataType_express_type.
-                OPTIONAL {{?prop <{ONT["property_type"]}> ?property_type.}}
-                ?dataType a ?express_type.
-                FILTER (STRSTARTS(str(?express_type), "{ONT}"))
-            }}"""
-        )
-        for result_row in results:
-            self.props.append({
-                "property": result_row.prop_name,
-                "property_type": result_row.property_type,
-                "data_type": result_row.data_type,
-                "dataType": result_row.dataType,
-                "express type": result_row.express_type.n3(self.rdf_graph.namespace_manager),
-                "description": result_row.description
-            })
-            dataType_express_type = result_row.dataType_express_type
+        for prop in self.props:
+            dataType_express_type = prop["range express type"]
             if dataType_express_type == ONT["DerivedType"]:
-                self.prop_ranges.append(
-                    DerivedPropRange(name=result_row.prop_name,
-                                     concept_info=DerivedTypeInfo(iri=result_row.dataType,rdf_graph=self.rdf_graph)))
+                prop_range_class, concept_info_class = DerivedPropRange, DerivedTypeInfo
             elif dataType_express_type == ONT["PropertyEnumeration"]:
-                self.prop_ranges.append(
-                    PEnumPropRange(name=result_row.prop_name,
-                                   concept_info=PropertyEnumInfo(iri=result_row.dataType,rdf_graph=self.rdf_graph)))
+                prop_range_class, concept_info_class = PEnumPropRange, PropertyEnumInfo
             elif dataType_express_type == ONT["Entity"]:
-                self.prop_ranges.append(
-                    EntityPropRange(name=result_row.prop_name,
-                                    concept_info=EntityInfo(iri=result_row.dataType,rdf_graph=self.rdf_graph)))
+                prop_range_class, concept_info_class = EntityPropRange, EntityInfo
             else:
                 st.warning(f"Unknown data type: {dataType_express_type}")
-            
-        results = self.rdf_graph.query(
-            f"""PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?applicable_entity
-            WHERE {{
-                <{self.iri}> <{ONT["applicableTo"]}> ?ae.
-                ?ae <{ONT["superClassOf"]}>* ?applicable_entity.
-            }}"""
-        )
-        for result_row in results:
-            self.applicable_entities.append(result_row.applicable_entity)
+                continue
+            concept_info = concept_info_class(iri=prop["dataType"], rdf_graph=self.rdf_graph)
+            if not concept_info.found:
+                st.warning(f"Data type not found: {prop['dataType']}")
+                continue
+            self.prop_ranges.append(prop_range_class(name=prop["property"], concept_info=concept_info))
     
     def display(self, container):
         with container:
             stoggle("Definitions", self.definitions)
             st.write(f"#### *Properties*")
-            while True:
-                try:
-                    selected = st.dataframe(
-                        self.props, hide_index=True, 
-                        use_container_width=True,
-                        column_order=["property", "property_type", "data_type", "express type", "description"],
-                        on_select="rerun", selection_mode="single-row",
-                        key=f"{self.seed}_{self.iri}_props"
-                    )
-                    break
-                except:
-                    self._seed += 1
+            selected = st.dataframe(
+                self.props, hide_index=True, 
+                use_container_width=True,
+                column_order=["property", "property_type", "data_type", "express type", "description"],
+                on_select="rerun", selection_mode="single-row",
+                key=allocate_widget_key(f"{self.iri}_props")
+            )
         if selected["selection"]["rows"]:
             selected_index = selected["selection"]["rows"][0]
             prop = self.props[selected_index]
@@ -808,17 +492,12 @@ class PsetInfo(ConceptInfo):
             
         with container:
             st.write(f"#### *Applicable entities*")
-            while True:
-                try:
-                    selected = st.dataframe(
-                        {"name":[ae.fragment for ae in self.applicable_entities]}, hide_index=True,
-                        use_container_width=True,
-                        on_select="rerun", selection_mode="single-row",
-                        key=f"{self.seed}_{self.iri}_applicable_entities"
-                    )
-                    break
-                except:
-                    self._seed += 1
+            selected = st.dataframe(
+                {"name":[ae.fragment for ae in self.applicable_entities]}, hide_index=True,
+                use_container_width=True,
+                on_select="rerun", selection_mode="single-row",
+                key=allocate_widget_key(f"{self.iri}_applicable_entities")
+            )
         if selected["selection"]["rows"]:
             selected_index = selected["selection"]["rows"][0]
             entity = self.applicable_entities[selected_index]
@@ -829,10 +508,59 @@ class PsetInfo(ConceptInfo):
             with container.container(border=True):
                 for prange in self.prop_ranges:
                     prange.to_input()
-                submit = st.button("生成实例", key=f"{self.seed}_{self.iri}_submit")
+                submit = st.button("生成实例", key=allocate_widget_key(f"{self.iri}_submit"))
                 
                 if submit:
                     st.write([f"{prange.name}:{prange.value}" for prange in self.prop_ranges])
+        
+        self._display_batch_validation(container)
+    
+    @property
+    def batch_validator(self) -> PsetBatchValidator:
+        return PsetBatchValidator(
+            pset_name=self.label,
+            prop_specs=[prange.validation_spec() for prange in self.prop_ranges]
+        )
+    
+    def _display_batch_validation(self, container):
+        with container:
+            st.write(f"#### *Batch Validation*")
+            with container.container(border=True):
+                validator = self.batch_validator
+                st.download_button(
+                    "下载CSV模板", data=pd.DataFrame(columns=validator.columns).to_csv(index=False),
+                    file_name=f"{self.label}.csv", mime="text/csv",
+                    key=allocate_widget_key(f"{self.iri}_batch_template")
+                )
+                uploaded_file = st.file_uploader(
+                    "上传属性值数据 (CSV/Parquet)，每列对应一个属性", type=["csv", "parquet"],
+                    key=allocate_widget_key(f"{self.iri}_batch_upload")
+                )
+                if uploaded_file is None:
+                    return
+                try:
+                    if uploaded_file.name.lower().endswith(".parquet"):
+                        df = pd.read_parquet(uploaded_file)
+                    else:
+                        df = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+                except ImportError as e:
+                    st.error(f"读取Parquet文件需要安装 pyarrow: {e} ❌")
+                    return
+                except Exception as e:
+                    st.error(f"无法读取上传的文件: {e} ❌")
+                    return
+                
+                report = validator.validate(df)
+                grid = st_grid([1, 1, 1])
+                grid.metric("行数", report["rows"])
+                grid.metric("违规行数", report["invalid_rows"])
+                grid.metric("吞吐量 (行/秒)", f"{report['rows_per_second']:,.0f}")
+                if report["unknown_columns"]:
+                    st.warning(f"以下列不属于该属性集模板，已忽略: {', '.join(map(str, report['unknown_columns']))} ⚠️")
+                if report["invalid_rows"]:
+                    st.dataframe(report["violations"], hide_index=True, use_container_width=True)
+                else:
+                    st.success("所有行均通过校验！🎉")
             
 class QsetInfo(PsetInfo):
     _express_type: str = PrivateAttr("express:QuantitySetTemplate")
@@ -840,64 +568,25 @@ class QsetInfo(PsetInfo):
 class DerivedTypeInfo(TypeInfo):
     _express_type: str = PrivateAttr("express:DerivedType")
     
-    _derived_from: str = PrivateAttr(None)
-    _cardinality: str = PrivateAttr(None)
-    _definitions: str = PrivateAttr(None)
-    
     @property
     def derived_from(self):
-        return self._derived_from
+        return self.concept.derived_from
 
     @property
     def cardinality(self):
-        return self._cardinality
+        return self.concept.cardinality
     
     @property
     def definitions(self):
         return self._definitions
 
-    def model_post_init(self, __context):
-        super().model_post_init(__context)
-
-        results = self.rdf_graph.query(
-            f"""SELECT DISTINCT ?derived_from ?cardinality ?definitions
-            WHERE {{
-                <{self.iri}> <{ONT["derivedFrom"]}> ?derived_from;
-                    <{ONT["definitions"]}> ?definitions;
-                    <{ONT["cardinality"]}> ?cardinality.
-            }}
-            """
-        )
-        for result_row in results:
-            derived_from = result_row.derived_from
-            cardinality = result_row.cardinality
-            if derived_from:
-                derived_from = derived_from.fragment
-            self._derived_from = derived_from
-            self._cardinality = cardinality
-            self._definitions = result_row.definitions
+    @property
+    def derivation_chain(self) -> List[str]:
+        return self.concept.derivation_chain
     
     def recursive_to_input(self, derived_from):
-        while True:
-            try:
-                if derived_from == "STRING":
-                    result = st.text_input(f"{self.seed}_{self.iri}_input", label_visibility="collapsed")
-                elif derived_from == "REAL":
-                    result =  st.number_input(f"{self.seed}_{self.iri}_input", format="%0.6f", label_visibility="collapsed")
-                elif derived_from == "INTEGER":
-                    result =  st.number_input(f"{self.seed}_{self.iri}_input", step=1, label_visibility="collapsed")
-                elif derived_from == "BOOLEAN":
-                    result =  st.checkbox(f"{self.seed}_{self.iri}_input", label_visibility="collapsed")
-                elif derived_from == "LOGICAL":
-                    result = st.selectbox(f"{self.seed}_{self.iri}_input", ["UNKNOWN", "TRUE", "FALSE"], label_visibility="collapsed")
-                elif derived_from.startswith("Ifc"):
-                    result =  self.recursive_to_input(DerivedTypeInfo(iri=INST[self.derived_from], rdf_graph=self.rdf_graph))
-                else:
-                    result =  st.text_input(f"{self.seed}_{self.iri}_input", value=f"Unknown type of {self.concept_info.derived_from}", label_visibility="collapsed")
-                break
-            except:
-                self._seed += 1
-        return result
+        base_type = self.concept.base_type or derived_from
+        return primitive_to_input(base_type, f"{self.iri}_input", allocate_widget_key(f"{self.iri}_input"))
     
     def display(self, container):
         with container:
@@ -909,7 +598,10 @@ class DerivedTypeInfo(TypeInfo):
                 st.write(f"{self.cardinality} *{self.derived_from}*")
             else:
                 st.write(f"*{self.derived_from}*")
+            if len(self.derivation_chain) > 2:
+                st.caption(" → ".join(self.derivation_chain))
         super().display(container)
+        self._display_referencing_pset_templates(container)
         with container:
             st.write(f"#### *Test Instantiation*")
             value = self.recursive_to_input(self.derived_from)
@@ -928,34 +620,6 @@ concept_info_map: Dict[str, Type[ConceptInfo]] = {
         
 class IfcConceptRenderer:
     """Utility class for rendering IFC concepts"""
-    @staticmethod
-    def get_data_schemas(root_node, ifc_schema_graph: rdflib.Graph):
-        results = ifc_schema_graph.query(f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-        SELECT ?data_schema ?ds_name WHERE
-        {{
-            ?data_schema rdf:type <{ONT["Layer"]}> ;
-                skos:inScheme <{root_node}>;
-                <{ONT["name"]}> ?ds_name.
-        }}""")
-        return {result_row["ds_name"]: result_row["data_schema"] for result_row in results}
-    
-    @staticmethod
-    def get_conceptual_groups(layer_node, ifc_schema_graph: rdflib.Graph):
-        results = ifc_schema_graph.query(f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-        SELECT ?conceptual_group ?cg_name ?cg_definitions WHERE
-        {{
-            ?conceptual_group rdf:type <{ONT["Group"]}> ;
-                <{ONT["name"]}> ?cg_name;
-                <{ONT["definitions"]}> ?cg_definitions.
-            <{layer_node}> <{ONT["hasConceptualGroup"]}> ?conceptual_group.
-        }}""")
-        return {result_row["cg_name"]: 
-            {"iri":result_row["conceptual_group"], "definitions":result_row["cg_definitions"]} for result_row in results}
-        
     def get_concepts(conceptual_group_node, ifc_schema_graph: rdflib.Graph):
         results = ifc_schema_graph.query(f"""
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
@@ -988,6 +652,7 @@ class IfcConceptRenderer:
         return concepts_4_df
     
     @staticmethod
+    @timer_wrapper
     def display_selected_individual_info(express_type, individual_iri, ifc_schema_graph: rdflib.Graph):
         if express_type not in concept_info_map:
             return
@@ -995,8 +660,18 @@ class IfcConceptRenderer:
         if st.session_state.get("cached_concept_info", None) is None:
             st.session_state.cached_concept_info = {}
         if st.session_state.cached_concept_info.get(individual_iri, None) is None:
-            st.session_state.cached_concept_info[individual_iri] = concept_info_class(iri=individual_iri, rdf_graph=ifc_schema_graph)
+            get_metrics_registry().increment("concept_info_cache.miss")
+            with span(concept_info_class.__name__, iri=str(individual_iri)):
+                concept_info = concept_info_class(iri=individual_iri, rdf_graph=ifc_schema_graph)
+            if not concept_info.found:
+                # 不缓存，数据集更新后再次打开时重新查询
+                st.warning(f"未找到概念 {rdflib.URIRef(individual_iri).n3(ifc_schema_graph.namespace_manager)} ⚠️")
+                return
+            st.session_state.cached_concept_info[individual_iri] = concept_info
+        else:
+            get_metrics_registry().increment("concept_info_cache.hit")
         concept_info = st.session_state.cached_concept_info[individual_iri]
+        record_concept_access(individual_iri, name=concept_info.label, express_type=express_type)
         
         container = st.expander(label=f"**{concept_info.label}** - {concept_info.express_type}", expanded=True)
         with container:
@@ -1004,7 +679,9 @@ class IfcConceptRenderer:
             st.markdown(f"*{concept_info.express_type}*")
             mdlit(f"@({concept_info.label})(https://ifc43-docs.standards.buildingsmart.org/IFC/RELEASE/IFC4x3/HTML/lexical/{concept_info.label}.htm)")
         
-        concept_info.display(container)
+        # 以概念 IRI 作为一层渲染路径，嵌套渲染的控件键互不冲突
+        with widget_key_scope(individual_iri):
+            concept_info.display(container)
     
     @staticmethod
     def render_selected_instance_echarts(instance_iri, ontology_graph: rdflib.Graph, height=400):
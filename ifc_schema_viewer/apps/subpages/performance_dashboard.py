@@ -0,0 +1,231 @@
+import streamlit as st
+from streamlit_echarts import st_echarts
+from streamlit_extras.grid import grid as st_grid
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import time
+import pandas as pd
+
+from typing import List, Dict, Any
+
+from .base import SubPage
+from ..caches import get_session_registry, get_cache_warmer, get_access_log, get_query_service
+from ifc_schema_viewer.utils import timer_wrapper, get_metrics_registry, get_rss_bytes
+
+def _format_bytes(num_bytes: float) -> str:
+    return f"{num_bytes / 1024 / 1024:.1f} MB"
+
+def _short_name(name: str) -> str:
+    # 只保留类名与方法名，例如 EntityInfo.model_post_init
+    return ".".join(name.rsplit(".", 2)[-2:])
+
+class PerformanceDashboardSubPage(SubPage):
+    """性能监控：各被测函数的耗时分布、缓存命中率、会话与内存、最近的慢查询及上一次重新运行的调用树
+
+    数据均来自进程内的指标登记表（timer_wrapper / span 的耗时直方图、计数器与事件），反映本进程所有会话。
+    """
+    @timer_wrapper
+    def display_function_latencies(self):
+        snapshot = get_metrics_registry().snapshot()
+        if not snapshot:
+            st.info("尚无耗时记录。")
+            return
+        df = pd.DataFrame([{
+            "Function": name,
+            "Count": summary["count"],
+            "MeanMs": round(summary["mean"] * 1000, 2),
+            "P50Ms": round(summary["p50"] * 1000, 2),
+            "P95Ms": round(summary["p95"] * 1000, 2),
+            "P99Ms": round(summary["p99"] * 1000, 2),
+            "MaxMs": round(summary["max"] * 1000, 2),
+            "TotalMs": round(summary["sum"] * 1000, 1),
+        } for name, summary in snapshot.items()]).sort_values("P95Ms", ascending=False)
+
+        search_value = st.text_input("请输入函数名关键词", key="performance_function_search")
+        if search_value:
+            df = df[df["Function"].str.lower().str.contains(search_value.lower(), regex=False)]
+
+        top = df.head(15).iloc[::-1]
+        options = {
+            "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
+            "legend": {"data": ["p50", "p95", "p99"]},
+            "grid": {"left": "3%", "right": "4%", "bottom": "3%", "containLabel": True},
+            "xAxis": {"type": "value", "name": "ms"},
+            "yAxis": {"type": "category", "data": [_short_name(name) for name in top["Function"]]},
+            "series": [
+                {"name": "p50", "type": "bar", "data": top["P50Ms"].tolist()},
+                {"name": "p95", "type": "bar", "data": top["P95Ms"].tolist()},
+                {"name": "p99", "type": "bar", "data": top["P99Ms"].tolist()},
+            ],
+        }
+        st_echarts(options, height=f"{max(len(top) * 40, 200)}px")
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        st.caption("分位数基于每个函数最近 2048 次调用，Count / TotalMs / MaxMs 为进程启动以来的累计值。")
+
+    @timer_wrapper
+    def display_cache_hit_rates(self):
+        counters = get_metrics_registry().get_counters()
+        caches: Dict[str, Dict[str, int]] = {}
+        for name, value in counters.items():
+            cache_name, _, outcome = name.rpartition(".")
+            if outcome in ("hit", "miss"):
+                caches.setdefault(cache_name, {"hit": 0, "miss": 0})[outcome] = value
+        if not caches:
+            st.info("尚无缓存访问记录。")
+            return
+        grid = st_grid(*[[1, 1, 1]] * ((len(caches) + 2) // 3))
+        rows = []
+        for cache_name, outcomes in sorted(caches.items()):
+            total = outcomes["hit"] + outcomes["miss"]
+            hit_rate = outcomes["hit"] / total if total else 0.0
+            grid.metric(cache_name, f"{hit_rate:.1%}", help=f"命中 {outcomes['hit']} 次，未命中 {outcomes['miss']} 次")
+            rows.append({"Cache": cache_name, "Hits": outcomes["hit"], "Misses": outcomes["miss"], "HitRate": round(hit_rate, 4)})
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+    @timer_wrapper
+    def display_warmup(self):
+        cache_warmer = get_cache_warmer()
+        st.subheader("后台预热", divider=True)
+        if cache_warmer is None:
+            st.info("后台预热未启用（IFC_SCHEMA_VIEWER_WARMUP_WORKERS=0）。")
+            return
+        progress = cache_warmer.get_progress()
+        st.progress(progress["completed"] / max(progress["total"], 1),
+                    text="%d/%d 完成（%d 跳过，%d 失败），用时 %.1f s" % (
+                        progress["completed"], progress["total"], progress["skipped"], progress["failed"], progress["elapsed_seconds"]))
+        st.dataframe(pd.DataFrame([{
+            "Task": task["name"],
+            "Status": task["status"],
+            "Ms": round(task["seconds"] * 1000, 1) if task["seconds"] is not None else None,
+        } for task in progress["tasks"]]), use_container_width=True, hide_index=True)
+
+    @timer_wrapper
+    def display_sessions_and_memory(self):
+        session_registry = get_session_registry()
+        sessions = session_registry.get_sessions()
+        active_sessions = [session for session in sessions if session["active"]]
+        load_seconds = st.session_state.get("dataset_load_seconds", None)
+        dataset_bytes = st.session_state.get("dataset_memory_bytes", None)
+
+        grid = st_grid([1, 1, 1, 1, 1])
+        grid.metric("活跃会话", len(active_sessions), help=f"进程内共登记 {len(sessions)} 个会话")
+        grid.metric("会话内存 / 预算", f"{_format_bytes(session_registry.get_total_memory_bytes())} / {session_registry.memory_budget_mb:.0f} MB",
+                    help="超出预算时，空闲超过 %.0f 秒的会话被标记逐出可重建的缓存项，在其下次运行时执行，已逐出 %d 次" % (
+                        session_registry.idle_eviction_seconds, get_metrics_registry().get_counters().get("session_eviction", 0)))
+        grid.metric("进程常驻内存", _format_bytes(get_rss_bytes()))
+        grid.metric("数据集加载耗时", f"{load_seconds:.2f} s" if load_seconds is not None else "-")
+        grid.metric("数据集内存", _format_bytes(dataset_bytes) if dataset_bytes is not None else "-",
+                    help="加载前后常驻内存之差，同一进程中再次加载时可能偏小")
+
+        ctx = get_script_run_ctx()
+        current_session_id = ctx.session_id if ctx is not None else None
+        if sessions:
+            st.dataframe(pd.DataFrame([{
+                "Session": session["session_id"][:8] + (" (当前)" if session["session_id"] == current_session_id else ""),
+                "Active": session["active"],
+                "IdleSeconds": round(session["idle_seconds"], 1),
+                "Reruns": session["reruns"],
+                "LastRerunMs": round(session["last_rerun_seconds"] * 1000, 1),
+                "MemoryMB": round(session["total_memory_bytes"] / 1024 / 1024, 2),
+                "Evictions": session["evictions"],
+                "EvictedMB": round(session["evicted_bytes"] / 1024 / 1024, 2),
+                "PendingEviction": session["pending_eviction"] is not None,
+            } for session in sessions]), use_container_width=True, hide_index=True)
+
+        current = next((session for session in sessions if session["session_id"] == current_session_id), None)
+        if current is not None and current["memory_bytes"]:
+            with st.expander("当前会话状态的内存构成"):
+                st.dataframe(pd.DataFrame(
+                    sorted(({"Key": key, "MemoryMB": round(size / 1024 / 1024, 3)} for key, size in current["memory_bytes"].items()),
+                           key=lambda row: row["MemoryMB"], reverse=True)
+                ), use_container_width=True, hide_index=True)
+        st.caption("会话内存为会话状态的深度大小估计，不含各会话共享的数据集、索引与概念模型；每个会话至多每 %.0f 秒估计一次。" % session_registry.memory_estimate_interval)
+
+    @timer_wrapper
+    def display_slowest_queries(self, top: int = 20):
+        now = time.time()
+        for kind, label in (("sparql", "SPARQL 查询"), ("concept", "概念模型构建")):
+            events = sorted(get_metrics_registry().get_recent_events(kind), key=lambda event: event["seconds"], reverse=True)[:top]
+            st.subheader(label, divider=True)
+            if not events:
+                st.info("尚无记录。")
+                continue
+            st.dataframe(pd.DataFrame([{
+                "Ms": round(event["seconds"] * 1000, 2),
+                "SecondsAgo": round(now - event["timestamp"], 1),
+                **{key: value for key, value in event.items() if key not in ("kind", "seconds", "timestamp")},
+            } for event in events]), use_container_width=True, hide_index=True)
+        st.caption(f"各类事件只保留最近若干条，按耗时取前 {top} 条。")
+
+    @timer_wrapper
+    def display_access_frequency(self, top: int = 50):
+        access_log = get_access_log()
+        concepts = access_log.get_concept_counts()
+        if not concepts:
+            st.info("尚无概念访问记录。")
+            return
+        tab_counts = access_log.get_tab_counts()
+        st.dataframe(pd.DataFrame(
+            sorted(({"Tab": tab or "-", "Opens": count} for tab, count in tab_counts.items()), key=lambda row: row["Opens"], reverse=True)
+        ), use_container_width=True, hide_index=True)
+        hot_concepts = set(access_log.get_hot_concepts())
+        query_service = get_query_service()
+        now = time.time()
+        st.dataframe(pd.DataFrame([{
+            "Concept": concept["name"] or concept["iri"],
+            "ExpressType": concept["express_type"],
+            "Opens": concept["count"],
+            "Hot": concept["iri"] in hot_concepts,
+            # 是否已在共享的概念缓存中，热点概念在数据集加载后预热
+            "Resident": query_service.is_concept_cached(concept["iri"]),
+            "Tabs": ", ".join(f"{tab or '-'} x{count}" for tab, count in concept["tabs"].items()),
+            "SecondsAgo": round(now - concept["last_access"], 1) if concept.get("last_access") else None,
+        } for concept in concepts[:top]]), use_container_width=True, hide_index=True)
+        st.caption(f"每个会话在同一标签页中打开同一概念只计一次，记录跨重启保存在 {access_log.path}；访问最多的 {access_log.hot_set_size} 个概念为热点集合。")
+
+    @timer_wrapper
+    def display_last_rerun(self):
+        rerun_span = st.session_state.get("last_rerun_trace", None)
+        if rerun_span is None:
+            st.info("尚无重新运行记录。")
+            return
+        st.metric("上一次重新运行耗时", f"{rerun_span.duration * 1000:.1f} ms")
+        st.dataframe(pd.DataFrame([{
+            "Function": entry["name"],
+            "Calls": entry["calls"],
+            "TotalMs": round(entry["ms"], 2),
+            "SelfMs": round(entry["self_ms"], 2),
+        } for entry in rerun_span.summarize(top=20)]), use_container_width=True, hide_index=True)
+        min_ms = st.number_input("省略耗时低于该值（ms）的子树", min_value=0.0, value=1.0, step=0.5, key="performance_trace_min_ms")
+        st.code(rerun_span.format_tree(min_ms=min_ms), language="text")
+
+    def render(self):
+        with st.sidebar:
+            st.button("刷新", use_container_width=True, key="performance_dashboard_refresh")
+
+        latency_tab, cache_tab, session_tab, query_tab, access_tab, trace_tab = st.tabs([
+            "⏱️ 函数耗时",
+            "🎯 缓存命中率",
+            "🧠 会话与内存",
+            "🐢 慢查询",
+            "🔥 访问频次",
+            "🌲 上一次重新运行",])
+
+        with latency_tab.container():
+            self.display_function_latencies()
+
+        with cache_tab.container():
+            self.display_cache_hit_rates()
+            self.display_warmup()
+
+        with session_tab.container():
+            self.display_sessions_and_memory()
+
+        with query_tab.container():
+            self.display_slowest_queries()
+
+        with access_tab.container():
+            self.display_access_frequency()
+
+        with trace_tab.container():
+            self.display_last_rerun()
@@ -13,7 +13,13 @@ from langchain_core.messages import HumanMessage, AIMessage
 from typing import List, Dict, Annotated, Any, Tuple, Optional
 from pydantic import BaseModel, Field, PrivateAttr, computed_field
 from .base import SubPage
-from ifc_schema_viewer.utils import timer_wrapper
+from ..caches import get_query_workers, get_query_scheduler, get_query_service, run_scheduled
+from ifc_schema_viewer.core import ADHOC, QueryProfile, profile_query
+from ifc_schema_viewer.utils import timer_wrapper, get_metrics_registry
+
+import rdflib
+
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
 
 class RDFQuerySubPage(SubPage):
     """RDF Query SubPage"""
@@ -66,21 +72,53 @@ class RDFQuerySubPage(SubPage):
         st.session_state["logger"].info(f"History saved to {out_file}")
     
     @timer_wrapper
-    def run_sparql_query_widget(self, g, query_str):
+    def run_sparql_query_widget(self, g, query_str, optimize: bool = False, explain: bool = False, profile: bool = False):
         # 尝试执行SPARQL查询
         try:
             # 打印查询字符串
             logging.info(query_str)
-            # 使用图对象g执行SPARQL查询
-            results = g.query(query_str)
+            worker_pool = get_query_workers()
+            def execute():
+                # 计时不含排队等待，慢查询列表中只反映查询本身
+                time_start = time.perf_counter()
+                df = evaluate()
+                get_metrics_registry().record_event("sparql", time.perf_counter() - time_start, detail=query_str,
+                                                    rows=len(df) if df is not None else 0, optimized=optimize)
+                return df
+            def evaluate():
+                if worker_pool is not None and g.identifier == INST["IFC_SCHEMA_GRAPH"]:
+                    # 在查询进程中执行，不阻塞本进程中的其他会话
+                    return worker_pool.run_sparql(query_str, optimize=optimize)
+                query = query_str
+                if optimize:
+                    # 按谓词统计重排三元组模式后再求值
+                    query, _ = get_query_service().get_query_optimizer(g).optimize(query_str, dict(g.namespaces()))
+                # 使用图对象g执行SPARQL查询
+                results = g.query(query)
+                # 将查询结果转换为DataFrame，列名为结果变量的名称
+                return pd.DataFrame(results, columns=[str(kk) for kk in results.vars]) if results else None
+            # 即席查询优先级低于页面浏览，且每个会话同时只能执行有限个
+            queue_depth = get_query_scheduler().get_queue_depth()
+            if queue_depth[ADHOC]:
+                st.caption(f"前方排队的即席查询: {queue_depth[ADHOC]}")
+            query_profile = None
+            if profile:
+                # 剖析需要挂接 rdflib 的求值过程，始终在本进程中执行
+                query_profile = run_scheduled(lambda: profile_query(
+                    g, query_str, optimizer=get_query_service().get_query_optimizer(g) if optimize else None), ADHOC)
+                df = query_profile.result
+            else:
+                df = run_scheduled(execute, ADHOC)
             # 显示查询成功的信息
             st.success("Query executed successfully! 🎉")
+            if query_profile is not None:
+                self.display_query_profile_widget(query_profile)
+            if explain:
+                self.display_query_plan_widget(g, query_str)
             # 如果查询有结果
-            if results:
+            if df is not None and not df.empty:
                 # 显示查询结果的提示信息
                 st.write("Here is the result of the query:")
-                # 将查询结果转换为DataFrame，列名为结果变量的名称
-                df = pd.DataFrame(results, columns=[str(kk) for kk in results.vars])
                 # 显示查询结果
                 st.dataframe(df, use_container_width=True)
                 # 将查询结果存储在会话状态中
@@ -99,6 +137,31 @@ class RDFQuerySubPage(SubPage):
             # 将会话状态中的查询结果设置为None
             st.session_state["sparql_query_results"] = None
 
+    @timer_wrapper
+    def display_query_profile_widget(self, query_profile: QueryProfile):
+        """展示查询的代数表达式、各算子的行数与耗时、各阶段耗时及峰值内存"""
+        with st.expander("性能剖析 (profile)", expanded=True):
+            grid = st_grid([1, 1, 1, 1, 1])
+            grid.metric("解析", f"{query_profile.timings['parse'] * 1000:.1f} ms")
+            grid.metric("求值", f"{query_profile.timings['evaluate'] * 1000:.1f} ms")
+            grid.metric("结果转换", f"{query_profile.timings['term_conversion'] * 1000:.1f} ms")
+            grid.metric("构建DataFrame", f"{query_profile.timings['dataframe'] * 1000:.1f} ms")
+            grid.metric("峰值内存", f"{query_profile.peak_memory / 1024 / 1024:.1f} MB" if query_profile.peak_memory is not None else "-")
+            st.dataframe(query_profile.operators_to_dataframe(), use_container_width=True, hide_index=True)
+            st.caption("TotalMs 为算子的累计耗时（含子算子），SelfMs 为扣除直接子算子后的耗时；剖析时开启了内存跟踪，耗时较正常执行偏大。")
+            st.code(query_profile.algebra, language="text")
+
+    @timer_wrapper
+    def display_query_plan_widget(self, g, query_str):
+        """展示各 BGP 重排后的执行顺序及估计/实际的累计行数"""
+        plan = run_scheduled(lambda: get_query_service().get_query_optimizer(g).explain(g, query_str, dict(g.namespaces())), ADHOC)
+        with st.expander("执行计划 (explain)", expanded=True):
+            if plan.empty:
+                st.info("查询中没有三元组模式。")
+                return
+            st.dataframe(plan, use_container_width=True, hide_index=True)
+            st.caption("WrittenPosition 为模式在查询中书写的位置，EstimatedRows 由数据集画像中的谓词统计估计，ActualRows 为按该顺序求值时的实际中间结果行数（不含 FILTER）。")
+
     @timer_wrapper
     def sparql_query_history_editor_widget(self, container, natural_language_query: str):
         import datetime
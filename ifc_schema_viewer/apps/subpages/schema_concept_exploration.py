@@ -12,6 +12,9 @@ import pandas as pd
 import re
 
 from ifc_schema_viewer.utils.timer import timer_wrapper
+from ifc_schema_viewer.core import OntologyMetadata, PsetApplicability
+from ..caches import get_ontology_metadata, get_pset_applicability
+from ..widget_keys import widget_key_scope, widget_key_fragment
 from .rdf_query import RDFQuerySubPage
 
 from .ifc_schema import (
@@ -27,6 +30,14 @@ ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Sch
 INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
 
 class SchemaExplorationSubPage(RDFQuerySubPage):
+    @property
+    def ontology_metadata(self) -> OntologyMetadata:
+        return get_ontology_metadata()
+    
+    @property
+    def pset_applicability(self) -> PsetApplicability:
+        return get_pset_applicability()
+    
     _predicate_map : Dict[str, str] = {
             RDF.type: "类型",
             RDFS.label: "标签",
@@ -93,7 +104,7 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
         # st.write(f"图谱中节点数量: {len(ifc_schema_graph)}")
         # st.write(f"共计{len(ifc_schema_graph)}个三元组在这个图谱中")
     
-    @st.fragment
+    @widget_key_fragment
     @timer_wrapper
     def display_concept_groups_widget(self):
         def replace_ifc_concept_to_link(match):
@@ -121,13 +132,13 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
         if st.checkbox("显示概念组信息", value=False):
             ifc_schema_graph = self.ifc_schema_dataset.get_graph(INST["IFC_SCHEMA_GRAPH"])
         
-            for root_node in ifc_schema_graph.subjects(RDF.type, ONT["IfcSchema"], unique=True):
-                data_schemas = IfcConceptRenderer.get_data_schemas(root_node, ifc_schema_graph)
+            ontology_metadata = self.ontology_metadata
+            for root_node, data_schemas in ontology_metadata.data_schemas.items():
                 grid = st_grid([1,1])
                 main_col, info_graph_col = grid.container(), grid.container()
                 with main_col:
                     selected_layer = st.selectbox("概念层", options=data_schemas.keys())
-                    conceptual_groups = IfcConceptRenderer.get_conceptual_groups(data_schemas[selected_layer], ifc_schema_graph)
+                    conceptual_groups = ontology_metadata.conceptual_groups.get(data_schemas[selected_layer], {})
                     selected_conceptual_group = st.selectbox("概念组", options=conceptual_groups.keys())
                     display_conceptual_group_info(selected_conceptual_group, conceptual_groups, info_graph_col)
                     concepts = IfcConceptRenderer.get_concepts(conceptual_groups[selected_conceptual_group]["iri"], self.ifc_schema_dataset)
@@ -144,7 +155,7 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
                         if st.checkbox("显示实例图结构", value=False):
                             IfcConceptRenderer.render_selected_instance_echarts(selected_obj, ifc_schema_graph, height=600)
                         selected_type = concepts["type"][selected_index]
-                        with info_graph_col:
+                        with info_graph_col, widget_key_scope("concept_groups"):
                             IfcConceptRenderer.display_selected_individual_info(selected_type, selected_obj, ifc_schema_graph)
                         # st.write(f"**{selected_obj}** is selected")
     
@@ -158,34 +169,6 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
         
         psets.render()
             
-    def _get_psets_by_entity(self, ifc_schema_graph: rdflib.Graph, entity: str):
-        query_str = f"""
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            SELECT DISTINCT ?pset ?pset_name ?express_type
-            WHERE {{
-               ?pset rdf:type ?express_type ;
-                    <{ONT["name"]}> ?pset_name;
-                    <{ONT["applicableTo"]}> ?ae.
-               ?ae <{ONT["subClassOf"]}>* <{entity}>.
-               
-                FILTER (?express_type = <{ONT["PropertySetTemplate"]}> || ?express_type = <{ONT["QuantitySetTemplate"]}> )
-            }}
-            """
-        # st.code(query_str)
-        results = ifc_schema_graph.query(
-            query_str
-        )
-        psets = {}
-        for result in results:
-            psets[result.pset_name] = {
-                "pset": result.pset,
-                "name": result.pset_name,
-                "express_type": result.express_type.n3(ifc_schema_graph.namespace_manager)
-            }
-        return psets
-    
     @timer_wrapper
     def _display_property_sets_info_by_entity(self, ifc_schema_graph: rdflib.Graph):
         if st.session_state.get("entities", None) is None:
@@ -195,11 +178,8 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
             entities = st.session_state["entities"]
         
         entities, selections = entities.render_multiselect()
-        psets = {}
-        for name in selections:
-            entity = entities[name]
-            for pset_name, pset in self._get_psets_by_entity(ifc_schema_graph, entity["entity"]).items():
-                psets[pset_name] = pset
+        # 所选实体（含子实体）适用的属性集取并集，由预计算索引直接给出
+        psets = self.pset_applicability.get_psets_by_entities([entities[name]["iri"] for name in selections])
         
         selections = st.multiselect("选择属性集", list(psets.keys()), key="按实体选择属性集")
         
@@ -212,14 +192,14 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
                     containers = [st.container(),]
                 for name, container in zip(selections, containers):
                     pset = psets[name]
-                    with container:
+                    with container, widget_key_scope("psets_by_entity"):
                         IfcConceptRenderer.display_selected_individual_info(
                             express_type=pset["express_type"],
                             individual_iri=pset["pset"],
                             ifc_schema_graph=ifc_schema_graph
                         )
     
-    @st.fragment
+    @widget_key_fragment
     @timer_wrapper
     def display_property_sets_info_widget(self):
         if st.checkbox("显示属性集检索页面", value=False):
@@ -232,7 +212,7 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
             elif search_option == "按实体检索":
                 self._display_property_sets_info_by_entity(ifc_schema_graph)
     
-    @st.fragment
+    @widget_key_fragment
     @timer_wrapper
     def display_entities_info_widget(self):
         if st.checkbox("显示实体检索页面", value=False):
@@ -246,7 +226,7 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
                 
             entities.render()
     
-    @st.fragment
+    @widget_key_fragment
     @timer_wrapper
     def display_enumerations_widget(self):
         if st.checkbox("显示枚举检索页面", value=False):
@@ -260,7 +240,7 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
                 
             enumerations.render()
               
-    @st.fragment
+    @widget_key_fragment
     @timer_wrapper
     def display_derived_types_widget(self):
         if st.checkbox("显示派生类型检索页面", value=False):
@@ -275,7 +255,7 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
             derived_types.render()
 
     
-    @st.fragment
+    @widget_key_fragment
     @timer_wrapper
     def display_select_types_widget(self):
         if st.checkbox("显示选择类型检索页面", value=False):
@@ -290,20 +270,21 @@ class SchemaExplorationSubPage(RDFQuerySubPage):
             select_types.render()
 
     def get_express_types(self) -> List[str]:
-        results = self.ifc_schema_dataset.query(f"""SELECT ?express_type WHERE {{
-            ?express_type a owl:Class;
-                rdfs:subClassOf+ express:SchematicConcept.
-            FILTER (STRSTARTS(STR(?express_type), "http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#"))
-        }}""")
-        return [result.express_type.fragment for result in results]
+        return self.ontology_metadata.express_types
 
     def _generate_sparql_query_by_template(self, prefixes):
         express_types = self.get_express_types()
+        instance_counts = self.ontology_metadata.instance_counts
         grid = st_grid([1, 1])
         
-        option = grid.selectbox("选择一个要检索的类型", express_types)
+        option = grid.selectbox("选择一个要检索的类型", express_types,
+                                format_func=lambda express_type: f"{express_type} ({instance_counts.get(express_type, 0)})")
         limit = grid.number_input("限制返回结果数量", value=10, min_value=0)
         limit_condition = f"LIMIT {limit}" if limit > 0 else ""
+        if option is not None:
+            instance_count = self.ontology_metadata.get_instance_count(option)
+            expected_count = min(instance_count, limit) if limit > 0 else instance_count
+            st.caption(f"预计返回 {expected_count} 条结果（共 {instance_count} 个实例）")
         st.session_state["sparql_query"] = prefixes + f"""
 SELECT DISTINCT ?s WHERE {{
     ?s a express:{option}.
@@ -347,12 +328,16 @@ PREFIX ifc: <http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#>
                     query_str = st.text_area(
                             "Enter a SPARQL query", value="SELECT * WHERE { ?s ?p ?o } LIMIT 10" if st.session_state.get("sparql_query") is None else st.session_state["sparql_query"], 
                             key="sparql_query_editor", help="SELECT * WHERE { ?s ?p ?o }", height=200)
-                    to_query = st.form_submit_button("Run Query")
+                    grid = st_grid([2, 1, 1, 1])
+                    to_query = grid.form_submit_button("Run Query")
+                    to_optimize = grid.checkbox("统计重排序", key="sparql_query_optimize", help="按谓词统计重排三元组模式后再执行")
+                    to_explain = grid.checkbox("执行计划", key="sparql_query_explain", help="显示重排后的执行顺序及估计/实际行数")
+                    to_profile = grid.checkbox("性能剖析", key="sparql_query_profile", help="显示代数表达式、各算子的行数与耗时、结果转换耗时及峰值内存")
                     st.session_state["sparql_query"] = query_str
                 
                 history_management_container = st.empty()
                 if to_query:
-                    self.run_sparql_query_widget(ifc_schema_graph, query_str)
+                    self.run_sparql_query_widget(ifc_schema_graph, query_str, optimize=to_optimize, explain=to_explain, profile=to_profile)
             
             self.sparql_query_history_editor_widget(history_management_container,"")
             self.sparql_query_history_container_widget(history_container.container())
@@ -0,0 +1,155 @@
+import streamlit as st
+from streamlit_echarts import st_echarts
+from streamlit_extras.grid import grid as st_grid
+
+from pydantic import Field
+from typing import Any
+
+import pandas as pd
+
+from .base import SubPage
+
+from ifc_schema_viewer.utils import EchartsUtility, timer_wrapper
+from ifc_schema_viewer.core import ProgressiveSchemaLoader
+from ifc_schema_viewer.core.graph_statistics import DEFAULT_GRAPH_NAME
+
+_STAGE_LABELS = {
+    "pending": "等待开始",
+    "default_graph": "正在解析默认图（本体）",
+    "named_graphs": "正在解析 IFC 数据模式子图与通用概念子图",
+    "indexing": "正在统计子图",
+    "ready": "加载完成",
+    "failed": "加载失败",
+}
+
+class SchemaLoadingSubPage(SubPage):
+    """数据集在后台加载期间的页面
+
+    默认图解析完成后即可查看命名空间、默认图统计、类、属性与继承图（均取自加载器的快照），
+    命名图逐个解析完成时在子图统计中列出；加载完成后整页重新运行，进入正常的子页面。
+    """
+    schema_loader: Any = Field(description="ProgressiveSchemaLoader shared by all sessions")
+
+    def model_post_init(self, __context):
+        # 加载完成前会话中还没有数据集，不建立引用
+        pass
+
+    @property
+    def loader(self) -> ProgressiveSchemaLoader:
+        return self.schema_loader
+
+    @st.fragment(run_every=1.0)
+    def display_progress(self):
+        progress = self.loader.get_progress()
+        if progress["stage"] in ["ready", "failed"]:
+            # 整页重新运行，由应用写入会话状态或展示错误
+            st.rerun()
+        if (self.loader.snapshot is not None) != st.session_state.get("loading_snapshot_shown", False):
+            # 快照刚就绪，整页重新运行以启用依赖快照的标签页
+            st.rerun()
+        text = "%s，已用时 %.1f s" % (_STAGE_LABELS.get(progress["stage"], progress["stage"]), progress["elapsed_seconds"])
+        if progress["graphs_total"]:
+            text += "（子图 %d/%d）" % (progress["graphs_done"], progress["graphs_total"])
+        st.progress(progress["graphs_done"] / max(progress["graphs_total"], 1), text=text)
+
+    def _waiting(self):
+        st.info("默认图解析完成后可用，请稍候...")
+
+    @st.fragment(run_every=1.0)
+    @timer_wrapper
+    def display_graph_progress(self):
+        snapshot = self.loader.snapshot
+        progress = self.loader.get_progress()
+        with st.container(border=True):
+            grid = st_grid([1, 1, 1])
+            grid.metric("子图（已解析 / 总数）", f"{progress['graphs_done']} / {progress['graphs_total']}")
+            grid.metric("命名图三元组（已解析）", progress["triples"])
+            grid.metric("IFC4.3数据模式本体三元组数量",
+                        snapshot["statistics"].get_triple_count(DEFAULT_GRAPH_NAME) if snapshot is not None else "-")
+        if not progress["graphs"]:
+            return
+        st.dataframe(
+            pd.DataFrame([{
+                "Graph": graph["name"],
+                "Status": graph["status"],
+                "Triples": graph["triples"],
+                "Seconds": round(graph["seconds"], 2),
+            } for graph in progress["graphs"]], columns=["Graph", "Status", "Triples", "Seconds"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    @timer_wrapper
+    def display_namespaces(self):
+        snapshot = self.loader.snapshot
+        if snapshot is None:
+            return self._waiting()
+        st.dataframe(
+            pd.DataFrame(snapshot["namespaces"], columns=["Prefix", "Namespace"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    @timer_wrapper
+    def display_classes(self):
+        snapshot = self.loader.snapshot
+        if snapshot is None:
+            return self._waiting()
+        labels = snapshot["labels"]
+        st.dataframe(
+            pd.DataFrame([{"Namespace": labels[clss].split(":")[0], "LocalName": labels[clss], "URIRef": str(clss)} for clss in snapshot["classes"]],
+                         columns=["Namespace", "LocalName", "URIRef"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    @timer_wrapper
+    def display_properties(self):
+        snapshot = self.loader.snapshot
+        if snapshot is None:
+            return self._waiting()
+        labels = snapshot["labels"]
+        st.dataframe(
+            pd.DataFrame([{"Namespace": labels[prop].split(":")[0], "LocalName": labels[prop], "PropType": prop_type, "URIRef": str(prop)}
+                          for prop_type, props in snapshot["properties"].items() for prop in props],
+                         columns=["Namespace", "LocalName", "PropType", "URIRef"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    @timer_wrapper
+    def display_hierarchy(self):
+        snapshot = self.loader.snapshot
+        if snapshot is None:
+            return self._waiting()
+        option_to_visualize = st.selectbox("选择要可视化的内容", ["类继承关系", "属性继承关系"], label_visibility="collapsed", key="loading_hierarchy")
+        if option_to_visualize == "类继承关系":
+            hierarchy, title = snapshot["class_hierarchy"], "Class Hierarchy"
+        else:
+            hierarchy, title = snapshot["property_hierarchy"], "Property Hierarchy"
+        st_echarts(EchartsUtility.create_normal_echart_options(hierarchy.echarts_graph_info, f"{title}\n\nTotal:{len(hierarchy.obj_range)}"), height="500px")
+
+    def display_tabs(self):
+        # 只有子图统计每秒刷新，其余标签页在快照就绪时随整页重新运行启用一次
+        maintab1, maintab2, maintab3, maintab4, maintab5 = st.tabs([
+            "📝 子图统计",
+            "📚 命名空间",
+            "🌐 本体可视化",
+            "🏷️ 类",
+            "🔗 属性",])
+        with maintab1.container():
+            self.display_graph_progress()
+        with maintab2.container():
+            self.display_namespaces()
+        with maintab3.container():
+            self.display_hierarchy()
+        with maintab4.container():
+            self.display_classes()
+        with maintab5.container():
+            self.display_properties()
+
+    def render(self):
+        st.session_state.loading_snapshot_shown = self.loader.snapshot is not None
+        with st.sidebar:
+            self.display_progress()
+        self.display_tabs()
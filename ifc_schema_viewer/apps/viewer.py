@@ -4,14 +4,18 @@ from streamlit_echarts import st_echarts
 from streamlit_extras.badges import badge
 
 from pydantic import BaseModel, Field, PrivateAttr
-from typing import Optional, List, Dict, Any, Literal, Union
+from typing import Optional, List, Dict, Any, Literal, Union, Annotated
 
 import pandas as pd
+import logging
 import rdflib
 from rdflib import RDF, RDFS, OWL, SKOS, Dataset
 import os
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-from ifc_schema_viewer.utils import timer_wrapper
+from ifc_schema_viewer.utils import timer_wrapper, span, get_metrics_registry
+from ifc_schema_viewer.core import LoadedSchema, install_parse_lock
+from ifc_schema_viewer.core.loader import DEFAULT_SCHEMA_PATH, DEFAULT_ONTOLOGY_PATHS
 
 ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
 INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
@@ -19,9 +23,20 @@ INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Sch
 from ..utils import EchartsUtility, GraphAlgoUtility
 
 from .base import StreamlitBaseApp
-from .subpages import GraphStatusSubPage, SubPage, SchemaExplorationSubPage
+from .widget_keys import get_widget_key_stats, begin_widget_key_run
+from .caches import start_query_workers, start_cache_warmer, get_query_service, get_session_registry, get_access_log, start_schema_loader, restart_schema_loader
+from .sessions import estimate_session_memory
+from .subpages import GraphStatusSubPage, SubPage, SchemaExplorationSubPage, PerformanceDashboardSubPage, SchemaLoadingSubPage
 
 class IfcSchemaViewerApp(StreamlitBaseApp):
+    query_workers: Annotated[int, Field(
+        default_factory=lambda: int(os.environ.get("IFC_SCHEMA_VIEWER_QUERY_WORKERS", 0)),
+        description="Worker processes for rdflib queries, 0 runs queries in the Streamlit process.")]
+    warmup_workers: Annotated[int, Field(
+        default_factory=lambda: int(os.environ.get("IFC_SCHEMA_VIEWER_WARMUP_WORKERS", 2)),
+        description="Background threads warming shared indexes and hot concepts after the dataset is loaded, 0 disables warm-up.")]
+    metrics_export_interval: Annotated[float, Field(
+        default=30.0, description="Minimum seconds between writes of the metrics JSON snapshot to the output directory.")]
     
     _graph_status_subpage: GraphStatusSubPage = PrivateAttr()
     @property
@@ -33,72 +48,130 @@ class IfcSchemaViewerApp(StreamlitBaseApp):
     def schema_exploration_subpage(self) -> SchemaExplorationSubPage:
         return self._schema_exploration_subpage
     
+    _performance_dashboard_subpage: PerformanceDashboardSubPage = PrivateAttr()
+    @property
+    def performance_dashboard_subpage(self) -> PerformanceDashboardSubPage:
+        return self._performance_dashboard_subpage
+    
     @timer_wrapper
-    def parse_ifc_schema_dataset(self):
-        def get_properties(g: rdflib.Dataset):
-            property_dict = {}
-            property_dict["ObjectProperty"] = [rec["property"] for rec in g.query("""
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            SELECT DISTINCT ?property WHERE {
-                ?property rdf:type owl:ObjectProperty .
-            }""")]
-            property_dict["DatatypeProperty"] = [rec["property"] for rec in g.query("""
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            SELECT DISTINCT ?property WHERE {
-                ?property rdf:type owl:DatatypeProperty .
-            }""")]
-            property_dict["AnnotationProperty"] = [rec["property"] for rec in g.query("""
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX owl: <http://www.w3.org/2002/07/owl#>
-            SELECT DISTINCT ?property WHERE {
-                ?property rdf:type owl:AnnotationProperty .
-            }""")]
-            return property_dict
-        
-        if not os.path.isfile("./resources/knowledge_graphs/ifc_schema.trig") or not os.path.isfile("./resources/ontologies/skos.rdf"):
+    def parse_ifc_schema_dataset(self) -> bool:
+        """数据集在后台线程中加载（所有会话共享同一次加载），加载完成前展示进度与已就绪的部分，返回数据集是否已写入会话状态"""
+        try:
+            schema_loader = start_schema_loader(DEFAULT_SCHEMA_PATH, DEFAULT_ONTOLOGY_PATHS)
+        except FileNotFoundError:
             st.error("IFC Schema Graph not found. Please check the resources.")
             st.stop()
-        with st.spinner("Parsing IFC Schema Graph to RDFLib Dataset...", show_time=True):
-            dataset = Dataset()
-            dataset.parse("./resources/knowledge_graphs/ifc_schema.trig", format="trig")
-            dataset.parse("./resources/ontologies/skos.rdf", format="xml")
-        st.session_state.ifc_schema_dataset = dataset
-        classes = set(dataset.subjects(predicate=RDF.type, object=OWL.Class, unique=True))
-        for so in dataset.subject_objects(predicate=RDFS.subClassOf, unique=True):
-            classes.add(so[0])
-            classes.add(so[1])
-        classes = [clss for clss in classes if not clss.n3(dataset.namespace_manager).startswith("_:")]
-        st.session_state.classes = classes
-        properties = get_properties(dataset)
-        st.session_state.properties = properties
-        
-        st.rerun()
+        if schema_loader.failed:
+            st.error(f"Failed to parse IFC Schema Graph: {schema_loader.error}")
+            if st.button("重新加载"):
+                restart_schema_loader()
+                st.rerun()
+            st.stop()
+        if not schema_loader.ready:
+            with st.sidebar:
+                st.header("🔍 IFC4.3 Schema Viewer", divider=True)
+                st.info("For educational purposes only.")
+                st.selectbox("子页面导航", ["图谱总体构成", "数据模式概念探索", "性能监控"], disabled=True, help="数据集加载完成后可用")
+            SchemaLoadingSubPage(schema_loader=schema_loader).render()
+            return False
+        self.store_loaded_schema(schema_loader.result)
+        # 继承图在默认图解析完成时已构建，直接登记到共享的查询服务
+        get_query_service().seed_index("class_hierarchy", schema_loader.snapshot["class_hierarchy"])
+        get_query_service().seed_index("property_hierarchy", schema_loader.snapshot["property_hierarchy"])
+        return True
+    
+    @staticmethod
+    def store_loaded_schema(loaded_schema: LoadedSchema):
+        """将加载结果写入会话状态；基准测试等无界面场景也以此初始化会话"""
+        st.session_state.ifc_schema_dataset = loaded_schema.dataset
+        # 数据集版本号，作为跨会话共享缓存的键
+        st.session_state.dataset_version = loaded_schema.dataset_version
+        st.session_state.classes = loaded_schema.classes
+        st.session_state.properties = loaded_schema.properties
+        # 子图统计与数据集版本号一同保存，并登记到该版本共享的查询服务中
+        st.session_state.graph_statistics = loaded_schema.statistics
+        get_query_service().seed_index("graph_statistics", loaded_schema.statistics)
+        # 加载耗时与内存增量，在性能监控页展示
+        st.session_state.dataset_load_seconds = loaded_schema.load_seconds
+        st.session_state.dataset_memory_bytes = loaded_schema.memory_bytes
     
     def run(self):
-        if st.session_state.get("ifc_schema_dataset", None) is None:
-            self.parse_ifc_schema_dataset()
+        # 各会话的脚本线程与后台预热会同时执行 SPARQL 查询，rdflib 的解析器需串行化
+        install_parse_lock()
+        # 每次重新运行记录为一棵调用树，结束后输出汇总并导出各函数的耗时直方图
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            # 其他会话在内存超出预算时标记的逐出，在本会话自己的脚本线程中执行
+            get_session_registry().apply_pending_eviction(ctx.session_id, st.session_state)
+        begin_widget_key_run()
+        with span("rerun") as rerun_span:
+            self.render()
+        self.report_rerun(rerun_span)
+    
+    def report_rerun(self, rerun_span):
+        # 只保留类名与方法名，例如 EntityInfo.model_post_init
+        slowest = ", ".join("%s x%d %.1f ms" % (".".join(entry["name"].rsplit(".", 2)[-2:]), entry["calls"], entry["self_ms"])
+                            for entry in rerun_span.summarize(top=5))
+        logging.info("[APP] rerun took %.1f ms, slowest: %s" % (rerun_span.duration * 1000, slowest))
+        st.session_state.last_rerun_trace = rerun_span
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            session_registry = get_session_registry()
+            memory_bytes = estimate_session_memory(st.session_state) if session_registry.needs_memory_estimate(ctx.session_id) else None
+            session_registry.touch(ctx.session_id, rerun_span.duration, memory_bytes, ctx.session_state)
+            # 超出内存预算时标记空闲会话逐出可重建的缓存项（热点概念除外），这些会话回来时先逐出再按需重建
+            session_registry.enforce_budget(current_session_id=ctx.session_id, keep_concepts=set(get_access_log().get_hot_concepts()))
+        get_metrics_registry().save_json(os.path.join(self.output_dir, "metrics.json"), min_interval=self.metrics_export_interval)
+        get_access_log().save(min_interval=self.metrics_export_interval)
+    
+    @st.fragment(run_every=1.0)
+    def display_warmup_progress(self):
+        # 预热进行中时每秒刷新进度，不触发整页重新运行
+        progress = start_cache_warmer(self.warmup_workers).get_progress()
+        if progress["finished"]:
+            st.caption("缓存预热完成：%d/%d，用时 %.1f s" % (progress["completed"], progress["total"], progress["elapsed_seconds"]))
+        else:
+            st.progress(progress["completed"] / max(progress["total"], 1), text="正在后台预热缓存 %d/%d" % (progress["completed"], progress["total"]))
+    
+    def render(self):
+        if st.session_state.get("ifc_schema_dataset", None) is None and not self.parse_ifc_schema_dataset():
+            return
+        
+        # 访问记录等跨重启保存的数据写入输出目录
+        st.session_state.output_dir = self.output_dir
+        # 查询进程池在进程内共享，rdflib 查询不再阻塞其他会话
+        st.session_state.query_workers = self.query_workers
+        if self.query_workers > 0:
+            start_query_workers(self.query_workers)
+        # 后台预热共享索引与常用概念，首个打开各页面的用户不必等待构建
+        st.session_state.warmup_workers = self.warmup_workers
+        cache_warmer = start_cache_warmer(self.warmup_workers) if self.warmup_workers > 0 else None
         
         # 建立引用
         self._graph_status_subpage = GraphStatusSubPage()
         self._schema_exploration_subpage = SchemaExplorationSubPage()
+        self._performance_dashboard_subpage = PerformanceDashboardSubPage()
         
         # 使用streamlit的侧边栏组件，创建一个下拉选择框，用于选择子页面
         with st.sidebar:
             st.header("🔍 IFC4.3 Schema Viewer", divider=True)
             st.info("For educational purposes only.")
+            if cache_warmer is not None and not cache_warmer.finished:
+                self.display_warmup_progress()
             # 下拉选择框的标签为“子页面导航”，选项为“图谱构成”
-            subpage_option = st.selectbox("子页面导航", ["图谱总体构成", "数据模式概念探索"])
+            subpage_option = st.selectbox("子页面导航", ["图谱总体构成", "数据模式概念探索", "性能监控"])
         
         # 判断用户选择的子页面是否为“图谱构成”
         if subpage_option == "图谱总体构成":
             self.graph_status_subpage.render()
         elif subpage_option == "数据模式概念探索":
             self.schema_exploration_subpage.render()
+        elif subpage_option == "性能监控":
+            self.performance_dashboard_subpage.render()
+        
+        widget_key_stats = get_widget_key_stats()
+        logging.info("[APP] widget keys allocated: %d, suffixed to avoid duplicates: %d" % (
+            widget_key_stats["allocated"], widget_key_stats["suffixed"]))
 
         # with st.sidebar: 
         #     st.divider()
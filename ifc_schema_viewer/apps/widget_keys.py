@@ -0,0 +1,79 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Tuple, Optional
+
+# 当前渲染路径，例如 ("IfcWall", "super_entities", "IfcRoot")，同一概念经不同路径渲染时得到不同的控件键
+_render_path: contextvars.ContextVar[Tuple[str, ...]] = contextvars.ContextVar("render_path", default=())
+# 当前正在执行的 fragment，None 表示 fragment 之外；fragment 单独重新运行时只重置它自己分配的控件键
+_key_owner: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("widget_key_owner", default=None)
+
+@contextmanager
+def widget_key_scope(name: str):
+    """进入一层渲染路径，作用域内分配的控件键都以该路径为前缀"""
+    token = _render_path.set(_render_path.get() + (str(name),))
+    try:
+        yield
+    finally:
+        _render_path.reset(token)
+
+def get_render_path() -> Tuple[str, ...]:
+    """当前渲染路径，第一层为打开概念的标签页，例如 concept_groups"""
+    return _render_path.get()
+
+def _get_keys_this_run() -> Dict[Optional[str], Dict[str, int]]:
+    # fragment（None 表示 fragment 之外）-> 本次运行中已分配的控件键及其出现次数
+    if st.session_state.get("widget_keys_this_run", None) is None:
+        st.session_state.widget_keys_this_run = {}
+    return st.session_state.widget_keys_this_run
+
+def begin_widget_key_run():
+    """整页重新运行开始时调用，清空上一次运行分配的控件键"""
+    st.session_state.widget_keys_this_run = {}
+
+def widget_key_fragment(func):
+    """代替 st.fragment 装饰在其中分配控件键的 fragment 上
+
+    fragment 单独重新运行时页面其余部分不执行，只重置该 fragment 上次分配的控件键，
+    因此它重新分配时得到与上次相同的键，并且仍与页面其余部分的键互不冲突。每次运行中同一 fragment 只应调用一次。
+    """
+    owner = func.__qualname__
+    @functools.wraps(func)
+    def fragment_wrapper(*args, **kwargs):
+        _get_keys_this_run()[owner] = {}
+        token = _key_owner.set(owner)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _key_owner.reset(token)
+    return st.fragment(fragment_wrapper)
+
+def get_widget_key_stats() -> Dict[str, int]:
+    """本会话的控件键分配统计：allocated 为分配次数，suffixed 为因同一运行中键已被占用而追加了序号的次数"""
+    if st.session_state.get("widget_key_stats", None) is None:
+        st.session_state.widget_key_stats = {"allocated": 0, "suffixed": 0}
+    return st.session_state.widget_key_stats
+
+def allocate_widget_key(name: str) -> str:
+    """在当前渲染路径下为控件分配一个本次运行内唯一的键
+
+    键由渲染路径与控件名确定，若本次运行（含 fragment 运行）中已被占用，则依次追加序号，
+    因此每次重新运行都会得到相同的键，控件状态得以保留，且每个控件只创建一次。
+    须在创建控件前立即调用。
+    """
+    key = "/".join(_render_path.get() + (str(name),))
+    stats = get_widget_key_stats()
+    stats["allocated"] += 1
+    if get_script_run_ctx() is None:
+        return key
+    keys_this_run = _get_keys_this_run()
+    occurrence = sum(keys.get(key, 0) for keys in keys_this_run.values()) + 1
+    owner_keys = keys_this_run.setdefault(_key_owner.get(), {})
+    owner_keys[key] = owner_keys.get(key, 0) + 1
+    if occurrence == 1:
+        return key
+    stats["suffixed"] += 1
+    return f"{key}#{occurrence}"
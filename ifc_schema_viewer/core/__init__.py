@@ -0,0 +1,81 @@
+from .sparql_parser import parse_query, install_parse_lock
+from .dataset import compute_dataset_version
+from .ontology_metadata import OntologyMetadata
+from .collection_members import CollectionMembers
+from .pset_applicability import PsetApplicability
+from .attribute_references import AttributeReferences
+from .datatype_usages import DatatypeUsages
+from .derived_types import DerivedTypeChains
+from .pset_validation import PsetBatchValidator
+from .type_validators import TypeValidator, SchemaValidators
+from .graph_statistics import GraphStatistics
+from .dataset_profile import DatasetProfile
+from .hierarchy import InheritanceGraph
+from .query_optimizer import QueryOptimizer
+from .query_profiler import QueryProfile, profile_query
+from .loader import LoadedSchema, load_ifc_schema, get_classes, get_properties
+from .progressive_loader import ProgressiveSchemaLoader, LOAD_STAGES
+from .concepts import (
+    Concept,
+    TypeConcept,
+    EnumConcept,
+    PropertyEnumConcept,
+    SelectConcept,
+    EntityConcept,
+    PsetTemplateConcept,
+    QsetTemplateConcept,
+    DerivedTypeConcept,
+    concept_model_map
+)
+from .query_service import SchemaQueryService
+from .query_workers import QueryWorkerPool
+from .access_log import AccessLog
+from .cache_warmer import CacheWarmer, WARMUP_INDEXES, DEFAULT_HOT_CONCEPTS
+from .query_scheduler import QueryScheduler, QueryQueueTimeout, INTERACTIVE, ADHOC
+
+__all__ = [
+    "parse_query",
+    "install_parse_lock",
+    "compute_dataset_version",
+    "OntologyMetadata",
+    "CollectionMembers",
+    "PsetApplicability",
+    "AttributeReferences",
+    "DatatypeUsages",
+    "DerivedTypeChains",
+    "PsetBatchValidator",
+    "TypeValidator",
+    "SchemaValidators",
+    "GraphStatistics",
+    "DatasetProfile",
+    "InheritanceGraph",
+    "QueryOptimizer",
+    "QueryProfile",
+    "profile_query",
+    "LoadedSchema",
+    "load_ifc_schema",
+    "get_classes",
+    "get_properties",
+    "ProgressiveSchemaLoader",
+    "LOAD_STAGES",
+    "Concept",
+    "TypeConcept",
+    "EnumConcept",
+    "PropertyEnumConcept",
+    "SelectConcept",
+    "EntityConcept",
+    "PsetTemplateConcept",
+    "QsetTemplateConcept",
+    "DerivedTypeConcept",
+    "concept_model_map",
+    "SchemaQueryService",
+    "QueryWorkerPool",
+    "AccessLog",
+    "CacheWarmer",
+    "WARMUP_INDEXES",
+    "DEFAULT_HOT_CONCEPTS",
+    "QueryScheduler",
+    "QueryQueueTimeout",
+    "INTERACTIVE",
+    "ADHOC",
+]
@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional
+
+from ifc_schema_viewer.utils import write_json_atomic
+
+class AccessLog(BaseModel):
+    """概念的访问频次（按 IRI 与按标签页计数），跨重启保存在输出目录中
+
+    访问最多的若干概念构成热点集合：数据集加载后优先预热，会话缓存被逐出时予以保留。
+    """
+    path: Optional[str] = Field(default="./outputs/access_log.json", description="JSON file the counts are persisted to, None keeps them in memory only")
+    hot_set_size: int = Field(default=30, description="Number of most accessed concepts forming the hot set")
+
+    _concepts: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _tabs: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    # 各会话的脚本线程都会保存，同一时刻只有一个线程写出，其余直接跳过
+    _save_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _dirty: bool = PrivateAttr(default=False)
+    _last_saved: float = PrivateAttr(default=0.0)
+
+    def record(self, iri, tab: str = "", name: Optional[str] = None, express_type: Optional[str] = None):
+        """记录一次概念访问，tab 为打开该概念的标签页"""
+        iri = str(iri)
+        with self._lock:
+            concept = self._concepts.get(iri, None)
+            if concept is None:
+                concept = self._concepts[iri] = {"count": 0, "name": name, "express_type": express_type, "tabs": {}}
+            concept["count"] += 1
+            concept["last_access"] = time.time()
+            concept["tabs"][tab] = concept["tabs"].get(tab, 0) + 1
+            self._tabs[tab] = self._tabs.get(tab, 0) + 1
+            self._dirty = True
+
+    def get_hot_concepts(self, top: Optional[int] = None) -> List[str]:
+        """访问次数最多的概念 IRI，次数相同时最近访问的优先"""
+        with self._lock:
+            ranked = sorted(self._concepts.items(), key=lambda item: (item[1]["count"], item[1].get("last_access", 0.0)), reverse=True)
+        return [iri for iri, _ in ranked[:top or self.hot_set_size]]
+
+    def get_concept_counts(self) -> List[Dict[str, Any]]:
+        """各概念的访问记录，按次数降序"""
+        with self._lock:
+            concepts = [{"iri": iri, **concept, "tabs": dict(concept["tabs"])} for iri, concept in self._concepts.items()]
+        return sorted(concepts, key=lambda concept: concept["count"], reverse=True)
+
+    def get_tab_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._tabs)
+
+    def _to_json(self) -> Dict[str, Any]:
+        # 调用方持有 _lock
+        return {"timestamp": time.time(), "concepts": {iri: {**concept, "tabs": dict(concept["tabs"])} for iri, concept in self._concepts.items()}, "tabs": dict(self._tabs)}
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._to_json()
+
+    def save(self, min_interval: float = 0.0) -> bool:
+        """有新记录时写出 JSON；距上次写出不足 min_interval 秒或其他线程正在写出时跳过，写出失败时记录警告并返回 False"""
+        if self.path is None or not self._save_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                now = time.time()
+                if not self._dirty or now - self._last_saved < min_interval:
+                    return False
+                # 快照与清除标记在同一临界区内，之后的记录仍标记为待写出
+                self._last_saved = now
+                data = self._to_json()
+                self._dirty = False
+            try:
+                write_json_atomic(self.path, data)
+            except OSError as e:
+                logging.warning("[ACCESS] failed to save %s: %s" % (self.path, e))
+                with self._lock:
+                    self._dirty = True
+                return False
+            return True
+        finally:
+            self._save_lock.release()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._concepts = {iri: concept for iri, concept in data.get("concepts", {}).items() if concept.get("count", 0) > 0}
+            self._tabs = dict(data.get("tabs", {}))
+        except (OSError, ValueError, AttributeError) as e:
+            # 访问记录只用于优化，文件损坏时从空记录开始
+            logging.warning("[ACCESS] failed to load %s: %s" % (self.path, e))
+
+    def model_post_init(self, __context):
+        if self.path is not None and os.path.isfile(self.path):
+            self._load()
@@ -0,0 +1,96 @@
+import rdflib
+from rdflib import RDF
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Set, FrozenSet
+
+from ifc_schema_viewer.utils import timer_wrapper
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+class AttributeReferences(BaseModel):
+    """类型 -> 引用该类型的直接属性及其声明实体的反向索引
+    
+    继承该属性的子实体不预先展开，首次查询时沿 express:superClassOf 计算并缓存子树。
+    """
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+
+    _references: Dict[rdflib.URIRef, List[Dict[str, Any]]] = PrivateAttr(default_factory=dict)
+    @property
+    def references(self) -> Dict[rdflib.URIRef, List[Dict[str, Any]]]:
+        """类型 -> [{"attribute", "attribute iri", "direct_attr_num", "cardinality", "declaring entity"}]"""
+        return self._references
+
+    _entity_names: Dict[rdflib.URIRef, rdflib.Literal] = PrivateAttr(default_factory=dict)
+    _sub_entities: Dict[rdflib.URIRef, Set[rdflib.URIRef]] = PrivateAttr(default_factory=dict)
+    _subtrees: Dict[rdflib.URIRef, FrozenSet[rdflib.URIRef]] = PrivateAttr(default_factory=dict)
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.rdf_graph.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+    def get_subtree(self, entity: rdflib.URIRef) -> FrozenSet[rdflib.URIRef]:
+        """实体自身及其所有子实体（等价于 superClassOf*）"""
+        if entity in self._subtrees:
+            return self._subtrees[entity]
+        subtree = {entity}
+        stack = [entity]
+        while stack:
+            for sub_entity in self._sub_entities.get(stack.pop(), ()):
+                if sub_entity not in subtree:
+                    subtree.add(sub_entity)
+                    stack.append(sub_entity)
+        self._subtrees[entity] = frozenset(subtree)
+        return self._subtrees[entity]
+
+    def get_referencing_entities(self, type_iri) -> List[Dict[str, Any]]:
+        """展开继承关系，返回所有（直接或通过继承）拥有引用该类型的属性的实体"""
+        rows = []
+        for ref in self.references.get(rdflib.URIRef(type_iri), ()):
+            for entity in self.get_subtree(ref["declaring entity"]):
+                if entity not in self._entity_names:
+                    continue
+                rows.append({
+                    "entity": self._entity_names[entity],
+                    "attribute": ref["attribute"],
+                    "entity iri": entity,
+                    "direct_attr_num": ref["direct_attr_num"],
+                    "cardinality": ref["cardinality"]
+                })
+        rows.sort(key=lambda row: (str(row["entity"]), str(row["attribute"])))
+        return rows
+
+    @timer_wrapper
+    def _retrieve_references(self):
+        g = self.ifc_schema_graph
+
+        declaring_entities: Dict[rdflib.term.Node, List[rdflib.URIRef]] = {}
+        for entity, attr in g.subject_objects(predicate=ONT["hasDirectAttribute"], unique=True):
+            declaring_entities.setdefault(attr, []).append(entity)
+
+        for attr, attr_range in g.subject_objects(predicate=ONT["attrRange"], unique=True):
+            attr_name = g.value(attr, ONT["name"])
+            direct_attr_num = g.value(attr, ONT["direct_attr_num"])
+            cardinality = g.value(attr, ONT["cardinality"])
+            if attr_name is None or direct_attr_num is None or cardinality is None:
+                continue
+            for entity in declaring_entities.get(attr, ()):
+                self._references.setdefault(attr_range, []).append({
+                    "attribute": attr_name,
+                    "attribute iri": attr,
+                    "direct_attr_num": direct_attr_num,
+                    "cardinality": cardinality,
+                    "declaring entity": entity
+                })
+
+        for super_entity, sub_entity in g.subject_objects(predicate=ONT["superClassOf"], unique=True):
+            self._sub_entities.setdefault(super_entity, set()).add(sub_entity)
+
+        for entity, entity_name in g.subject_objects(predicate=ONT["name"]):
+            self._entity_names[entity] = entity_name
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        self._retrieve_references()
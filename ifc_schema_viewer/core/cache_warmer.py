@@ -0,0 +1,118 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+import rdflib
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional, Callable
+
+from ifc_schema_viewer.utils import get_metrics_registry
+from .sparql_parser import install_parse_lock
+
+# 各页面首次打开时需要的共享索引，按页面的使用顺序预构建
+WARMUP_INDEXES = [
+    "ontology_metadata",
+    "collection_members",
+    "pset_applicability",
+    "derived_type_chains",
+    "class_hierarchy",
+    "property_hierarchy",
+]
+
+# 没有访问记录时预构建的常用概念
+DEFAULT_HOT_CONCEPTS = [
+    "IfcRoot", "IfcWall", "IfcSlab", "IfcSpace", "IfcDoor", "IfcWindow", "IfcBuildingStorey",
+    "Pset_WallCommon", "Pset_SlabCommon", "Pset_SpaceCommon", "Pset_DoorCommon", "IfcLabel",
+]
+
+class CacheWarmer(BaseModel):
+    """数据集加载后在后台线程池中预构建共享索引（集合成员表、继承图等）与常用概念模型，不阻塞首次渲染
+
+    rdflib 查询持有 GIL，线程数不宜多；任务经 SchemaQueryService 的加锁构建，与前台同时访问时也只构建一次。
+    """
+    query_service: Any = Field(default=None, description="SchemaQueryService whose indexes and concept cache are warmed")
+    hot_concepts: List[str] = Field(default_factory=lambda: list(DEFAULT_HOT_CONCEPTS), description="Concept names or IRIs to pre-build, hottest first")
+    max_workers: int = Field(default=2, description="Background threads")
+
+    _tasks: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _futures: List[Any] = PrivateAttr(default_factory=list)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _started_at: Optional[float] = PrivateAttr(default=None)
+    _finished_at: Optional[float] = PrivateAttr(default=None)
+
+    def _resolve_concept(self, concept: str) -> Optional[rdflib.URIRef]:
+        if concept.startswith("http://") or concept.startswith("https://"):
+            return rdflib.URIRef(concept)
+        return self.query_service.find_by_name(concept)
+
+    def _run_task(self, name: str, func: Callable[[], Any]):
+        with self._lock:
+            self._tasks[name]["status"] = "running"
+        time_start = time.perf_counter()
+        try:
+            # 返回 False 表示无需预热，例如数据集中没有该概念
+            status = "skipped" if func() is False else "done"
+        except Exception as e:
+            # 预热失败不影响前台，前台访问时仍会按需构建
+            logging.warning("[WARMUP] %s failed: %s" % (name, e))
+            status = "failed"
+        seconds = time.perf_counter() - time_start
+        get_metrics_registry().record_event("warmup", seconds, detail=name, status=status)
+        with self._lock:
+            self._tasks[name].update(status=status, seconds=seconds)
+            if all(task["status"] in ("done", "skipped", "failed") for task in self._tasks.values()):
+                self._finished_at = time.time()
+                logging.info("[WARMUP] %d tasks finished in %.1f s" % (len(self._tasks), self._finished_at - self._started_at))
+
+    def _warm_concept(self, concept: str) -> bool:
+        iri = self._resolve_concept(concept)
+        if iri is None:
+            return False
+        return self.query_service.get_concept(iri) is not None
+
+    def start(self):
+        """提交全部预热任务后立即返回；重复调用无效"""
+        with self._lock:
+            if self._started_at is not None:
+                return
+            self._started_at = time.time()
+            # 预热线程与前台同时执行查询，批处理任务中单独使用时同样需要串行化解析
+            install_parse_lock()
+            tasks = [(f"index.{name}", lambda name=name: getattr(self.query_service, name)) for name in WARMUP_INDEXES]
+            # 以 IRI 给出的概念在任务名中只保留片段，例如 concept.IfcWall
+            tasks += [(f"concept.{rdflib.URIRef(concept).fragment or concept}", lambda concept=concept: self._warm_concept(concept))
+                      for concept in self.hot_concepts]
+            for name, _ in tasks:
+                self._tasks[name] = {"name": name, "status": "pending", "seconds": None}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cache-warmup")
+        self._futures = [executor.submit(self._run_task, name, func) for name, func in tasks]
+        # 任务全部完成后线程自行退出
+        executor.shutdown(wait=False)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待全部任务完成，供批处理与基准测试使用；返回是否已完成"""
+        wait_futures(self._futures, timeout=timeout)
+        return self.finished
+
+    @property
+    def finished(self) -> bool:
+        return self._finished_at is not None
+
+    def get_progress(self) -> Dict[str, Any]:
+        """{"total", "completed", "done", "skipped", "failed", "running", "elapsed_seconds", "finished", "tasks"}"""
+        with self._lock:
+            tasks = [dict(task) for task in self._tasks.values()]
+            started_at, finished_at = self._started_at, self._finished_at
+        return {
+            "total": len(tasks),
+            "completed": sum(task["status"] in ("done", "skipped", "failed") for task in tasks),
+            "done": sum(task["status"] == "done" for task in tasks),
+            "skipped": sum(task["status"] == "skipped" for task in tasks),
+            "failed": sum(task["status"] == "failed" for task in tasks),
+            "running": [task["name"] for task in tasks if task["status"] == "running"],
+            "elapsed_seconds": ((finished_at or time.time()) - started_at) if started_at is not None else 0.0,
+            "finished": finished_at is not None,
+            "tasks": tasks,
+        }
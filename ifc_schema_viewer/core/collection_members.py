@@ -0,0 +1,61 @@
+import rdflib
+from rdflib import RDF
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Iterable
+
+from ifc_schema_viewer.utils import timer_wrapper
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+class CollectionMembers(BaseModel):
+    """按 express 类型分桶的命名个体表，单次扫描 IFC_SCHEMA_GRAPH 构建，供所有概念集合共享"""
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+
+    _buckets: Dict[rdflib.URIRef, Dict[str, Dict[str, Any]]] = PrivateAttr(default_factory=dict)
+    @property
+    def buckets(self) -> Dict[rdflib.URIRef, Dict[str, Dict[str, Any]]]:
+        """express 类型 -> {个体名称: {"iri", "name", "express_type"}}"""
+        return self._buckets
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.rdf_graph.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+    def get_members(self, express_types: Iterable[rdflib.URIRef]) -> Dict[str, Dict[str, Any]]:
+        """合并若干 express 类型的成员表，返回新字典，不修改共享数据"""
+        members = {}
+        for express_type in express_types:
+            members.update(self.buckets.get(express_type, {}))
+        return members
+
+    @timer_wrapper
+    def _retrieve_members(self):
+        g = self.ifc_schema_graph
+        namespace_manager = self.rdf_graph.namespace_manager
+        names: Dict[rdflib.term.Node, List[rdflib.Literal]] = {}
+        for individual, individual_name in g.subject_objects(predicate=ONT["name"]):
+            names.setdefault(individual, []).append(individual_name)
+
+        express_type_labels = {}
+        for individual, express_type in g.subject_objects(predicate=RDF.type):
+            if individual not in names:
+                continue
+            if express_type not in express_type_labels:
+                express_type_labels[express_type] = express_type.n3(namespace_manager)
+            bucket = self._buckets.setdefault(express_type, {})
+            for individual_name in names[individual]:
+                bucket[individual_name] = {
+                    "iri": individual,
+                    "name": individual_name,
+                    "express_type": express_type_labels[express_type]
+                }
+
+        for express_type, bucket in self._buckets.items():
+            self._buckets[express_type] = dict(sorted(bucket.items(), key=lambda item: str(item[0])))
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        self._retrieve_members()
@@ -0,0 +1,334 @@
+import rdflib
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional, Type
+
+from ifc_schema_viewer.utils import timer_wrapper
+from .pset_applicability import PsetApplicability
+from .derived_types import DerivedTypeChains
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+class Concept(BaseModel):
+    """IFC 模式概念的数据模型，不依赖 streamlit，界面层的 ConceptInfo 在其上负责展示
+
+    构建完成后视为只读，可在会话之间及批处理任务中共享。
+    """
+    iri: str = Field(description="The IRI of the concept")
+    rdf_graph: Any = Field(description="The IFC schema graph containing the concept information")
+
+    _express_type: str = PrivateAttr("")
+    @property
+    def express_type(self) -> str:
+        return self._express_type
+
+    _definitions: Optional[str] = PrivateAttr(default=None)
+    @property
+    def definitions(self) -> Optional[str]:
+        return self._definitions
+
+    @property
+    def label(self) -> str:
+        return rdflib.URIRef(self.iri).fragment
+
+    @property
+    def namespace_manager(self):
+        return self.rdf_graph.namespace_manager
+
+    def detached(self) -> "Concept":
+        """不引用图及索引的浅拷贝，只保留已查询的数据，便于跨进程传递"""
+        return self.model_copy(update={name: None for name in type(self).model_fields if name != "iri"})
+
+    @timer_wrapper
+    def _query_definitions(self):
+        results = self.rdf_graph.query(
+            f"""SELECT DISTINCT ?definitions
+            WHERE {{
+                <{self.iri}> <{ONT["definitions"]}> ?definitions.
+            }}"""
+        )
+        for result_row in results:
+            self._definitions = result_row.definitions
+
+    def model_post_init(self, __context):
+        if not isinstance(self.rdf_graph, rdflib.Graph):
+            raise ValueError("rdf_graph must be an instance of rdflib.Graph")
+
+@timer_wrapper
+def _query_enum_members(concept: Concept) -> List[Dict[str, str]]:
+    # 枚举与属性枚举的取值查询相同
+    results = concept.rdf_graph.query(
+        f"""SELECT DISTINCT ?member_name ?member_description
+        WHERE {{
+            <{concept.iri}> <{ONT["hasValue"]}> ?member .
+            ?member a <{ONT["EnumValue"]}>;
+                <{ONT["name"]}> ?member_name;
+                <{ONT["description"]}> ?member_description.
+        }}"""
+    )
+    return [{
+        "enum value": result_row.member_name,
+        "description": result_row.member_description
+    } for result_row in results]
+
+class TypeConcept(Concept):
+    _express_type: str = PrivateAttr("express:Type")
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        self._query_definitions()
+
+class EnumConcept(TypeConcept):
+    _express_type: str = PrivateAttr("express:Enum")
+
+    _members: List[Dict[str, str]] = PrivateAttr(default_factory=list)
+    @property
+    def members(self) -> List[Dict[str, str]]:
+        """[{"enum value", "description"}]"""
+        return self._members
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        self._members.extend(_query_enum_members(self))
+
+class PropertyEnumConcept(Concept):
+    _express_type: str = PrivateAttr("express:PropertyEnumeration")
+
+    _members: List[Dict[str, str]] = PrivateAttr(default_factory=list)
+    @property
+    def members(self) -> List[Dict[str, str]]:
+        """[{"enum value", "description"}]"""
+        return self._members
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        self._query_definitions()
+        self._members.extend(_query_enum_members(self))
+
+class SelectConcept(TypeConcept):
+    _express_type: str = PrivateAttr("express:Select")
+
+    _members: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    @property
+    def members(self) -> List[Dict[str, Any]]:
+        """[{"select value", "express type", "iri"}]"""
+        return self._members
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        results = self.rdf_graph.query(
+            f"""SELECT DISTINCT ?member ?member_name ?express_type
+            WHERE {{
+                <{self.iri}> <{ONT["hasValue"]}> ?member .
+                ?member <{ONT["name"]}> ?member_name;
+                    a ?express_type.
+                FILTER (STRSTARTS(str(?express_type), "{ONT}"))
+            }}"""
+        )
+        for result_row in results:
+            self._members.append({
+                "select value": result_row.member_name,
+                "express type": result_row.express_type.n3(self.namespace_manager),
+                "iri": result_row.member
+            })
+
+class EntityConcept(Concept):
+    pset_applicability: Optional[PsetApplicability] = Field(default=None, description="Precomputed entity to pset template map")
+
+    _express_type: str = PrivateAttr("express:Entity")
+    _super_entities: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    _sub_entities: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    _direct_attributes: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    _inverse_attributes: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    _pset_templates: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+
+    @property
+    def super_entities(self) -> List[Dict[str, Any]]:
+        return self._super_entities
+    @property
+    def sub_entities(self) -> List[Dict[str, Any]]:
+        return self._sub_entities
+    @property
+    def direct_attributes(self) -> List[Dict[str, Any]]:
+        return self._direct_attributes
+    @property
+    def inverse_attributes(self) -> List[Dict[str, Any]]:
+        return self._inverse_attributes
+    @property
+    def pset_templates(self) -> List[Dict[str, Any]]:
+        return self._pset_templates
+
+    @timer_wrapper
+    def _query_related_entities(self, pattern: str, target: List[Dict[str, Any]]):
+        results = self.rdf_graph.query(
+            f"""SELECT DISTINCT ?entity ?entity_name ?definitions
+            WHERE {{
+                {pattern}
+                ?entity <{ONT["name"]}> ?entity_name;
+                    <{ONT["definitions"]}> ?definitions.
+            }}"""
+        )
+        for result_row in results:
+            target.append({
+                "type": "express:Entity",
+                "name": result_row.entity_name,
+                "iri": result_row.entity,
+                "definitions": result_row.definitions
+            })
+
+    @timer_wrapper
+    def _query_attributes(self, predicate: rdflib.URIRef, target: List[Dict[str, Any]], numbered: bool):
+        direct_attr_num = f"<{ONT['direct_attr_num']}> ?direct_attr_num;" if numbered else ""
+        results = self.rdf_graph.query(
+            f"""SELECT DISTINCT ?attr_name ?description ?optional ?direct_attr_num ?cardinality ?attrRange ?express_type
+            WHERE {{
+                <{self.iri}> <{predicate}> ?attr .
+                ?attr <{ONT["name"]}> ?attr_name;
+                    <{ONT["is_optional"]}> ?optional;
+                    <{ONT["description"]}> ?description;
+                    {direct_attr_num}
+                    <{ONT["cardinality"]}> ?cardinality;
+                    <{ONT["attrRange"]}> ?attrRange.
+                ?attrRange a ?express_type.
+                FILTER (STRSTARTS(str(?express_type), "{ONT}"))
+            }}"""
+        )
+        for result_row in results:
+            target.append({
+                "#": int(result_row.direct_attr_num) if numbered else "",
+                "name": result_row.attr_name,
+                "optional": "T" if result_row.optional else "F",
+                "cardinality": result_row.cardinality,
+                "range": result_row.attrRange.fragment,
+                "express type": result_row.express_type.n3(self.namespace_manager),
+                "attr datatype": result_row.attrRange,
+                "description": result_row.description,
+            })
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        self._query_definitions()
+        # 父实体
+        self._query_related_entities(f"<{self.iri}> <{ONT['subClassOf']}>+ ?entity .", self._super_entities)
+        # 子实体
+        self._query_related_entities(f"?entity <{ONT['subClassOf']}>+ <{self.iri}> .", self._sub_entities)
+        # 直接属性
+        self._query_attributes(ONT["hasDirectAttribute"], self._direct_attributes, numbered=True)
+        self._direct_attributes.sort(key=lambda x: x["#"])
+        # 间接属性
+        self._query_attributes(ONT["hasInverseAttribute"], self._inverse_attributes, numbered=False)
+        # 关联的属性集模板（含从父实体继承的），由预计算索引直接给出
+        if self.pset_applicability is not None:
+            for pset in self.pset_applicability.get_inherited_psets(self.iri):
+                if pset["definitions"] is None:
+                    continue
+                self._pset_templates.append({
+                    "name": pset["name"],
+                    "iri": pset["pset"],
+                    "definitions": pset["definitions"],
+                    "express type": pset["express_type"]
+                })
+
+class PsetTemplateConcept(Concept):
+    _express_type: str = PrivateAttr("express:PropertySetTemplate")
+
+    _props: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    @property
+    def props(self) -> List[Dict[str, Any]]:
+        """[{"property", "property_type", "data_type", "dataType", "express type", "description", "range express type"}]"""
+        return self._props
+
+    _applicable_entities: List[rdflib.URIRef] = PrivateAttr(default_factory=list)
+    @property
+    def applicable_entities(self) -> List[rdflib.URIRef]:
+        """适用实体及其所有子实体"""
+        return self._applicable_entities
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        self._query_definitions()
+
+        results = self.rdf_graph.query(
+            f"""SELECT DISTINCT ?prop_name ?description ?data_type ?property_type ?dataType ?express_type ?dataType_express_type
+            WHERE {{
+                <{self.iri}> <{ONT["hasPropTemplate"]}> ?prop .
+                ?prop <{ONT["name"]}> ?prop_name;
+                    <{ONT["data_type"]}> ?data_type;
+                    <{ONT["description"]}> ?description;
+                    <{ONT["dataType"]}> ?dataType.
+                ?dataType a ?dataType_express_type.
+                OPTIONAL {{?prop <{ONT["property_type"]}> ?property_type.}}
+                ?dataType a ?express_type.
+                FILTER (STRSTARTS(str(?express_type), "{ONT}"))
+            }}"""
+        )
+        for result_row in results:
+            self._props.append({
+                "property": result_row.prop_name,
+                "property_type": result_row.property_type,
+                "data_type": result_row.data_type,
+                "dataType": result_row.dataType,
+                "express type": result_row.express_type.n3(self.namespace_manager),
+                "description": result_row.description,
+                "range express type": result_row.dataType_express_type
+            })
+
+        results = self.rdf_graph.query(
+            f"""SELECT DISTINCT ?applicable_entity
+            WHERE {{
+                <{self.iri}> <{ONT["applicableTo"]}> ?ae.
+                ?ae <{ONT["superClassOf"]}>* ?applicable_entity.
+            }}"""
+        )
+        for result_row in results:
+            self._applicable_entities.append(result_row.applicable_entity)
+
+class QsetTemplateConcept(PsetTemplateConcept):
+    _express_type: str = PrivateAttr("express:QuantitySetTemplate")
+
+class DerivedTypeConcept(TypeConcept):
+    derived_type_chains: Optional[DerivedTypeChains] = Field(default=None, description="Resolved derived type chains")
+
+    _express_type: str = PrivateAttr("express:DerivedType")
+    _resolution: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
+    @property
+    def derived_from(self) -> Optional[str]:
+        return self._resolution["derived_from"] if self._resolution else None
+
+    @property
+    def cardinality(self):
+        return self._resolution["cardinality"] if self._resolution else None
+
+    @property
+    def base_type(self) -> Optional[str]:
+        return self._resolution["base_type"] if self._resolution else None
+
+    @property
+    def derivation_chain(self) -> List[str]:
+        return self._resolution["chain"] if self._resolution else []
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        if self.derived_type_chains is not None:
+            self._resolution = self.derived_type_chains.resolve(self.iri)
+        else:
+            derived_from = self.rdf_graph.value(rdflib.URIRef(self.iri), ONT["derivedFrom"])
+            if derived_from is not None:
+                self._resolution = {
+                    "derived_from": derived_from.fragment,
+                    "cardinality": self.rdf_graph.value(rdflib.URIRef(self.iri), ONT["cardinality"]),
+                    "base_type": None,
+                    "chain": [self.label, derived_from.fragment]
+                }
+
+concept_model_map: Dict[str, Type[Concept]] = {
+    "express:Enum": EnumConcept,
+    "express:PropertyEnumeration": PropertyEnumConcept,
+    "express:Select": SelectConcept,
+    "express:Entity": EntityConcept,
+    "express:PropertySetTemplate": PsetTemplateConcept,
+    "express:QuantitySetTemplate": QsetTemplateConcept,
+    "express:DerivedType": DerivedTypeConcept
+}
@@ -0,0 +1,23 @@
+import hashlib
+import os
+
+from typing import Iterable
+
+def compute_dataset_version(paths: Iterable[str]) -> str:
+    """根据源文件的路径、大小与修改时间计算数据集版本号，源文件变化时版本号随之变化
+
+    版本号形如 "<源文件键>-<内容摘要>"，源文件键只取决于源文件路径，同一组源文件的各个版本共用同一前缀。
+    """
+    paths = list(paths)
+    source_digest = hashlib.sha1()
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        source_digest.update(f"{os.path.abspath(path)};".encode("utf-8"))
+        digest.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return f"{source_digest.hexdigest()[:8]}-{digest.hexdigest()[:16]}"
+
+def get_source_key(dataset_version: str) -> str:
+    """数据集版本号中的源文件键，旧格式的版本号没有源文件键时返回空字符串"""
+    source_key, separator, _ = dataset_version.partition("-")
+    return source_key if separator else ""
@@ -0,0 +1,220 @@
+import os
+import glob
+import json
+import logging
+
+import rdflib
+from rdflib import RDF, XSD, Namespace
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional
+
+from ifc_schema_viewer.utils import timer_wrapper, get_metrics_registry, write_json_atomic
+
+from .dataset import get_source_key
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+VOID = Namespace("http://rdfs.org/ns/void#")
+
+# 画像格式变化时递增，旧的缓存文件随之失效
+PROFILE_FORMAT = 1
+PROFILE_FILE_PATTERN = "dataset_profile_%s.json"
+
+class DatasetProfile(BaseModel):
+    """VoID 风格的数据集画像：各子图的谓词频次、类划分、字面量语言/数据类型分布及属性基数
+
+    单次流式扫描全部四元组得到，以数据集版本号为键缓存到磁盘，源文件不变时直接读取缓存。
+    """
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+    dataset_version: str = Field(default="", description="Version of the dataset, used as cache key")
+    cache_dir: Optional[str] = Field(default="./outputs", description="Directory of the cached profile, None disables caching")
+
+    _graphs: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    @property
+    def graphs(self) -> Dict[str, Dict[str, Any]]:
+        """子图名称（n3 缩写）-> VoID 统计：
+        {"triples", "entities", "distinctSubjects", "distinctObjects", "properties", "classes",
+         "propertyPartition": {谓词 IRI: {"triples", "distinctSubjects", "distinctObjects", "maxPerSubject", "avgPerSubject"}},
+         "classPartition": {类 IRI: 实例数}, "languages": {语言: 字面量数}, "datatypes": {数据类型 IRI: 字面量数}}
+        """
+        return self._graphs
+
+    _loaded_from_cache: bool = PrivateAttr(default=False)
+    @property
+    def loaded_from_cache(self) -> bool:
+        return self._loaded_from_cache
+
+    @property
+    def cache_path(self) -> Optional[str]:
+        if not self.cache_dir or not self.dataset_version:
+            return None
+        return os.path.join(self.cache_dir, PROFILE_FILE_PATTERN % self.dataset_version)
+
+    def get_graph_profile(self, graph_name: str) -> Dict[str, Any]:
+        return self._graphs.get(graph_name, {})
+
+    def get_predicate_stats(self, predicate, graph_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """谓词在指定子图（缺省为全部子图之和）中的三元组数、不同主语/宾语数"""
+        predicate = str(predicate)
+        if graph_name is not None:
+            return self.get_graph_profile(graph_name).get("propertyPartition", {}).get(predicate, None)
+        merged = None
+        for profile in self._graphs.values():
+            stats = profile["propertyPartition"].get(predicate, None)
+            if stats is None:
+                continue
+            if merged is None:
+                merged = dict(stats)
+            else:
+                for key in ["triples", "distinctSubjects", "distinctObjects"]:
+                    merged[key] += stats[key]
+                merged["maxPerSubject"] = max(merged["maxPerSubject"], stats["maxPerSubject"])
+        if merged is not None:
+            merged["avgPerSubject"] = merged["triples"] / max(merged["distinctSubjects"], 1)
+        return merged
+
+    @timer_wrapper
+    def _scan(self):
+        namespace_manager = self.rdf_graph.namespace_manager
+        accumulators: Dict[Any, Dict[str, Any]] = {}
+        for graph in self.rdf_graph.graphs():
+            accumulators.setdefault(graph.identifier, None)
+        for s, p, o, c in self.rdf_graph.quads((None, None, None, None)):
+            identifier = c.identifier if isinstance(c, rdflib.Graph) else c
+            acc = accumulators.get(identifier, None)
+            if acc is None:
+                acc = accumulators[identifier] = {
+                    "triples": 0, "subjects": set(), "objects": set(),
+                    "predicates": {}, "classes": {}, "languages": {}, "datatypes": {},
+                }
+            acc["triples"] += 1
+            acc["subjects"].add(s)
+            acc["objects"].add(o)
+            # 谓词 -> {主语: 出现次数}，宾语集合；由此得到频次、不同主语/宾语数及基数
+            predicate_acc = acc["predicates"].get(p, None)
+            if predicate_acc is None:
+                predicate_acc = acc["predicates"][p] = {"per_subject": {}, "objects": set()}
+            predicate_acc["per_subject"][s] = predicate_acc["per_subject"].get(s, 0) + 1
+            predicate_acc["objects"].add(o)
+            if p == RDF.type:
+                acc["classes"].setdefault(o, set()).add(s)
+            if isinstance(o, rdflib.Literal):
+                if o.language:
+                    acc["languages"][o.language] = acc["languages"].get(o.language, 0) + 1
+                datatype = o.datatype or (RDF.langString if o.language else XSD.string)
+                acc["datatypes"][datatype] = acc["datatypes"].get(datatype, 0) + 1
+
+        graphs = {}
+        for identifier, acc in accumulators.items():
+            name = str(identifier.n3(namespace_manager))
+            if acc is None:
+                graphs[name] = self._empty_graph_profile()
+                continue
+            property_partition = {}
+            for predicate, predicate_acc in acc["predicates"].items():
+                per_subject = predicate_acc["per_subject"]
+                triples = sum(per_subject.values())
+                property_partition[str(predicate)] = {
+                    "triples": triples,
+                    "distinctSubjects": len(per_subject),
+                    "distinctObjects": len(predicate_acc["objects"]),
+                    "maxPerSubject": max(per_subject.values()),
+                    "avgPerSubject": triples / len(per_subject),
+                }
+            graphs[name] = {
+                "triples": acc["triples"],
+                "entities": sum(1 for s in acc["subjects"] if isinstance(s, rdflib.URIRef)),
+                "distinctSubjects": len(acc["subjects"]),
+                "distinctObjects": len(acc["objects"]),
+                "properties": len(property_partition),
+                "classes": len(acc["classes"]),
+                "propertyPartition": property_partition,
+                "classPartition": {str(clss): len(members) for clss, members in acc["classes"].items()},
+                "languages": dict(acc["languages"]),
+                "datatypes": {str(datatype): count for datatype, count in acc["datatypes"].items()},
+            }
+        self._graphs = graphs
+
+    @staticmethod
+    def _empty_graph_profile() -> Dict[str, Any]:
+        return {
+            "triples": 0, "entities": 0, "distinctSubjects": 0, "distinctObjects": 0, "properties": 0, "classes": 0,
+            "propertyPartition": {}, "classPartition": {}, "languages": {}, "datatypes": {},
+        }
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"format": PROFILE_FORMAT, "dataset_version": self.dataset_version, "graphs": self._graphs}
+
+    def to_void(self) -> rdflib.Graph:
+        """以 VoID 词汇表示的画像，每个子图为一个 void:Dataset，谓词与类划分为其子集"""
+        void_graph = rdflib.Graph()
+        void_graph.bind("void", VOID)
+        root = INST[f"DatasetProfile_{self.dataset_version}"]
+        void_graph.add((root, RDF.type, VOID.Dataset))
+        for i, (name, profile) in enumerate(self._graphs.items()):
+            node = INST[f"DatasetProfile_{self.dataset_version}_{i}"]
+            void_graph.add((root, VOID.subset, node))
+            void_graph.add((node, RDF.type, VOID.Dataset))
+            void_graph.add((node, rdflib.RDFS.label, rdflib.Literal(name)))
+            for key in ["triples", "entities", "distinctSubjects", "distinctObjects", "properties", "classes"]:
+                void_graph.add((node, VOID[key], rdflib.Literal(profile[key])))
+            for j, (predicate, stats) in enumerate(profile["propertyPartition"].items()):
+                partition = INST[f"DatasetProfile_{self.dataset_version}_{i}_p{j}"]
+                void_graph.add((node, VOID.propertyPartition, partition))
+                void_graph.add((partition, VOID.property, rdflib.URIRef(predicate)))
+                for key in ["triples", "distinctSubjects", "distinctObjects"]:
+                    void_graph.add((partition, VOID[key], rdflib.Literal(stats[key])))
+            for j, (clss, count) in enumerate(profile["classPartition"].items()):
+                partition = INST[f"DatasetProfile_{self.dataset_version}_{i}_c{j}"]
+                void_graph.add((node, VOID.classPartition, partition))
+                void_graph.add((partition, VOID["class"], rdflib.URIRef(clss)))
+                void_graph.add((partition, VOID.entities, rdflib.Literal(count)))
+        return void_graph
+
+    def _load_cache(self) -> bool:
+        path = self.cache_path
+        if path is None or not os.path.isfile(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("[PROFILE] failed to read cached profile %s: %s" % (path, e))
+            return False
+        if content.get("format") != PROFILE_FORMAT or content.get("dataset_version") != self.dataset_version:
+            return False
+        self._graphs = content["graphs"]
+        return True
+
+    def _save_cache(self):
+        path = self.cache_path
+        if path is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 清理同一组源文件旧版本的画像，其他数据集（如不同规模的合成数据集）的画像不受影响
+            source_key = get_source_key(self.dataset_version)
+            if source_key:
+                for stale_path in glob.glob(os.path.join(self.cache_dir, PROFILE_FILE_PATTERN % f"{source_key}-*")):
+                    if stale_path == path:
+                        continue
+                    try:
+                        os.remove(stale_path)
+                    except FileNotFoundError:
+                        # 其他进程已清理
+                        pass
+            write_json_atomic(path, self.to_json())
+        except OSError as e:
+            logging.warning("[PROFILE] failed to write cached profile %s: %s" % (path, e))
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        if self._load_cache():
+            get_metrics_registry().increment("dataset_profile_cache.hit")
+            self._loaded_from_cache = True
+            return
+        get_metrics_registry().increment("dataset_profile_cache.miss")
+        self._scan()
+        self._save_cache()
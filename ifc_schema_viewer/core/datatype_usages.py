@@ -0,0 +1,67 @@
+import rdflib
+from rdflib import RDF
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any
+
+from ifc_schema_viewer.utils import timer_wrapper
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+class DatatypeUsages(BaseModel):
+    """数据类型（属性枚举、派生类型、实体等）-> 使用它的属性集/数量集模板及属性，数据集加载后只构建一次"""
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+
+    _usages: Dict[rdflib.URIRef, List[Dict[str, Any]]] = PrivateAttr(default_factory=dict)
+    @property
+    def usages(self) -> Dict[rdflib.URIRef, List[Dict[str, Any]]]:
+        """数据类型 -> [{"pset template iri", "Property Set", "express type", "property iri", "Property"}]"""
+        return self._usages
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.rdf_graph.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+    def get_usages(self, datatype) -> List[Dict[str, Any]]:
+        return self.usages.get(rdflib.URIRef(datatype), [])
+
+    @timer_wrapper
+    def _retrieve_usages(self):
+        g = self.ifc_schema_graph
+        namespace_manager = self.rdf_graph.namespace_manager
+
+        pset_templates: Dict[rdflib.term.Node, List[Dict[str, Any]]] = {}
+        for pset_template, prop in g.subject_objects(predicate=ONT["hasPropTemplate"], unique=True):
+            pset_template_name = g.value(pset_template, ONT["name"])
+            if pset_template_name is None:
+                continue
+            express_type = ONT["PropertySetTemplate"]
+            for candidate in g.objects(pset_template, RDF.type):
+                if candidate in (ONT["PropertySetTemplate"], ONT["QuantitySetTemplate"]):
+                    express_type = candidate
+                    break
+            pset_templates.setdefault(prop, []).append({
+                "pset template iri": pset_template,
+                "Property Set": pset_template_name,
+                "express type": express_type.n3(namespace_manager)
+            })
+
+        for prop, datatype in g.subject_objects(predicate=ONT["dataType"], unique=True):
+            prop_name = g.value(prop, ONT["name"])
+            if prop_name is None:
+                continue
+            for pset_template in pset_templates.get(prop, ()):
+                self._usages.setdefault(datatype, []).append({
+                    **pset_template,
+                    "property iri": prop,
+                    "Property": prop_name
+                })
+
+        for usages in self._usages.values():
+            usages.sort(key=lambda usage: (str(usage["Property Set"]), str(usage["Property"])))
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        self._retrieve_usages()
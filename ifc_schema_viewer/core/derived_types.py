@@ -0,0 +1,68 @@
+import rdflib
+from rdflib import RDF
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional, Set
+
+from ifc_schema_viewer.utils import timer_wrapper
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+class DerivedTypeChains(BaseModel):
+    """派生类型 -> 派生链及最终基础类型，例如 IfcPositiveLengthMeasure -> IfcLengthMeasure -> REAL，数据集加载后只构建一次"""
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+
+    _chains: Dict[rdflib.URIRef, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    @property
+    def chains(self) -> Dict[rdflib.URIRef, Dict[str, Any]]:
+        """派生类型 -> {"derived_from", "cardinality", "base_type", "chain"}"""
+        return self._chains
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.rdf_graph.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+    def resolve(self, derived_type) -> Optional[Dict[str, Any]]:
+        return self.chains.get(rdflib.URIRef(derived_type), None)
+
+    def get_base_type(self, derived_type) -> Optional[str]:
+        resolution = self.resolve(derived_type)
+        return resolution["base_type"] if resolution else None
+
+    def _resolve_chain(self, derived_type, direct: Dict[rdflib.URIRef, rdflib.URIRef],
+                       resolved: Dict[rdflib.URIRef, List[str]], visiting: Set[rdflib.URIRef]) -> List[str]:
+        # 沿 derivedFrom 递归至非派生类型，结果缓存于 resolved，动态规划
+        if derived_type in resolved:
+            return resolved[derived_type]
+        derived_from = direct[derived_type]
+        visiting.add(derived_type)
+        if derived_from in direct and derived_from not in visiting:
+            chain = [derived_type.fragment] + self._resolve_chain(derived_from, direct, resolved, visiting)
+        else:
+            chain = [derived_type.fragment, derived_from.fragment]
+        visiting.discard(derived_type)
+        resolved[derived_type] = chain
+        return chain
+
+    @timer_wrapper
+    def _retrieve_chains(self):
+        g = self.ifc_schema_graph
+        direct: Dict[rdflib.URIRef, rdflib.URIRef] = {}
+        for derived_type, derived_from in g.subject_objects(predicate=ONT["derivedFrom"]):
+            direct[derived_type] = derived_from
+
+        resolved: Dict[rdflib.URIRef, List[str]] = {}
+        for derived_type in direct:
+            chain = self._resolve_chain(derived_type, direct, resolved, set())
+            self._chains[derived_type] = {
+                "derived_from": direct[derived_type].fragment,
+                "cardinality": g.value(derived_type, ONT["cardinality"]),
+                "base_type": chain[-1],
+                "chain": chain
+            }
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        self._retrieve_chains()
@@ -0,0 +1,93 @@
+import rdflib
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any
+
+from ifc_schema_viewer.utils import timer_wrapper
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+IFC_SCHEMA_GRAPH_NAME = "ifc:IFC_SCHEMA_GRAPH"
+DEFAULT_GRAPH_NAME = "<urn:x-rdflib:default>"
+COMMON_CONCEPT_GRAPH_PREFIX = "ifc:CC_"
+
+class GraphStatistics(BaseModel):
+    """数据集各子图的统计信息，加载时单次扫描全部四元组得到，界面渲染时不再对每个子图求 len()"""
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+
+    _graphs: Dict[str, Dict[str, int]] = PrivateAttr(default_factory=dict)
+    @property
+    def graphs(self) -> Dict[str, Dict[str, int]]:
+        """子图名称（n3 缩写）-> {"triples", "subjects", "predicates"}"""
+        return self._graphs
+
+    _class_count: int = PrivateAttr(default=0)
+    @property
+    def class_count(self) -> int:
+        return self._class_count
+
+    _property_counts: Dict[str, int] = PrivateAttr(default_factory=dict)
+    @property
+    def property_counts(self) -> Dict[str, int]:
+        """ObjectProperty / DatatypeProperty / AnnotationProperty 各自的数量"""
+        return self._property_counts
+
+    @property
+    def graph_count(self) -> int:
+        return len(self._graphs)
+
+    @property
+    def triple_count(self) -> int:
+        return sum(stats["triples"] for stats in self._graphs.values())
+
+    @property
+    def common_concept_graphs(self) -> List[str]:
+        return [name for name in self._graphs if name.startswith(COMMON_CONCEPT_GRAPH_PREFIX)]
+
+    @property
+    def common_concept_triple_count(self) -> int:
+        return sum(self._graphs[name]["triples"] for name in self.common_concept_graphs)
+
+    def get_triple_count(self, graph_name: str) -> int:
+        return self._graphs.get(graph_name, {}).get("triples", 0)
+
+    @timer_wrapper
+    def _count_graphs(self):
+        namespace_manager = self.rdf_graph.namespace_manager
+        # 空子图也要列出，与 Dataset.graphs() 保持一致
+        names = {graph.identifier: str(graph.identifier.n3(namespace_manager)) for graph in self.rdf_graph.graphs()}
+        triples, subjects, predicates = {}, {}, {}
+        for s, p, o, c in self.rdf_graph.quads((None, None, None, None)):
+            identifier = c.identifier if isinstance(c, rdflib.Graph) else c
+            triples[identifier] = triples.get(identifier, 0) + 1
+            subjects.setdefault(identifier, set()).add(s)
+            predicates.setdefault(identifier, set()).add(p)
+        for identifier in triples:
+            if identifier not in names:
+                names[identifier] = str(identifier.n3(namespace_manager))
+        self._graphs = {
+            name: {
+                "triples": triples.get(identifier, 0),
+                "subjects": len(subjects.get(identifier, ())),
+                "predicates": len(predicates.get(identifier, ())),
+            }
+            for identifier, name in names.items()
+        }
+
+    @timer_wrapper
+    def _count_terms(self, classes: List[Any], properties: Dict[str, List[Any]]):
+        self._class_count = len(classes)
+        self._property_counts = {property_type: len(props) for property_type, props in properties.items()}
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        self._count_graphs()
+
+    @classmethod
+    def build(cls, rdf_graph, classes: List[Any], properties: Dict[str, List[Any]]) -> "GraphStatistics":
+        """加载数据集时调用，类与属性数量复用加载器已得到的列表"""
+        statistics = cls(rdf_graph=rdf_graph)
+        statistics._count_terms(classes, properties)
+        return statistics
@@ -0,0 +1,75 @@
+import math
+
+import rdflib
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any
+
+from ifc_schema_viewer.utils import EchartsUtility, GraphAlgoUtility, timer_wrapper
+
+class InheritanceGraph(BaseModel):
+    """rdfs:subClassOf / rdfs:subPropertyOf 继承图的 echarts 节点、边与类别，数据集加载后只构建一次，各会话共享（只读）"""
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+    predicate: Any = Field(default=None, description="Inheritance predicate, e.g. rdfs:subClassOf")
+    obj_range: List[Any] = Field(default_factory=list, description="Nodes shown even without inheritance links, e.g. all classes")
+
+    _echarts_graph_info: Dict[str, List[Dict[str, Any]]] = PrivateAttr(default_factory=lambda: {"nodes": [], "links": [], "categories": []})
+    @property
+    def echarts_graph_info(self) -> Dict[str, List[Dict[str, Any]]]:
+        """{"nodes", "links", "categories"}，直接传给 EchartsUtility.create_normal_echart_options，调用方不应修改"""
+        return self._echarts_graph_info
+
+    @timer_wrapper
+    def _build(self):
+        echarts_graph_info = self._echarts_graph_info
+        namespace_manager = self.rdf_graph.namespace_manager
+        inheritance_map = {}
+        degrees = {}
+        pred_label = self.predicate.n3(namespace_manager)
+        obj_range = set(self.obj_range)
+        obj_range_copy = set(obj_range)
+        category_map = {}
+        for s, o in self.rdf_graph.subject_objects(predicate=self.predicate, unique=True):
+            # 将RDF对象转换为缩写
+            s_label = s.n3(namespace_manager)
+            o_label = o.n3(namespace_manager)
+            if o not in obj_range:
+                if o_label.startswith("_:"):
+                    continue
+                else:
+                    obj_range_copy.add(o)
+
+            inheritance_map.setdefault(o_label, []).append(s_label)
+            degrees[s_label] = degrees.get(s_label, 0) + 1
+            degrees[o_label] = degrees.get(o_label, 0) + 1
+            # 在有向图中添加边，边的标签为谓词
+            echarts_graph_info["links"].append(EchartsUtility.create_normal_edge(s_label, o_label, label=pred_label))
+
+        refreshed_degrees = {}
+        for label in degrees:
+            GraphAlgoUtility.refresh_degree(degrees, inheritance_map, label, refreshed_degrees)
+
+        nodes_initiated = set()
+        for clss in obj_range_copy:
+            s_label = clss.n3(namespace_manager)
+            if s_label in nodes_initiated:
+                continue
+            nodes_initiated.add(s_label)
+            namespace = s_label.split(':')[0]
+            if namespace not in category_map:
+                category_map[namespace] = len(category_map)
+                echarts_graph_info["categories"].append({"name": namespace})
+            echarts_graph_info["nodes"].append({
+                "id": s_label,
+                "name": s_label,
+                "category": category_map[namespace],
+                "symbol": 'circle',
+                "symbolSize": 10 + math.log(refreshed_degrees[s_label]) * 7 if s_label in refreshed_degrees else 10,
+                "draggable": False,
+                "value": clss
+            })
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        self._build()
@@ -0,0 +1,68 @@
+import os
+import time
+
+import rdflib
+from rdflib import RDF, RDFS, OWL, Dataset
+
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+
+from ifc_schema_viewer.utils import timer_wrapper, get_rss_bytes
+from .dataset import compute_dataset_version
+from .graph_statistics import GraphStatistics
+
+DEFAULT_SCHEMA_PATH = "./resources/knowledge_graphs/ifc_schema.trig"
+DEFAULT_ONTOLOGY_PATHS = ["./resources/ontologies/skos.rdf"]
+
+class LoadedSchema(BaseModel):
+    """解析后的 IFC 模式数据集及其版本号、类与属性列表"""
+    dataset: Any = Field(description="RDF dataset of IFC Schema")
+    dataset_version: str = Field(description="Version of the source files, used as cache key")
+    classes: List[Any] = Field(default_factory=list, description="Named classes of the dataset")
+    properties: Dict[str, List[Any]] = Field(default_factory=dict, description="Properties grouped by OWL property type")
+    statistics: Optional[GraphStatistics] = Field(default=None, description="Per-graph statistics computed at load")
+    load_seconds: float = Field(default=0.0, description="Wall time spent parsing and indexing the sources")
+    memory_bytes: int = Field(default=0, description="Resident memory added by the load, an estimate of the dataset footprint")
+
+def get_classes(dataset: Dataset) -> List[rdflib.URIRef]:
+    """owl:Class 的实例以及 rdfs:subClassOf 两端的命名类"""
+    classes = set(dataset.subjects(predicate=RDF.type, object=OWL.Class, unique=True))
+    for so in dataset.subject_objects(predicate=RDFS.subClassOf, unique=True):
+        classes.add(so[0])
+        classes.add(so[1])
+    return [clss for clss in classes if not clss.n3(dataset.namespace_manager).startswith("_:")]
+
+def get_properties(dataset: Dataset) -> Dict[str, List[rdflib.URIRef]]:
+    """按 ObjectProperty / DatatypeProperty / AnnotationProperty 分组的属性"""
+    return {
+        property_type: list(dataset.subjects(predicate=RDF.type, object=OWL[property_type], unique=True))
+        for property_type in ["ObjectProperty", "DatatypeProperty", "AnnotationProperty"]
+    }
+
+def get_source_paths(schema_path: str = DEFAULT_SCHEMA_PATH, ontology_paths: Optional[List[str]] = None) -> List[str]:
+    return [schema_path] + list(DEFAULT_ONTOLOGY_PATHS if ontology_paths is None else ontology_paths)
+
+@timer_wrapper
+def load_ifc_schema(schema_path: str = DEFAULT_SCHEMA_PATH, ontology_paths: Optional[List[str]] = None) -> LoadedSchema:
+    """解析 IFC 模式图谱（TriG）及附加本体（RDF/XML），界面与批处理任务共用"""
+    paths = get_source_paths(schema_path, ontology_paths)
+    for path in paths:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"IFC Schema resource not found: {path}")
+    time_start, rss_start = time.perf_counter(), get_rss_bytes()
+    dataset = Dataset()
+    dataset.parse(schema_path, format="trig")
+    for path in paths[1:]:
+        dataset.parse(path, format="xml")
+    classes = get_classes(dataset)
+    properties = get_properties(dataset)
+    return LoadedSchema(
+        dataset=dataset,
+        dataset_version=compute_dataset_version(paths),
+        classes=classes,
+        properties=properties,
+        statistics=GraphStatistics.build(dataset, classes, properties),
+        load_seconds=time.perf_counter() - time_start,
+        # 常驻内存的增量，同一进程中重复加载时可能因内存复用而偏小
+        memory_bytes=max(get_rss_bytes() - rss_start, 0)
+    )
@@ -0,0 +1,95 @@
+import rdflib
+from rdflib import RDF, RDFS, OWL, SKOS
+
+from collections import Counter
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any
+
+from ifc_schema_viewer.utils import timer_wrapper
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+class OntologyMetadata(BaseModel):
+    """本体层面的元数据缓存，用于填充下拉框等控件，数据集加载后只构建一次"""
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+
+    _express_types: List[str] = PrivateAttr(default_factory=list)
+    @property
+    def express_types(self) -> List[str]:
+        """express:SchematicConcept 的所有子类（局部名）"""
+        return self._express_types
+
+    _instance_counts: Dict[str, int] = PrivateAttr(default_factory=dict)
+    @property
+    def instance_counts(self) -> Dict[str, int]:
+        """IFC_SCHEMA_GRAPH 中每个 express 类型的直接实例数量（以局部名为键）"""
+        return self._instance_counts
+
+    _data_schemas: Dict[rdflib.URIRef, Dict[str, rdflib.URIRef]] = PrivateAttr(default_factory=dict)
+    @property
+    def data_schemas(self) -> Dict[rdflib.URIRef, Dict[str, rdflib.URIRef]]:
+        """IfcSchema 根节点 -> {概念层名称: 概念层}"""
+        return self._data_schemas
+
+    _conceptual_groups: Dict[rdflib.URIRef, Dict[str, Dict[str, Any]]] = PrivateAttr(default_factory=dict)
+    @property
+    def conceptual_groups(self) -> Dict[rdflib.URIRef, Dict[str, Dict[str, Any]]]:
+        """概念层 -> {概念组名称: {"iri", "definitions"}}"""
+        return self._conceptual_groups
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.rdf_graph.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+    def get_instance_count(self, express_type: str) -> int:
+        return self.instance_counts.get(express_type, 0)
+
+    @timer_wrapper
+    def _retrieve_express_types(self):
+        # 等价于 ?express_type a owl:Class; rdfs:subClassOf+ express:SchematicConcept 且位于 express 命名空间
+        express_types = set()
+        for clss in self.rdf_graph.transitive_subjects(RDFS.subClassOf, ONT["SchematicConcept"]):
+            if clss == ONT["SchematicConcept"] or not str(clss).startswith(str(ONT)):
+                continue
+            if (clss, RDF.type, OWL.Class) in self.rdf_graph:
+                express_types.add(clss.fragment)
+        self._express_types = sorted(express_types)
+
+    @timer_wrapper
+    def _retrieve_instance_counts(self):
+        # 单次扫描 rdf:type 三元组，统计每个 express 类型的实例数量
+        counts = Counter(
+            obj.fragment for obj in self.ifc_schema_graph.objects(predicate=RDF.type)
+            if isinstance(obj, rdflib.URIRef) and str(obj).startswith(str(ONT))
+        )
+        self._instance_counts = dict(counts)
+
+    @timer_wrapper
+    def _retrieve_concept_layers(self):
+        g = self.ifc_schema_graph
+        for root_node in g.subjects(RDF.type, ONT["IfcSchema"], unique=True):
+            self._data_schemas[root_node] = {}
+        for layer in g.subjects(RDF.type, ONT["Layer"], unique=True):
+            layer_name = g.value(layer, ONT["name"])
+            if layer_name is None:
+                continue
+            for root_node in g.objects(layer, SKOS.inScheme, unique=True):
+                self._data_schemas.setdefault(root_node, {})[layer_name] = layer
+            groups = {}
+            for group in g.objects(layer, ONT["hasConceptualGroup"], unique=True):
+                if (group, RDF.type, ONT["Group"]) not in g:
+                    continue
+                group_name = g.value(group, ONT["name"])
+                group_definitions = g.value(group, ONT["definitions"])
+                if group_name is None or group_definitions is None:
+                    continue
+                groups[group_name] = {"iri": group, "definitions": group_definitions}
+            self._conceptual_groups[layer] = groups
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        self._retrieve_express_types()
+        self._retrieve_instance_counts()
+        self._retrieve_concept_layers()
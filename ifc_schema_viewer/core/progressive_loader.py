@@ -0,0 +1,277 @@
+import os
+import re
+import time
+import logging
+import threading
+
+import rdflib
+from rdflib import Dataset, RDFS
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional, Tuple
+
+from ifc_schema_viewer.utils import timer_wrapper, get_rss_bytes
+from .dataset import compute_dataset_version
+from .graph_statistics import GraphStatistics
+from .hierarchy import InheritanceGraph
+from .loader import LoadedSchema, DEFAULT_SCHEMA_PATH, get_classes, get_properties, get_source_paths
+
+# TriG 中影响块结构的记号：字符串、IRI 与注释整体跳过，其中的括号与句点不计
+_TRIG_TOKEN = re.compile(
+    r'"""(?:[^"\\]|\\.|"(?!""))*"""'
+    r"|'''(?:[^'\\]|\\.|'(?!''))*'''"
+    r'|"(?:[^"\\\n]|\\.)*"'
+    r"|'(?:[^'\\\n]|\\.)*'"
+    r'|<[^<>"{}|^`\\\s]*>'
+    r'|#[^\n]*'
+    r'|[{}\[\]()]'
+    r'|\.(?=\s)'
+)
+_DIRECTIVE = re.compile(r'^\s*(?:@prefix|@base|PREFIX|BASE)\b[^\n]*$', re.IGNORECASE | re.MULTILINE)
+_BNODE_LABEL = re.compile(r'(?<![\w:])_:[\w\-]+(?:\.[\w\-]+)*')
+
+LOAD_STAGES = ["pending", "default_graph", "named_graphs", "indexing", "ready"]
+
+def _strip_comments(text: str) -> str:
+    # IRI 中的 # 不是注释，借助记号区分
+    return _TRIG_TOKEN.sub(lambda match: " " if match.group().startswith("#") else match.group(), text)
+
+def split_trig(text: str) -> Optional[Tuple[str, str, List[Tuple[str, str]]]]:
+    """将 TriG 文档拆为 (前缀声明, 默认图文本, [(命名图名称, 图内文本)])；块结构不完整时返回 None"""
+    default_parts, graphs = [], []
+    depth, last, statement_end, body_start, graph_name = 0, 0, 0, 0, ""
+    for match in _TRIG_TOKEN.finditer(text):
+        token = match.group()
+        if token == "." and depth == 0:
+            statement_end = match.end()
+        elif token == "{":
+            if depth == 0:
+                # 花括号前最后一个顶层语句之后的内容为图名称（可带 GRAPH 关键字），之前的属于默认图
+                head_start = max(statement_end, last)
+                default_parts.append(text[last:head_start])
+                name = _strip_comments(text[head_start:match.start()]).split()
+                graph_name = name[-1] if name and name[-1].upper() != "GRAPH" else ""
+                body_start = match.end()
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0:
+                body = text[body_start:match.start()]
+                if graph_name:
+                    graphs.append((graph_name, body))
+                else:
+                    # 以 {} 包裹的默认图
+                    default_parts.append("\n" + body + "\n")
+                last = statement_end = match.end()
+    if depth != 0:
+        return None
+    default_parts.append(text[last:])
+    default_text = "".join(default_parts)
+    return "\n".join(_DIRECTIVE.findall(default_text)) + "\n", default_text, graphs
+
+def shares_bnode_labels(blocks: List[str]) -> bool:
+    """空白节点标签（_:b0）的作用域是整个文档，同一标签出现在多个块中时分块解析会把它拆成不同的节点"""
+    seen = set()
+    for block in blocks:
+        labels = set(_BNODE_LABEL.findall(block))
+        if labels & seen:
+            return True
+        seen |= labels
+    return False
+
+def _resolve_graph_name(dataset: Dataset, graph_name: str) -> Optional[rdflib.URIRef]:
+    # 命名图名称为 <IRI> 或前缀名；空白节点名称无法在解析后对应回图，返回 None
+    if graph_name.startswith("<"):
+        return rdflib.URIRef(graph_name[1:-1])
+    try:
+        return dataset.namespace_manager.expand_curie(graph_name)
+    except ValueError:
+        return None
+
+class ProgressiveSchemaLoader(BaseModel):
+    """在后台线程中分阶段加载 IFC 模式数据集，界面随各阶段完成逐步可用
+
+    1. default_graph：解析前缀与默认图（本体）及附加本体，随即给出命名空间、类与属性、默认图统计与继承图的快照
+    2. named_graphs：逐个解析 IFC_SCHEMA_GRAPH 与各 CC_ 子图
+    3. indexing：全部子图的统计，得到与 load_ifc_schema 相同的 LoadedSchema
+
+    文档无法安全分块（块结构不完整、多个块共用空白节点标签）或分块解析出错时，整体解析，命名图与默认图一同就绪。
+    rdflib 的内存存储不支持边写边读，加载完成前界面只使用快照，不访问数据集本身。
+    """
+    schema_path: str = Field(default=DEFAULT_SCHEMA_PATH, description="Path to the IFC schema TriG file")
+    ontology_paths: Optional[List[str]] = Field(default=None, description="Extra ontology files (RDF/XML), None uses the defaults")
+
+    _stage: str = PrivateAttr(default="pending")
+    _error: Optional[str] = PrivateAttr(default=None)
+    _snapshot: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    _graphs: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _result: Optional[LoadedSchema] = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _ready_event: Any = PrivateAttr(default_factory=threading.Event)
+    _thread: Any = PrivateAttr(default=None)
+    _started_at: float = PrivateAttr(default=0.0)
+    _stage_started_at: float = PrivateAttr(default=0.0)
+    _stage_seconds: Dict[str, float] = PrivateAttr(default_factory=dict)
+
+    @property
+    def stage(self) -> str:
+        return self._stage
+
+    @property
+    def ready(self) -> bool:
+        return self._stage == "ready"
+
+    @property
+    def failed(self) -> bool:
+        return self._stage == "failed"
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    @property
+    def result(self) -> Optional[LoadedSchema]:
+        """加载完成后的 LoadedSchema，之前为 None"""
+        return self._result
+
+    @property
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """默认图解析完成后的快照 {"namespaces", "classes", "properties", "labels", "statistics", "class_hierarchy", "property_hierarchy"}"""
+        return self._snapshot
+
+    def _set_stage(self, stage: str):
+        now = time.perf_counter()
+        with self._lock:
+            self._stage_seconds[self._stage] = now - self._stage_started_at if self._stage != "pending" else 0.0
+            self._stage = stage
+        self._stage_started_at = now
+        logging.info("[LOADER] stage %s after %.2f s" % (stage, now - self._started_at))
+
+    def _update_graph(self, graph_name: str, **fields):
+        with self._lock:
+            self._graphs.setdefault(graph_name, {"name": graph_name, "status": "pending", "triples": 0, "seconds": 0.0}).update(fields)
+
+    @timer_wrapper
+    def _parse_default_graph(self, dataset: Dataset, default_text: str, paths: List[str]):
+        dataset.parse(data=default_text, format="trig")
+        for path in paths[1:]:
+            dataset.parse(path, format="xml")
+        classes = get_classes(dataset)
+        properties = get_properties(dataset)
+        self._snapshot = {
+            "namespaces": [(prefix, str(namespace)) for prefix, namespace in dataset.namespaces()],
+            "classes": classes,
+            "properties": properties,
+            # 加载期间界面不访问数据集的命名空间管理器，类与属性的缩写在此一并算好
+            "labels": {iri: iri.n3(dataset.namespace_manager) for iri in classes + [prop for props in properties.values() for prop in props]},
+            # 此时只有默认图，统计在加载完成后重新计算
+            "statistics": GraphStatistics.build(dataset, classes, properties),
+            # 继承图只涉及默认图，后续解析命名图不影响，加载完成后直接登记到查询服务
+            "class_hierarchy": InheritanceGraph(rdf_graph=dataset, predicate=RDFS.subClassOf, obj_range=classes),
+            "property_hierarchy": InheritanceGraph(rdf_graph=dataset, predicate=RDFS.subPropertyOf,
+                                                   obj_range=[prop for props in properties.values() for prop in props]),
+        }
+
+    @timer_wrapper
+    def _parse_named_graphs(self, dataset: Dataset, directives: str, graphs: List[Tuple[str, str]]):
+        for graph_name, _ in graphs:
+            self._update_graph(graph_name)
+        for graph_name, body in graphs:
+            time_start = time.perf_counter()
+            self._update_graph(graph_name, status="parsing")
+            dataset.parse(data=f"{directives}{graph_name} {{\n{body}\n}}\n", format="trig")
+            identifier = _resolve_graph_name(dataset, graph_name)
+            self._update_graph(graph_name, status="done", seconds=time.perf_counter() - time_start,
+                               triples=len(dataset.graph(identifier)) if identifier is not None else 0)
+
+    def _parse_blocks(self, text: str, paths: List[str]) -> Optional[Dataset]:
+        # 分块解析，文档无法安全分块时返回 None
+        blocks = split_trig(text)
+        if blocks is None:
+            logging.warning("[LOADER] %s could not be split into graph blocks, parsing it as a whole" % self.schema_path)
+            return None
+        directives, default_text, graphs = blocks
+        if shares_bnode_labels([default_text] + [body for _, body in graphs]):
+            logging.warning("[LOADER] %s shares blank node labels between graphs, parsing it as a whole" % self.schema_path)
+            return None
+        dataset = Dataset()
+        self._parse_default_graph(dataset, default_text, paths)
+        self._set_stage("named_graphs")
+        self._parse_named_graphs(dataset, directives, graphs)
+        return dataset
+
+    def _load(self):
+        try:
+            paths = get_source_paths(self.schema_path, self.ontology_paths)
+            rss_start = get_rss_bytes()
+            self._set_stage("default_graph")
+            with open(self.schema_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            try:
+                dataset = self._parse_blocks(text, paths)
+            except Exception as e:
+                # 拆分结果与 rdflib 的语法理解不一致时（如少见的写法），退回整体解析
+                logging.warning("[LOADER] parsing %s in graph blocks failed (%s: %s), parsing it as a whole" % (
+                    self.schema_path, type(e).__name__, e))
+                dataset = None
+            if dataset is None:
+                with self._lock:
+                    self._graphs.clear()
+                dataset = Dataset()
+                self._parse_default_graph(dataset, text, paths)
+            del text
+            self._set_stage("indexing")
+            classes, properties = self._snapshot["classes"], self._snapshot["properties"]
+            self._result = LoadedSchema(
+                dataset=dataset,
+                dataset_version=compute_dataset_version(paths),
+                classes=classes,
+                properties=properties,
+                statistics=GraphStatistics.build(dataset, classes, properties),
+                load_seconds=time.perf_counter() - self._started_at,
+                memory_bytes=max(get_rss_bytes() - rss_start, 0),
+            )
+            self._set_stage("ready")
+        except Exception as e:
+            logging.exception("[LOADER] failed to load %s" % self.schema_path)
+            with self._lock:
+                self._error = f"{type(e).__name__}: {e}"
+                self._stage = "failed"
+        finally:
+            self._ready_event.set()
+
+    def start(self):
+        """在后台线程中开始加载并立即返回；源文件缺失时直接抛出 FileNotFoundError，重复调用无效"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            for path in get_source_paths(self.schema_path, self.ontology_paths):
+                if not os.path.isfile(path):
+                    raise FileNotFoundError(f"IFC Schema resource not found: {path}")
+            self._started_at = self._stage_started_at = time.perf_counter()
+            self._thread = threading.Thread(target=self._load, name="schema-loader", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待加载结束（完成或失败），返回是否已完成"""
+        self._ready_event.wait(timeout)
+        return self.ready
+
+    def get_progress(self) -> Dict[str, Any]:
+        """{"stage", "elapsed_seconds", "stage_seconds", "graphs_total", "graphs_done", "triples", "graphs", "error"}"""
+        with self._lock:
+            graphs = [dict(graph) for graph in self._graphs.values()]
+            stage, stage_seconds = self._stage, dict(self._stage_seconds)
+        elapsed = (self._result.load_seconds if self._result is not None else time.perf_counter() - self._started_at) if self._started_at else 0.0
+        return {
+            "stage": stage,
+            "elapsed_seconds": elapsed,
+            "stage_seconds": stage_seconds,
+            "graphs_total": len(graphs),
+            "graphs_done": sum(graph["status"] == "done" for graph in graphs),
+            "triples": sum(graph["triples"] for graph in graphs),
+            "graphs": graphs,
+            "error": self._error,
+        }
@@ -0,0 +1,99 @@
+import rdflib
+from rdflib import RDF
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Set, FrozenSet, Iterable
+
+from ifc_schema_viewer.utils import timer_wrapper
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+class PsetApplicability(BaseModel):
+    """实体 -> 适用的属性集/数量集模板，考虑 express:subClassOf 继承关系，数据集加载后只构建一次
+    
+    - inherited: 实体自身及其所有父实体上声明的模板（即实体实际可用的模板）
+    - subtree: 实体自身及其所有子实体上声明的模板（即“按实体检索”所展示的模板）
+    """
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+
+    _psets: Dict[rdflib.URIRef, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    @property
+    def psets(self) -> Dict[rdflib.URIRef, Dict[str, Any]]:
+        """模板 -> {"pset", "name", "express_type", "definitions"}"""
+        return self._psets
+
+    _inherited: Dict[rdflib.URIRef, FrozenSet[rdflib.URIRef]] = PrivateAttr(default_factory=dict)
+    _subtree: Dict[rdflib.URIRef, FrozenSet[rdflib.URIRef]] = PrivateAttr(default_factory=dict)
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.rdf_graph.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+    def get_inherited_psets(self, entity) -> List[Dict[str, Any]]:
+        return [self.psets[pset] for pset in self._inherited.get(rdflib.URIRef(entity), ())]
+
+    def get_subtree_psets(self, entity) -> List[Dict[str, Any]]:
+        return [self.psets[pset] for pset in self._subtree.get(rdflib.URIRef(entity), ())]
+
+    def get_psets_by_entities(self, entities: Iterable, include_subtypes: bool = True) -> Dict[str, Dict[str, Any]]:
+        """多个实体的适用模板取并集，以模板名称为键"""
+        table = self._subtree if include_subtypes else self._inherited
+        pset_iris: Set[rdflib.URIRef] = set()
+        for entity in entities:
+            pset_iris |= table.get(rdflib.URIRef(entity), frozenset())
+        psets = {self.psets[pset]["name"]: self.psets[pset] for pset in pset_iris}
+        return dict(sorted(psets.items(), key=lambda item: str(item[0])))
+
+    @staticmethod
+    def _closure(entity, edges: Dict[rdflib.URIRef, Set[rdflib.URIRef]], direct: Dict[rdflib.URIRef, Set[rdflib.URIRef]],
+                 closure: Dict[rdflib.URIRef, FrozenSet[rdflib.URIRef]], visiting: Set[rdflib.URIRef]):
+        # 沿继承边递归合并，结果缓存于 closure，动态规划
+        if entity in closure:
+            return closure[entity]
+        visiting.add(entity)
+        psets = set(direct.get(entity, ()))
+        for neighbour in edges.get(entity, ()):
+            if neighbour in visiting:
+                continue
+            psets |= PsetApplicability._closure(neighbour, edges, direct, closure, visiting)
+        visiting.discard(entity)
+        closure[entity] = frozenset(psets)
+        return closure[entity]
+
+    @timer_wrapper
+    def _retrieve_applicability(self):
+        g = self.ifc_schema_graph
+        namespace_manager = self.rdf_graph.namespace_manager
+
+        direct: Dict[rdflib.URIRef, Set[rdflib.URIRef]] = {}
+        for express_type in (ONT["PropertySetTemplate"], ONT["QuantitySetTemplate"]):
+            express_type_label = express_type.n3(namespace_manager)
+            for pset in g.subjects(RDF.type, express_type, unique=True):
+                pset_name = g.value(pset, ONT["name"])
+                if pset_name is None:
+                    continue
+                self._psets[pset] = {
+                    "pset": pset,
+                    "name": pset_name,
+                    "express_type": express_type_label,
+                    "definitions": g.value(pset, ONT["definitions"])
+                }
+                for entity in g.objects(pset, ONT["applicableTo"], unique=True):
+                    direct.setdefault(entity, set()).add(pset)
+
+        parents: Dict[rdflib.URIRef, Set[rdflib.URIRef]] = {}
+        children: Dict[rdflib.URIRef, Set[rdflib.URIRef]] = {}
+        for sub_entity, super_entity in g.subject_objects(predicate=ONT["subClassOf"], unique=True):
+            parents.setdefault(sub_entity, set()).add(super_entity)
+            children.setdefault(super_entity, set()).add(sub_entity)
+
+        entities = set(g.subjects(RDF.type, ONT["Entity"], unique=True)) | set(direct) | set(parents) | set(children)
+        for entity in entities:
+            self._closure(entity, parents, direct, self._inherited, set())
+            self._closure(entity, children, direct, self._subtree, set())
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        self._retrieve_applicability()
@@ -0,0 +1,149 @@
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+from ifc_schema_viewer.utils import timer_wrapper
+
+_TRUE_VALUES = {"true", "t", "1", "yes", ".t."}
+_FALSE_VALUES = {"false", "f", "0", "no", ".f."}
+_LOGICAL_VALUES = {"true", "false", "unknown", ".t.", ".f.", ".u."}
+
+def parse_cardinality(cardinality) -> Optional[Tuple[int, Optional[int]]]:
+    """解析聚合类型的基数，如 "LIST [2:3]"、"[1:?]"，返回 (下界, 上界)，上界为 None 表示无上限；非聚合类型返回 None"""
+    if cardinality is None:
+        return None
+    match = re.search(r"\[\s*(\d+)\s*:\s*(\d+|\?)\s*\]", str(cardinality))
+    if match is None:
+        return None
+    upper = None if match.group(2) == "?" else int(match.group(2))
+    return int(match.group(1)), upper
+
+def split_aggregate(values: pd.Series) -> pd.Series:
+    """将聚合值单元格拆分为列表，支持 "[a, b]" 与 "a;b" 两种写法"""
+    return values.astype(str).str.strip().str.strip("[]()").str.split(r"\s*[;,]\s*", regex=True)
+
+def check_base_type(values: pd.Series, base_type: str) -> pd.Series:
+    """对一列取值按 EXPRESS 基础类型做向量化检查，返回布尔掩码（True 表示合法）"""
+    text = values.astype(str).str.strip()
+    if base_type in ("REAL", "NUMBER"):
+        return pd.to_numeric(text, errors="coerce").notna()
+    elif base_type == "INTEGER":
+        numbers = pd.to_numeric(text, errors="coerce")
+        return numbers.notna() & (np.floor(numbers) == numbers)
+    elif base_type == "BOOLEAN":
+        return text.str.lower().isin(_TRUE_VALUES | _FALSE_VALUES)
+    elif base_type == "LOGICAL":
+        return text.str.lower().isin(_LOGICAL_VALUES | _TRUE_VALUES | _FALSE_VALUES)
+    elif base_type == "STRING":
+        return pd.Series(True, index=values.index)
+    else:
+        # 未知基础类型不做约束
+        return pd.Series(True, index=values.index)
+
+def is_valid_base_value(value, base_type: str) -> bool:
+    """check_base_type 的单值版本，供逐个校验时使用"""
+    if base_type in ("REAL", "NUMBER", "INTEGER"):
+        if isinstance(value, bool):
+            return False
+        try:
+            number = float(str(value).strip())
+        except ValueError:
+            return False
+        if number != number:
+            return False
+        return base_type != "INTEGER" or number.is_integer()
+    elif base_type == "BOOLEAN":
+        return isinstance(value, bool) or str(value).strip().lower() in _TRUE_VALUES | _FALSE_VALUES
+    elif base_type == "LOGICAL":
+        return isinstance(value, bool) or str(value).strip().lower() in _LOGICAL_VALUES | _TRUE_VALUES | _FALSE_VALUES
+    return True
+
+def check_aggregate(values: pd.Series, element_check: Callable[[pd.Series], pd.Series], bounds: Tuple[int, Optional[int]]) -> pd.Series:
+    """聚合值的向量化检查：拆分后逐元素检查，再检查元素个数是否满足基数 bounds"""
+    elements = split_aggregate(values)
+    element_valid = element_check(elements.explode()).groupby(level=0).all()
+    lengths = elements.str.len()
+    lower, upper = bounds
+    length_valid = lengths >= lower
+    if upper is not None:
+        length_valid &= lengths <= upper
+    return element_valid & length_valid
+
+class PsetBatchValidator(BaseModel):
+    """基于属性集模板对批量数据逐列进行向量化校验
+
+    prop_specs 中每一项描述一个属性：
+    - {"name", "kind": "derived", "base_type", "cardinality"}
+    - {"name", "kind": "enum", "values"}
+    - {"name", "kind": "reference"}
+    任一项可附带 "validator"（TypeValidator），此时以其为准
+    """
+    pset_name: str = Field(default="", description="Name of the property set template")
+    prop_specs: List[Dict[str, Any]] = Field(default_factory=list, description="Validation specs of the template properties")
+
+    @property
+    def columns(self) -> List[str]:
+        return [spec["name"] for spec in self.prop_specs]
+
+    def _check_column(self, values: pd.Series, spec: Dict[str, Any]) -> Tuple[pd.Series, str]:
+        # 若提供了由模式编译的校验器，则直接使用
+        if spec.get("validator", None) is not None:
+            return spec["validator"].check(values), spec["validator"].reason
+        kind = spec["kind"]
+        if kind == "enum":
+            allowed = {str(value) for value in spec["values"]}
+            return values.astype(str).str.strip().isin(allowed), "not one of the enumeration values"
+        elif kind == "reference":
+            numbers = pd.to_numeric(values.astype(str).str.strip(), errors="coerce")
+            return numbers.notna() & (numbers >= 1) & (np.floor(numbers) == numbers), "not a positive instance id"
+
+        base_type = spec.get("base_type")
+        bounds = parse_cardinality(spec.get("cardinality"))
+        if bounds is None:
+            return check_base_type(values, base_type), f"not a valid {base_type}"
+
+        # 聚合类型：拆分后逐元素检查，再检查元素个数
+        lower, upper = bounds
+        bound_text = f"[{lower}:{'?' if upper is None else upper}]"
+        valid = check_aggregate(values, lambda elements: check_base_type(elements, base_type), bounds)
+        return valid, f"not an aggregate {bound_text} of {base_type}"
+
+    @timer_wrapper
+    def validate(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """校验每一行，返回违规明细与吞吐统计；空值视为未填写，不计为违规"""
+        time_start = time.perf_counter()
+        violations = []
+        for spec in self.prop_specs:
+            if spec["name"] not in df.columns:
+                continue
+            values = df[spec["name"]]
+            present = values.notna() & (values.astype(str).str.strip() != "")
+            if not present.any():
+                continue
+            valid, reason = self._check_column(values[present], spec)
+            invalid_index = valid.index[~valid.to_numpy(dtype=bool)]
+            if len(invalid_index):
+                violations.append(pd.DataFrame({
+                    "row": invalid_index,
+                    "property": spec["name"],
+                    "value": values.loc[invalid_index].astype(str).to_numpy(),
+                    "reason": reason
+                }))
+        if violations:
+            violations = pd.concat(violations, ignore_index=True).sort_values(["row", "property"], kind="stable")
+        else:
+            violations = pd.DataFrame(columns=["row", "property", "value", "reason"])
+        seconds = time.perf_counter() - time_start
+        return {
+            "violations": violations,
+            "rows": len(df),
+            "invalid_rows": violations["row"].nunique(),
+            "unknown_columns": [column for column in df.columns if column not in self.columns],
+            "seconds": seconds,
+            "rows_per_second": len(df) / seconds if seconds > 0 else float("inf")
+        }
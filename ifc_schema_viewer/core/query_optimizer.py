@@ -0,0 +1,221 @@
+import threading
+
+import rdflib
+from rdflib import RDF, Variable, BNode
+import rdflib.plugins.sparql.algebra as sparql_algebra
+from rdflib.plugins.sparql.algebra import translateQuery
+from rdflib.plugins.sparql.parserutils import CompValue
+from rdflib.plugins.sparql.sparql import Query
+from rdflib.plugins.sparql import CUSTOM_EVALS
+from rdflib.plugins.sparql.evaluate import evalBGP
+from rdflib.paths import Path
+
+import pandas as pd
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from ifc_schema_viewer.utils import timer_wrapper
+from .sparql_parser import parse_query
+# 剖析钩子须先于本模块的自定义求值登记
+from . import query_profiler  # noqa: F401
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+TriplePattern = Tuple[Any, Any, Any]
+# 重排后的 BGP 带有该标记，求值时保持给定顺序
+OPTIMIZED_ORDER_KEY = "optimized_order"
+
+def _is_variable(term) -> bool:
+    return isinstance(term, (Variable, BNode))
+
+def _pattern_variables(pattern: TriplePattern) -> Set[Any]:
+    return {term for term in pattern if _is_variable(term)}
+
+def _endpoint_variables(pattern: TriplePattern) -> Set[Any]:
+    return {term for term in (pattern[0], pattern[2]) if _is_variable(term)}
+
+def _eval_optimized_bgp(ctx, part):
+    # rdflib 的 evalPart 在求值前会再按未绑定项个数排序一次，重排过的 BGP 直接交给 evalBGP
+    if part.name != "BGP" or OPTIMIZED_ORDER_KEY not in part:
+        raise NotImplementedError()
+    return evalBGP(ctx, part.triples)
+
+CUSTOM_EVALS["ifc_schema_viewer_optimized_bgp"] = _eval_optimized_bgp
+
+_rdflib_reorder_triples = sparql_algebra.reorderTriples
+_written_order = threading.local()
+
+def _reorder_triples(triples):
+    # 优化器转换查询时保留三元组模式的书写顺序，其余转换仍按 rdflib 的规则（已绑定项多者优先）排序
+    if getattr(_written_order, "enabled", False):
+        return list(triples)
+    return _rdflib_reorder_triples(triples)
+
+sparql_algebra.reorderTriples = _reorder_triples
+
+class QueryOptimizer(BaseModel):
+    """基于谓词统计的 BGP 连接重排序
+
+    rdflib 只按已绑定项的个数排列三元组模式，`?s ?p ?o` 与 `?s a express:Entity` 同样排在最前。
+    这里以数据集画像中各谓词的三元组数、不同主语/宾语数估计每个模式在已绑定变量下的结果行数，
+    贪心地优先执行估计行数最少且与已绑定变量相连的模式。
+    """
+    dataset_profile: Any = Field(default=None, description="DatasetProfile providing per-predicate statistics")
+    graph_name: Optional[str] = Field(default=None, description="Subgraph (n3 name) the queries run on, None for the whole dataset")
+
+    _graph_profile: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    def _predicate_stats(self, predicate) -> Optional[Dict[str, Any]]:
+        return self.dataset_profile.get_predicate_stats(predicate, self.graph_name)
+
+    def _is_bound(self, term, bound: Set[Any]) -> bool:
+        return not _is_variable(term) or term in bound
+
+    def _is_expensive(self, pattern: TriplePattern) -> bool:
+        """属性路径（如 express:superClassOf*）与画像中没有统计的谓词，无法估计其结果行数"""
+        p = pattern[1]
+        return isinstance(p, Path) or (not _is_variable(p) and self._predicate_stats(p) is None)
+
+    def estimate(self, pattern: TriplePattern, bound: Set[Any]) -> float:
+        """已绑定变量集合为 bound 时，每个输入行经该模式产生的结果行数估计"""
+        s, p, o = pattern
+        s_bound, o_bound = self._is_bound(s, bound), self._is_bound(o, bound)
+        stats = None if _is_variable(p) or isinstance(p, Path) else self._predicate_stats(p)
+        if stats is not None:
+            if p == RDF.type and not _is_variable(o) and not s_bound:
+                classes = self._graph_profile.get("classPartition", {})
+                if classes:
+                    return float(classes.get(str(o), 0))
+            triples = stats["triples"]
+            distinct_subjects, distinct_objects = stats["distinctSubjects"], stats["distinctObjects"]
+        else:
+            # 变量谓词、属性路径与没有统计的谓词按整个子图的规模估计，不视为空结果
+            triples = self._graph_profile.get("triples", 0)
+            distinct_subjects = self._graph_profile.get("distinctSubjects", 0)
+            distinct_objects = self._graph_profile.get("distinctObjects", 0)
+            if _is_variable(p) and p in bound:
+                # 谓词由前序模式绑定，按平均谓词估计
+                triples = triples / max(self._graph_profile.get("properties", 1), 1)
+        estimate = float(triples)
+        if s_bound:
+            estimate /= max(distinct_subjects, 1)
+        if o_bound:
+            estimate /= max(distinct_objects, 1)
+        return estimate
+
+    def reorder(self, patterns: List[TriplePattern]) -> Tuple[List[TriplePattern], List[float]]:
+        """patterns 为书写顺序，返回重排后的模式及各步累计的估计行数"""
+        remaining = list(patterns)
+        ordered, estimates = [], []
+        bound: Set[Any] = set()
+        rows = 1.0
+        while remaining:
+            # 属性路径与未知谓词从已绑定的端点出发求值，排在绑定其端点变量的模式之后
+            deferred = [pattern for pattern in remaining if self._is_expensive(pattern)
+                        and _endpoint_variables(pattern) and not _endpoint_variables(pattern) & bound]
+            eligible = [pattern for pattern in remaining if pattern not in deferred] or remaining
+            # 优先考虑与已绑定变量相连的模式，避免笛卡尔积
+            connected = [pattern for pattern in eligible if _pattern_variables(pattern) & bound or not _pattern_variables(pattern)]
+            candidates = connected if bound and connected else eligible
+            best = min(candidates, key=lambda pattern: (self.estimate(pattern, bound), patterns.index(pattern)))
+            # 累计行数至少为 1，单步估计为 0 时不致使后续各步的估计都为 0
+            rows = max(rows * self.estimate(best, bound), 1.0)
+            remaining.remove(best)
+            ordered.append(best)
+            estimates.append(rows)
+            bound |= _pattern_variables(best)
+        return ordered, estimates
+
+    def _reorder_bgps(self, node, plans: List[Dict[str, Any]]):
+        if isinstance(node, CompValue):
+            if node.name == "BGP" and node.triples:
+                original = list(node.triples)
+                ordered, estimates = self.reorder(original)
+                node["triples"] = ordered
+                node[OPTIMIZED_ORDER_KEY] = True
+                plans.append({"original": original, "ordered": ordered, "estimates": estimates})
+            for value in node.values():
+                self._reorder_bgps(value, plans)
+        elif isinstance(node, (list, tuple)):
+            for value in node:
+                self._reorder_bgps(value, plans)
+
+    @timer_wrapper
+    def optimize(self, query_str: str, init_ns: Optional[Dict[str, Any]] = None) -> Tuple[Query, List[Dict[str, Any]]]:
+        """解析查询并重排其中每个 BGP，返回可直接交给 Graph.query 的 Query 对象及各 BGP 的执行计划"""
+        _written_order.enabled = True
+        try:
+            query = translateQuery(parse_query(query_str), initNs=init_ns)
+        finally:
+            _written_order.enabled = False
+        plans: List[Dict[str, Any]] = []
+        self._reorder_bgps(query.algebra, plans)
+        return query, plans
+
+    @staticmethod
+    def count_rows(graph: rdflib.Graph, patterns: List[TriplePattern], limit: int = 1_000_000) -> List[Optional[int]]:
+        """按给定顺序嵌套循环求值，统计每一步的实际中间结果行数；中间结果超过 limit 时全部记为 None"""
+        counts = [0] * len(patterns)
+        budget = [limit]
+
+        def resolve(term, binding):
+            return binding.get(term, None) if _is_variable(term) else term
+
+        def visit(depth: int, binding: Dict[Any, Any]) -> bool:
+            if depth == len(patterns):
+                return True
+            s, p, o = patterns[depth]
+            for ts, tp, to in graph.triples((resolve(s, binding), resolve(p, binding), resolve(o, binding))):
+                extended = dict(binding)
+                consistent = True
+                for term, value in ((s, ts), (p, tp), (o, to)):
+                    if _is_variable(term):
+                        if extended.setdefault(term, value) != value:
+                            consistent = False
+                            break
+                if not consistent:
+                    continue
+                counts[depth] += 1
+                budget[0] -= 1
+                if budget[0] <= 0 or not visit(depth + 1, extended):
+                    return False
+            return True
+
+        if visit(0, {}):
+            return counts
+        # 超出预算时计数不完整，不予展示
+        return [None] * len(patterns)
+
+    @timer_wrapper
+    def explain(self, graph: rdflib.Graph, query_str: str, init_ns: Optional[Dict[str, Any]] = None,
+                limit: int = 1_000_000) -> pd.DataFrame:
+        """各 BGP 的重排结果：执行顺序、在查询中书写的位置、估计与实际的累计行数"""
+        namespace_manager = graph.namespace_manager
+        _, plans = self.optimize(query_str, init_ns)
+        rows = []
+        for i, plan in enumerate(plans):
+            actual_rows = self.count_rows(graph, plan["ordered"], limit)
+            for step, (pattern, estimated, actual) in enumerate(zip(plan["ordered"], plan["estimates"], actual_rows)):
+                rows.append({
+                    "BGP": i + 1,
+                    "Step": step + 1,
+                    "Pattern": " ".join(term.n3(namespace_manager) for term in pattern),
+                    "WrittenPosition": plan["original"].index(pattern) + 1,
+                    "EstimatedRows": round(estimated, 2),
+                    "ActualRows": actual,
+                })
+        return pd.DataFrame(rows, columns=["BGP", "Step", "Pattern", "WrittenPosition", "EstimatedRows", "ActualRows"])
+
+    def model_post_init(self, __context):
+        if self.dataset_profile is None:
+            raise ValueError("dataset_profile is required")
+        if self.graph_name is not None:
+            self._graph_profile = self.dataset_profile.get_graph_profile(self.graph_name)
+        else:
+            graphs = self.dataset_profile.graphs.values()
+            self._graph_profile = {
+                key: sum(profile[key] for profile in graphs)
+                for key in ["triples", "distinctSubjects", "distinctObjects", "properties"]
+            }
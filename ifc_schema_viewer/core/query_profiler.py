@@ -0,0 +1,199 @@
+import io
+import time
+import threading
+import tracemalloc
+from contextlib import redirect_stdout
+
+import rdflib
+from rdflib.query import ResultRow
+from rdflib.plugins.sparql import CUSTOM_EVALS
+from rdflib.plugins.sparql.algebra import translateQuery, pprintAlgebra
+from rdflib.plugins.sparql.evaluate import evalPart
+from rdflib.plugins.sparql.parserutils import CompValue
+
+import pandas as pd
+
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+
+from ifc_schema_viewer.utils import timer_wrapper
+from .sparql_parser import parse_query
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+PROFILER_EVAL_KEY = "ifc_schema_viewer_profiler"
+
+# 只有正在剖析查询的线程会记录算子统计，其他会话的查询不受影响
+_profiling = threading.local()
+# tracemalloc 的启停与峰值是进程级的，同一时刻只剖析一个查询
+_profile_lock = threading.Lock()
+
+class _OperatorStats:
+    __slots__ = ("calls", "rows", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.seconds = 0.0
+
+def _count_rows(results, stats: _OperatorStats):
+    # 计时包括从子算子拉取结果的时间，即算子的累计耗时
+    iterator = iter(results)
+    while True:
+        time_start = time.perf_counter()
+        try:
+            row = next(iterator)
+        except StopIteration:
+            stats.seconds += time.perf_counter() - time_start
+            return
+        stats.seconds += time.perf_counter() - time_start
+        stats.rows += 1
+        yield row
+
+def _profiling_eval(ctx, part):
+    state = getattr(_profiling, "state", None)
+    if state is None or id(part) in state["active"]:
+        raise NotImplementedError()
+    stats = state["operators"].setdefault(id(part), _OperatorStats())
+    stats.calls += 1
+    # 在本算子上暂时让出，由 rdflib（或其他自定义求值函数）完成真正的求值
+    state["active"].add(id(part))
+    time_start = time.perf_counter()
+    try:
+        results = evalPart(ctx, part)
+    finally:
+        stats.seconds += time.perf_counter() - time_start
+        state["active"].discard(id(part))
+    if isinstance(results, dict) or not hasattr(results, "__iter__"):
+        # 查询层（SelectQuery 等）返回的是结果字典
+        return results
+    return _count_rows(results, stats)
+
+# 在导入时登记一次；query_optimizer 先导入本模块，剖析钩子位于重排过的 BGP 等其他自定义求值之前，它们也会被计入
+CUSTOM_EVALS[PROFILER_EVAL_KEY] = _profiling_eval
+
+def _operator_children(node: CompValue) -> List[CompValue]:
+    # 算子的输入位于 p / p1 / p2，其余 CompValue（如 expr）为表达式
+    return [getattr(node, key) for key in ("p", "p1", "p2") if isinstance(getattr(node, key), CompValue)]
+
+def _describe_operator(node: CompValue, namespace_manager) -> str:
+    if node.name == "BGP":
+        return "; ".join(" ".join(term.n3(namespace_manager) for term in triple) for triple in node.triples)
+    if node.name == "Slice":
+        return f"start={node.start} length={node.length}"
+    if node.name in ("Project", "SelectQuery"):
+        return " ".join(var.n3() for var in (node.PV or []))
+    if node.name == "Extend":
+        return node.var.n3()
+    return ""
+
+def format_algebra(query) -> str:
+    """rdflib 代数表达式的缩进文本"""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        pprintAlgebra(query)
+    return buffer.getvalue()
+
+class QueryProfile(BaseModel):
+    """一次 SPARQL 查询的剖析结果"""
+    algebra: str = Field(default="", description="Indented SPARQL algebra of the query as evaluated")
+    operators: List[Dict[str, Any]] = Field(default_factory=list, description="Per-operator calls, rows and timings in tree order")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Seconds spent per phase (parse, evaluate, term conversion, dataframe)")
+    peak_memory: Optional[int] = Field(default=None, description="Peak traced memory in bytes, None when not traced")
+    result: Any = Field(default=None, description="Query result as a DataFrame")
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.timings.values())
+
+    def operators_to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.operators, columns=["Operator", "Detail", "Calls", "Rows", "TotalMs", "SelfMs"])
+
+def _collect_operators(node: CompValue, operators: Dict[int, _OperatorStats], namespace_manager,
+                       depth: int = 0, rows: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    rows = [] if rows is None else rows
+    stats = operators.get(id(node), _OperatorStats())
+    children = _operator_children(node)
+    children_seconds = sum(operators[id(child)].seconds for child in children if id(child) in operators)
+    rows.append({
+        "Operator": "  " * depth + node.name,
+        "Detail": _describe_operator(node, namespace_manager),
+        "Calls": stats.calls,
+        "Rows": stats.rows,
+        "TotalMs": round(stats.seconds * 1000, 3),
+        "SelfMs": round(max(stats.seconds - children_seconds, 0.0) * 1000, 3),
+    })
+    for child in children:
+        _collect_operators(child, operators, namespace_manager, depth + 1, rows)
+    return rows
+
+@timer_wrapper
+def profile_query(graph: rdflib.Graph, query_str: str, optimizer=None, trace_memory: bool = True) -> QueryProfile:
+    """剖析一次查询：代数表达式、各算子的调用次数/输出行数/耗时、结果转换与 DataFrame 构建耗时及峰值内存
+
+    optimizer 为 QueryOptimizer 时先重排 BGP。算子耗时为累计耗时（含子算子），SelfMs 为扣除直接子算子后的耗时。
+    trace_memory 使用 tracemalloc，会拖慢求值并计入同一时刻其他线程的分配，剖析得到的耗时偏大。
+    多个会话同时剖析时依次进行。
+    """
+    with _profile_lock:
+        return _profile_query(graph, query_str, optimizer, trace_memory)
+
+def _profile_query(graph: rdflib.Graph, query_str: str, optimizer, trace_memory: bool) -> QueryProfile:
+    timings: Dict[str, float] = {}
+    was_tracing = tracemalloc.is_tracing()
+    if trace_memory:
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    try:
+        _profiling.state = {"active": set(), "operators": {}}
+        try:
+            time_start = time.perf_counter()
+            init_ns = dict(graph.namespaces())
+            if optimizer is not None:
+                query, _ = optimizer.optimize(query_str, init_ns)
+            else:
+                query = translateQuery(parse_query(query_str), initNs=init_ns)
+            timings["parse"] = time.perf_counter() - time_start
+
+            # 求值是惰性的，取出全部绑定才算完成
+            time_start = time.perf_counter()
+            results = graph.query(query)
+            bindings = results.bindings if results.type == "SELECT" else None
+            timings["evaluate"] = time.perf_counter() - time_start
+            operators = _profiling.state["operators"]
+        finally:
+            _profiling.state = None
+
+        time_start = time.perf_counter()
+        if results.type == "SELECT":
+            variables = results.vars
+            rows = [ResultRow(binding, variables) for binding in bindings]
+        else:
+            rows = [results.askAnswer] if results.type == "ASK" else list(results)
+        timings["term_conversion"] = time.perf_counter() - time_start
+
+        time_start = time.perf_counter()
+        if results.type == "SELECT":
+            result = pd.DataFrame(rows, columns=[str(var) for var in variables])
+        else:
+            result = pd.DataFrame({"result": rows})
+        timings["dataframe"] = time.perf_counter() - time_start
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory and not was_tracing:
+            tracemalloc.stop()
+
+    # 查询层算子返回的是结果字典，其行数与耗时以整个求值阶段计
+    root_stats = operators.setdefault(id(query.algebra), _OperatorStats())
+    root_stats.rows = len(rows)
+    root_stats.seconds = timings["evaluate"]
+
+    return QueryProfile(
+        algebra=format_algebra(query),
+        operators=_collect_operators(query.algebra, operators, graph.namespace_manager),
+        timings=timings,
+        peak_memory=peak_memory,
+        result=result,
+    )
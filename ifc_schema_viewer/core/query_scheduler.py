@@ -0,0 +1,117 @@
+import time
+import logging
+import threading
+import itertools
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Callable, Tuple
+
+INTERACTIVE = "interactive"
+ADHOC = "adhoc"
+# 数值越小越优先
+PRIORITY_ORDER = {INTERACTIVE: 0, ADHOC: 1}
+
+class QueryQueueTimeout(TimeoutError):
+    """查询在队列中等待超时"""
+
+class QueryScheduler(BaseModel):
+    """按优先级调度查询，避免昂贵的即席 SPARQL 查询拖慢所有人的概念浏览
+
+    - interactive：页面导航产生的查找（概念信息、集合列表），优先执行
+    - adhoc：用户在 SPARQL 页编写的查询，永远不能占满所有执行槽位
+    - 每个会话在每个优先级上的并发数受限，超出部分排队等待
+    """
+    max_concurrency: int = Field(default=4, description="Queries executing at the same time across all sessions")
+    reserved_interactive: int = Field(default=1, description="Slots ad-hoc queries can never take")
+    session_limits: Dict[str, int] = Field(default_factory=lambda: {INTERACTIVE: 4, ADHOC: 1},
+                                           description="Concurrent queries per session and priority class")
+    queue_timeout: float = Field(default=60.0, description="Seconds a query may wait in the queue")
+
+    _condition: Any = PrivateAttr(default_factory=threading.Condition)
+    _waiting: List[Tuple[int, int, str, str]] = PrivateAttr(default_factory=list)
+    _running: Dict[str, int] = PrivateAttr(default_factory=lambda: {priority: 0 for priority in PRIORITY_ORDER})
+    _session_running: Dict[Tuple[str, str], int] = PrivateAttr(default_factory=dict)
+    _sequence: Any = PrivateAttr(default_factory=itertools.count)
+    _local: Any = PrivateAttr(default_factory=threading.local)
+    _stats: Dict[str, Dict[str, float]] = PrivateAttr(default_factory=lambda: {
+        priority: {"submitted": 0, "completed": 0, "timeouts": 0, "wait_total": 0.0, "wait_max": 0.0, "run_total": 0.0}
+        for priority in PRIORITY_ORDER})
+
+    def _is_eligible(self, entry: Tuple[int, int, str, str]) -> bool:
+        _, _, priority, session_id = entry
+        if sum(self._running.values()) >= self.max_concurrency:
+            return False
+        if priority == ADHOC and self._running[ADHOC] >= max(1, self.max_concurrency - self.reserved_interactive):
+            return False
+        return self._session_running.get((session_id, priority), 0) < self.session_limits.get(priority, self.max_concurrency)
+
+    def _next_entry(self):
+        # 按 (优先级, 提交顺序) 找到第一个可以开始执行的查询
+        for entry in sorted(self._waiting):
+            if self._is_eligible(entry):
+                return entry
+        return None
+
+    def run(self, func: Callable[[], Any], priority: str = INTERACTIVE, session_id: str = "") -> Any:
+        """排队等待执行槽位后在当前线程执行 func；嵌套调用（如构造概念时再构造其属性类型）直接执行"""
+        if getattr(self._local, "depth", 0) > 0:
+            return func()
+        entry = (PRIORITY_ORDER[priority], next(self._sequence), priority, session_id)
+        stats = self._stats[priority]
+        time_submit = time.perf_counter()
+        with self._condition:
+            self._waiting.append(entry)
+            stats["submitted"] += 1
+            deadline = time_submit + self.queue_timeout
+            while self._next_entry() is not entry:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._waiting.remove(entry)
+                    stats["timeouts"] += 1
+                    self._condition.notify_all()
+                    raise QueryQueueTimeout(f"{priority} query waited more than {self.queue_timeout:.0f}s in the queue")
+                self._condition.wait(remaining)
+            self._waiting.remove(entry)
+            self._running[priority] += 1
+            self._session_running[(session_id, priority)] = self._session_running.get((session_id, priority), 0) + 1
+            waited = time.perf_counter() - time_submit
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+        if waited > 0.1:
+            logging.info("[SCHEDULER] %s query waited %.1f ms, queue depth: %s" % (priority, waited * 1000, self.get_queue_depth()))
+
+        self._local.depth = 1
+        time_start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self._local.depth = 0
+            with self._condition:
+                self._running[priority] -= 1
+                self._session_running[(session_id, priority)] -= 1
+                if self._session_running[(session_id, priority)] == 0:
+                    del self._session_running[(session_id, priority)]
+                stats["completed"] += 1
+                stats["run_total"] += time.perf_counter() - time_start
+                self._condition.notify_all()
+
+    def get_queue_depth(self) -> Dict[str, int]:
+        depth = {priority: 0 for priority in PRIORITY_ORDER}
+        for _, _, priority, _ in list(self._waiting):
+            depth[priority] += 1
+        return depth
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """各优先级的排队数、执行数及累计等待/执行时间"""
+        metrics = {}
+        queue_depth = self.get_queue_depth()
+        for priority, stats in self._stats.items():
+            completed = max(stats["completed"], 1)
+            metrics[priority] = {
+                "queue_depth": queue_depth[priority],
+                "running": self._running[priority],
+                **stats,
+                "wait_mean": stats["wait_total"] / completed,
+                "run_mean": stats["run_total"] / completed,
+            }
+        return metrics
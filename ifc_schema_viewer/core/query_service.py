@@ -0,0 +1,231 @@
+import time
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import rdflib
+from rdflib import RDF, RDFS
+
+import pandas as pd
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional
+
+from ifc_schema_viewer.utils import timer_wrapper, get_metrics_registry
+from .ontology_metadata import OntologyMetadata
+from .collection_members import CollectionMembers
+from .pset_applicability import PsetApplicability
+from .attribute_references import AttributeReferences
+from .datatype_usages import DatatypeUsages
+from .derived_types import DerivedTypeChains
+from .type_validators import SchemaValidators
+from .graph_statistics import GraphStatistics
+from .dataset_profile import DatasetProfile
+from .hierarchy import InheritanceGraph
+from .query_optimizer import QueryOptimizer
+from .query_profiler import QueryProfile, profile_query
+from .loader import get_classes, get_properties
+from .concepts import Concept, EntityConcept, DerivedTypeConcept, concept_model_map
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+class SchemaQueryService(BaseModel):
+    """IFC 模式的统一查询入口，不依赖 streamlit
+
+    各索引在首次访问时构建并常驻，概念模型按 IRI 缓存；界面（经 apps.caches 按数据集版本共享）与批处理任务使用同一实例。
+    """
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+    dataset_version: str = Field(default="", description="Version of the dataset the indexes are built from")
+    cache_dir: Optional[str] = Field(default="./outputs", description="Directory of on-disk caches such as the dataset profile")
+    worker_timeout: float = Field(default=30.0, description="Seconds to wait for a concept built by the worker processes before building it in-process")
+
+    _indexes: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _concepts: Dict[rdflib.URIRef, Concept] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.RLock)
+    _worker_pool: Any = PrivateAttr(default=None)
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.rdf_graph.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+    def attach_worker_pool(self, worker_pool):
+        """挂接查询进程池后，未缓存的概念在子进程中构建"""
+        self._worker_pool = worker_pool
+
+    def is_index_built(self, name: str) -> bool:
+        return name in self._indexes
+
+    def _get_index(self, name: str, builder):
+        # 多个会话可能同时首次访问，加锁保证每个索引只构建一次
+        if name not in self._indexes:
+            with self._lock:
+                if name not in self._indexes:
+                    self._indexes[name] = builder()
+        return self._indexes[name]
+
+    @property
+    def ontology_metadata(self) -> OntologyMetadata:
+        return self._get_index("ontology_metadata", lambda: OntologyMetadata(rdf_graph=self.rdf_graph))
+
+    @property
+    def collection_members(self) -> CollectionMembers:
+        return self._get_index("collection_members", lambda: CollectionMembers(rdf_graph=self.rdf_graph))
+
+    @property
+    def pset_applicability(self) -> PsetApplicability:
+        return self._get_index("pset_applicability", lambda: PsetApplicability(rdf_graph=self.rdf_graph))
+
+    @property
+    def attribute_references(self) -> AttributeReferences:
+        return self._get_index("attribute_references", lambda: AttributeReferences(rdf_graph=self.rdf_graph))
+
+    @property
+    def datatype_usages(self) -> DatatypeUsages:
+        return self._get_index("datatype_usages", lambda: DatatypeUsages(rdf_graph=self.rdf_graph))
+
+    @property
+    def derived_type_chains(self) -> DerivedTypeChains:
+        return self._get_index("derived_type_chains", lambda: DerivedTypeChains(rdf_graph=self.rdf_graph))
+
+    @property
+    def schema_validators(self) -> SchemaValidators:
+        return self._get_index("schema_validators", lambda: SchemaValidators(
+            rdf_graph=self.rdf_graph, derived_type_chains=self.derived_type_chains))
+
+    @property
+    def graph_statistics(self) -> GraphStatistics:
+        return self._get_index("graph_statistics", lambda: GraphStatistics.build(
+            self.rdf_graph, get_classes(self.rdf_graph), get_properties(self.rdf_graph)))
+
+    @property
+    def class_hierarchy(self) -> InheritanceGraph:
+        return self._get_index("class_hierarchy", lambda: InheritanceGraph(
+            rdf_graph=self.rdf_graph, predicate=RDFS.subClassOf, obj_range=get_classes(self.rdf_graph)))
+
+    @property
+    def property_hierarchy(self) -> InheritanceGraph:
+        return self._get_index("property_hierarchy", lambda: InheritanceGraph(
+            rdf_graph=self.rdf_graph, predicate=RDFS.subPropertyOf,
+            obj_range=[prop for props in get_properties(self.rdf_graph).values() for prop in props]))
+
+    @property
+    def dataset_profile(self) -> DatasetProfile:
+        return self._get_index("dataset_profile", lambda: DatasetProfile(
+            rdf_graph=self.rdf_graph, dataset_version=self.dataset_version, cache_dir=self.cache_dir))
+
+    def seed_index(self, name: str, index: Any):
+        """登记加载阶段已构建好的索引（如子图统计），避免重复构建"""
+        with self._lock:
+            self._indexes.setdefault(name, index)
+
+    def get_express_type(self, iri) -> Optional[str]:
+        """概念的 express 类型，如 express:Entity；非模式概念返回 None"""
+        for express_type in self.ifc_schema_graph.objects(rdflib.URIRef(iri), RDF.type):
+            express_type = express_type.n3(self.ifc_schema_graph.namespace_manager)
+            if express_type in concept_model_map:
+                return express_type
+        return None
+
+    def find_by_name(self, name: str) -> Optional[rdflib.URIRef]:
+        """按名称（如 IfcWall、Pset_WallCommon）查找概念 IRI"""
+        for iri in self.ifc_schema_graph.subjects(ONT["name"], rdflib.Literal(name)):
+            if self.get_express_type(iri) is not None:
+                return iri
+        return None
+
+    @timer_wrapper
+    def _build_concept(self, iri: rdflib.URIRef, express_type: str) -> Concept:
+        concept_class = concept_model_map[express_type]
+        kwargs = {"iri": iri, "rdf_graph": self.ifc_schema_graph}
+        if issubclass(concept_class, EntityConcept):
+            kwargs["pset_applicability"] = self.pset_applicability
+        elif issubclass(concept_class, DerivedTypeConcept):
+            kwargs["derived_type_chains"] = self.derived_type_chains
+        return concept_class(**kwargs)
+
+    def is_concept_cached(self, iri) -> bool:
+        return rdflib.URIRef(iri) in self._concepts
+
+    def evict_concepts(self, iris: Optional[List[Any]] = None):
+        """移出缓存的概念模型（缺省为全部），下次访问时重新构建"""
+        with self._lock:
+            if iris is None:
+                self._concepts.clear()
+                return
+            for iri in iris:
+                self._concepts.pop(rdflib.URIRef(iri), None)
+
+    def get_concept(self, iri, express_type: Optional[str] = None) -> Optional[Concept]:
+        """按 IRI 获取概念模型，首次访问时构建并缓存；express_type 缺省时从图中推断
+
+        挂接了查询进程池时返回的是 detached 概念（不引用图）。
+        """
+        iri = rdflib.URIRef(iri)
+        concept = self._concepts.get(iri, None)
+        if concept is not None:
+            get_metrics_registry().increment("concept_cache.hit")
+            return concept
+        express_type = express_type or self.get_express_type(iri)
+        if express_type not in concept_model_map:
+            return None
+        get_metrics_registry().increment("concept_cache.miss")
+        time_start = time.perf_counter()
+        concept = None
+        if self._worker_pool is not None:
+            try:
+                concept = self._worker_pool.get_concept(iri, express_type, timeout=self.worker_timeout)
+            except (FutureTimeoutError, BrokenProcessPool) as e:
+                # 进程池在后台重启，本次在本进程中构建，页面不会一直等待
+                logging.warning("[WORKERS] concept %s not built by the worker processes (%s), building in-process" % (
+                    iri, type(e).__name__))
+                get_metrics_registry().increment("concept_worker.fallback")
+            else:
+                if concept is None:
+                    return None
+        if concept is None:
+            concept = self._build_concept(iri, express_type)
+        get_metrics_registry().record_event("concept", time.perf_counter() - time_start, detail=str(iri), express_type=express_type)
+        self._concepts[iri] = concept
+        return concept
+
+    def get_concept_by_name(self, name: str) -> Optional[Concept]:
+        iri = self.find_by_name(name)
+        return self.get_concept(iri) if iri is not None else None
+
+    def get_query_optimizer(self, graph: Optional[rdflib.Graph] = None) -> QueryOptimizer:
+        """针对给定子图（缺省为 IFC_SCHEMA_GRAPH）统计信息的查询优化器"""
+        graph = graph if graph is not None else self.ifc_schema_graph
+        graph_name = None if isinstance(graph, rdflib.Dataset) else str(graph.identifier.n3(self.rdf_graph.namespace_manager))
+        return QueryOptimizer(dataset_profile=self.dataset_profile, graph_name=graph_name)
+
+    @timer_wrapper
+    def query(self, query_str: str, graph: Optional[rdflib.Graph] = None, optimize: bool = False) -> pd.DataFrame:
+        """执行 SPARQL 查询，默认在 IFC_SCHEMA_GRAPH 上，结果转为 DataFrame；optimize 时先按谓词统计重排 BGP"""
+        graph = graph if graph is not None else self.ifc_schema_graph
+        time_start = time.perf_counter()
+        query = query_str
+        if optimize:
+            query, _ = self.get_query_optimizer(graph).optimize(query_str, dict(graph.namespaces()))
+        results = graph.query(query)
+        if results.type != "SELECT":
+            df = pd.DataFrame({"result": [results.askAnswer] if results.type == "ASK" else list(results)})
+        else:
+            df = pd.DataFrame(list(results), columns=[str(var) for var in results.vars])
+        get_metrics_registry().record_event("sparql", time.perf_counter() - time_start, detail=query_str, rows=len(df))
+        return df
+
+    def profile(self, query_str: str, graph: Optional[rdflib.Graph] = None, optimize: bool = False) -> QueryProfile:
+        """剖析查询的代数表达式、各算子行数与耗时、结果转换耗时及峰值内存，在当前进程中执行"""
+        graph = graph if graph is not None else self.ifc_schema_graph
+        return profile_query(graph, query_str, optimizer=self.get_query_optimizer(graph) if optimize else None)
+
+    def explain(self, query_str: str, graph: Optional[rdflib.Graph] = None) -> pd.DataFrame:
+        """重排后各 BGP 的执行顺序与估计/实际行数"""
+        graph = graph if graph is not None else self.ifc_schema_graph
+        return self.get_query_optimizer(graph).explain(graph, query_str, dict(graph.namespaces()))
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
@@ -0,0 +1,158 @@
+import os
+import pickle
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import Any, Optional
+
+from ifc_schema_viewer.utils import timer_wrapper
+from .query_service import SchemaQueryService
+from .concepts import Concept
+
+# 子进程内的查询服务，由初始化函数从磁盘快照加载
+_worker_service: Optional[SchemaQueryService] = None
+
+def _load_snapshot(snapshot_path: str, dataset_version: str, cache_dir: Optional[str]):
+    global _worker_service
+    with open(snapshot_path, "rb") as f:
+        dataset = pickle.load(f)
+    _worker_service = SchemaQueryService(rdf_graph=dataset, dataset_version=dataset_version, cache_dir=cache_dir)
+
+def _ping() -> int:
+    return os.getpid()
+
+def _get_concept(iri: str, express_type: Optional[str]) -> Optional[Concept]:
+    concept = _worker_service.get_concept(iri, express_type)
+    return concept.detached() if concept is not None else None
+
+def _run_sparql(query_str: str, optimize: bool = False) -> pd.DataFrame:
+    return _worker_service.query(query_str, optimize=optimize)
+
+class QueryWorkerPool(BaseModel):
+    """查询进程池，rdflib 查询在子进程中执行，不再占用 streamlit 进程的 GIL
+
+    - 所有子进程从同一份磁盘快照加载数据集；streamlit 进程是多线程的，直接 fork 会继承其他线程持有的锁
+      （如 SPARQL 解析锁），子进程中的查询随之永久阻塞，因此以 forkserver（不可用时 spawn）启动
+    - 交互式查找（概念信息）与即席 SPARQL 查询使用不同的进程，长查询不会阻塞页面浏览
+    """
+    workers: int = Field(default=2, description="Worker processes for ad-hoc SPARQL queries")
+    interactive_workers: int = Field(default=1, description="Worker processes reserved for interactive lookups")
+    snapshot_path: str = Field(default="./outputs/ifc_schema_snapshot.pkl", description="Dataset snapshot the worker processes load")
+
+    _interactive: Optional[ProcessPoolExecutor] = PrivateAttr(default=None)
+    _adhoc: Optional[ProcessPoolExecutor] = PrivateAttr(default=None)
+    _start_method: str = PrivateAttr(default="")
+    _dataset_version: str = PrivateAttr(default="")
+    _cache_dir: Optional[str] = PrivateAttr(default=None)
+    _restarts: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def start_method(self) -> str:
+        return self._start_method
+
+    @property
+    def is_running(self) -> bool:
+        return self._interactive is not None
+
+    @property
+    def restarts(self) -> int:
+        return self._restarts
+
+    def _write_snapshot(self, query_service: SchemaQueryService):
+        # 先写入本次写出独有的临时文件再替换，同时启动的其他进程不会读到写了一半的快照
+        snapshot_dir = os.path.dirname(self.snapshot_path) or "."
+        os.makedirs(snapshot_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=snapshot_dir, prefix=os.path.basename(self.snapshot_path) + ".",
+                                         suffix=".tmp", delete=False) as f:
+            temp_path = f.name
+            try:
+                pickle.dump(query_service.rdf_graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                f.close()
+                os.remove(temp_path)
+                raise
+        os.replace(temp_path, self.snapshot_path)
+
+    def _start_executors(self):
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        initializer, initargs = _load_snapshot, (self.snapshot_path, self._dataset_version, self._cache_dir)
+        self._start_method = context.get_start_method()
+        interactive = ProcessPoolExecutor(max_workers=self.interactive_workers, mp_context=context,
+                                          initializer=initializer, initargs=initargs)
+        adhoc = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                    initializer=initializer, initargs=initargs)
+        # 预先拉起全部子进程，首次查询无需等待进程启动
+        for future in [executor.submit(_ping) for executor in (interactive, adhoc)]:
+            future.result()
+        self._interactive, self._adhoc = interactive, adhoc
+
+    @timer_wrapper
+    def start(self, query_service: SchemaQueryService):
+        """以给定查询服务的数据集启动子进程"""
+        self._dataset_version = query_service.dataset_version
+        # 子进程与本进程共用磁盘缓存（如数据集画像）
+        self._cache_dir = query_service.cache_dir
+        self._write_snapshot(query_service)
+        with self._lock:
+            self._start_executors()
+        logging.info("[WORKERS] %d query worker processes started (%s)" % (
+            self.workers + self.interactive_workers, self._start_method))
+
+    def restart(self, failed_executor: Optional[ProcessPoolExecutor] = None):
+        """终止全部子进程并从快照重新启动；failed_executor 已被其他线程替换时不重复重启"""
+        with self._lock:
+            if failed_executor is not None and failed_executor not in (self._interactive, self._adhoc):
+                return
+            self._terminate()
+            self._start_executors()
+            self._restarts += 1
+        logging.warning("[WORKERS] query worker processes restarted (%d restarts)" % self._restarts)
+
+    def _terminate(self):
+        for executor in (self._interactive, self._adhoc):
+            if executor is None:
+                continue
+            if hasattr(executor, "terminate_workers"):
+                executor.terminate_workers()
+                continue
+            # Python 3.14 之前没有公开的终止接口，卡住的子进程不会响应 shutdown，逐个终止以免成为孤儿进程
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._interactive = self._adhoc = None
+
+    def submit_concept(self, iri, express_type: Optional[str] = None) -> Future:
+        return self._interactive.submit(_get_concept, str(iri), express_type)
+
+    def submit_sparql(self, query_str: str, optimize: bool = False) -> Future:
+        return self._adhoc.submit(_run_sparql, query_str, optimize)
+
+    def _result(self, executor: Optional[ProcessPoolExecutor], func, args, timeout: Optional[float]):
+        # 超时或进程池已损坏时在后台重启进程池（期间的请求同样失败），调用方回退到本进程执行
+        if executor is None:
+            raise BrokenProcessPool("query worker processes are not running")
+        try:
+            return executor.submit(func, *args).result(timeout=timeout)
+        except (FutureTimeoutError, BrokenProcessPool):
+            threading.Thread(target=self.restart, args=(executor,), name="query-worker-restart", daemon=True).start()
+            raise
+
+    def get_concept(self, iri, express_type: Optional[str] = None, timeout: Optional[float] = None) -> Optional[Concept]:
+        """在交互式进程中构建概念；超时或进程池已损坏时抛出 TimeoutError / BrokenProcessPool"""
+        return self._result(self._interactive, _get_concept, (str(iri), express_type), timeout)
+
+    def run_sparql(self, query_str: str, timeout: Optional[float] = None, optimize: bool = False) -> pd.DataFrame:
+        return self._result(self._adhoc, _run_sparql, (query_str, optimize), timeout)
+
+    def shutdown(self):
+        with self._lock:
+            self._terminate()
@@ -0,0 +1,31 @@
+import os
+import threading
+
+import rdflib.plugins.sparql.parser as sparql_parser
+import rdflib.plugins.sparql.processor as sparql_processor
+
+_rdflib_parse_query = sparql_parser.parseQuery
+_parse_lock = threading.Lock()
+
+def _reset_parse_lock():
+    # fork 时其他线程可能正持有这把锁，子进程中没有线程会释放它
+    global _parse_lock
+    _parse_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_parse_lock)
+
+def parse_query(query_str: str):
+    """线程安全的 SPARQL 解析
+
+    rdflib 的解析器基于共享的 pyparsing 语法对象，多个线程（各会话的脚本线程、后台预热）同时解析时会互相破坏，
+    报出 "Expected SelectQuery" 之类的错误；解析只占查询的一小部分，加锁串行化，求值仍可并发。
+    """
+    with _parse_lock:
+        return _rdflib_parse_query(query_str)
+
+def install_parse_lock():
+    """让 Graph.query / prepareQuery 经由 parse_query 解析，重复调用无效
+
+    会替换 rdflib 模块级的 parseQuery，由应用与服务在启动时显式调用；导入 core 不会产生这一副作用。
+    """
+    sparql_processor.parseQuery = parse_query
@@ -0,0 +1,209 @@
+import rdflib
+from rdflib import RDF
+
+import numpy as np
+import pandas as pd
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional, Callable, Set
+
+from ifc_schema_viewer.utils import timer_wrapper
+from .derived_types import DerivedTypeChains
+from .pset_validation import parse_cardinality, split_aggregate, check_base_type, is_valid_base_value, check_aggregate
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+PRIMITIVE_TYPES = {"REAL", "NUMBER", "INTEGER", "BOOLEAN", "LOGICAL", "STRING", "BINARY"}
+
+def _normalize_enum_value(value) -> str:
+    # 兼容 STEP 写法 .SOLIDWALL. 及大小写差异
+    return str(value).strip().strip(".").upper()
+
+class TypeValidator(BaseModel):
+    """由模式编译得到的类型校验器
+
+    单值校验：validator(value) -> bool；向量化校验：validator.check(series) -> 布尔掩码
+    """
+    type_name: str = Field(default="", description="Name of the validated type")
+    express_type: str = Field(default="", description="Express type of the validated type, e.g. express:Enum")
+    reason: str = Field(default="", description="Violation message reported for invalid values")
+
+    _scalar: Callable[[Any], bool] = PrivateAttr(default=None)
+    _vector: Callable[[pd.Series], pd.Series] = PrivateAttr(default=None)
+
+    def __call__(self, value) -> bool:
+        return self._scalar(value)
+
+    def check(self, values: pd.Series) -> pd.Series:
+        return self._vector(values)
+
+    @classmethod
+    def compile(cls, type_name: str, express_type: str, reason: str,
+                scalar: Callable[[Any], bool], vector: Callable[[pd.Series], pd.Series]) -> "TypeValidator":
+        validator = cls(type_name=type_name, express_type=express_type, reason=reason)
+        validator._scalar = scalar
+        validator._vector = vector
+        return validator
+
+def _reference_validator() -> TypeValidator:
+    # 实体类型的取值为实例编号
+    def scalar(value):
+        return not isinstance(value, bool) and is_valid_base_value(value, "INTEGER") and float(str(value).strip()) >= 1
+    def vector(values):
+        numbers = pd.to_numeric(values.astype(str).str.strip(), errors="coerce")
+        return numbers.notna() & (numbers >= 1) & (np.floor(numbers) == numbers)
+    return TypeValidator.compile("ENTITY", "express:Entity", "not a positive instance id", scalar, vector)
+
+def _enum_validator(type_name: str, express_type: str, values: List[str]) -> TypeValidator:
+    allowed = frozenset(_normalize_enum_value(value) for value in values)
+    def scalar(value):
+        return _normalize_enum_value(value) in allowed
+    def vector(series):
+        return series.astype(str).str.strip().str.strip(".").str.upper().isin(allowed)
+    return TypeValidator.compile(type_name, express_type, f"not one of the values of {type_name}", scalar, vector)
+
+def _primitive_validator(base_type: str) -> TypeValidator:
+    def scalar(value):
+        return is_valid_base_value(value, base_type)
+    def vector(series):
+        return check_base_type(series, base_type)
+    return TypeValidator.compile(base_type, "primitive", f"not a valid {base_type}", scalar, vector)
+
+def _aggregate_validator(type_name: str, element: TypeValidator, cardinality) -> Optional[TypeValidator]:
+    bounds = parse_cardinality(cardinality)
+    if bounds is None:
+        return None
+    lower, upper = bounds
+    def scalar(value):
+        if isinstance(value, (list, tuple)):
+            elements = list(value)
+        else:
+            elements = split_aggregate(pd.Series([value])).iloc[0]
+        if len(elements) < lower or (upper is not None and len(elements) > upper):
+            return False
+        return all(element(item) for item in elements)
+    def vector(series):
+        return check_aggregate(series, element.check, bounds)
+    bound_text = f"[{lower}:{'?' if upper is None else upper}]"
+    return TypeValidator.compile(type_name, "express:DerivedType", f"not an aggregate {bound_text} of {element.type_name}", scalar, vector)
+
+def _union_validator(type_name: str, members: List[TypeValidator]) -> TypeValidator:
+    def scalar(value):
+        return any(member(value) for member in members)
+    def vector(series):
+        valid = pd.Series(False, index=series.index)
+        for member in members:
+            remaining = ~valid
+            if not remaining.any():
+                break
+            valid[remaining] = member.check(series[remaining]).to_numpy(dtype=bool)
+        return valid
+    member_names = ", ".join(member.type_name for member in members)
+    return TypeValidator.compile(type_name, "express:Select", f"not a value of any of {type_name} ({member_names})", scalar, vector)
+
+class SchemaValidators(BaseModel):
+    """将模式中的派生类型、枚举、属性枚举与选择类型编译为校验器，数据集加载后只构建一次，可脱离 streamlit 使用
+
+    枚举值预先收集为集合，派生类型沿派生链直接落到基础类型，选择类型展开为成员校验器的并集。
+    """
+    rdf_graph: Any = Field(default=None, description="RDF dataset of IFC Schema")
+    derived_type_chains: Optional[DerivedTypeChains] = Field(default=None, description="Resolved derived type chains, built if not given")
+
+    _validators: Dict[rdflib.URIRef, TypeValidator] = PrivateAttr(default_factory=dict)
+    @property
+    def validators(self) -> Dict[rdflib.URIRef, TypeValidator]:
+        """类型 IRI -> 校验器"""
+        return self._validators
+
+    _names: Dict[str, rdflib.URIRef] = PrivateAttr(default_factory=dict)
+    _primitives: Dict[str, TypeValidator] = PrivateAttr(default_factory=dict)
+    _reference: TypeValidator = PrivateAttr(default_factory=_reference_validator)
+
+    @property
+    def ifc_schema_graph(self) -> rdflib.Graph:
+        return self.rdf_graph.get_graph(INST["IFC_SCHEMA_GRAPH"])
+
+    def get(self, type_iri) -> Optional[TypeValidator]:
+        return self.validators.get(rdflib.URIRef(type_iri), None)
+
+    def get_by_name(self, type_name: str) -> Optional[TypeValidator]:
+        """按类型名称（如 IfcLabel、PEnum_Status）查找校验器"""
+        type_iri = self._names.get(type_name, None)
+        return self.validators.get(type_iri, None) if type_iri is not None else None
+
+    def validate(self, type_name: str, values) -> Any:
+        """按类型名称校验单值或一列取值，单值返回 bool，Series 返回布尔掩码"""
+        validator = self.get_by_name(type_name)
+        if validator is None:
+            raise KeyError(f"No validator compiled for type {type_name}")
+        if isinstance(values, pd.Series):
+            return validator.check(values)
+        return validator(values)
+
+    def _compile(self, type_iri: rdflib.URIRef, kinds: Dict[rdflib.URIRef, rdflib.URIRef],
+                 members: Dict[rdflib.URIRef, List[rdflib.URIRef]], visiting: Set[rdflib.URIRef]) -> Optional[TypeValidator]:
+        # 递归编译，已编译的直接复用；visiting 防止选择类型间的循环引用
+        if type_iri in self._validators:
+            return self._validators[type_iri]
+        if type_iri in visiting:
+            return None
+        kind = kinds.get(type_iri, None)
+        g = self.ifc_schema_graph
+        validator = None
+        visiting.add(type_iri)
+        if kind in (ONT["Enum"], ONT["PropertyEnumeration"]):
+            values = [g.value(member, ONT["name"]) for member in members.get(type_iri, [])]
+            validator = _enum_validator(type_iri.fragment, f"express:{kind.fragment}", [value for value in values if value is not None])
+        elif kind == ONT["Entity"]:
+            validator = self._reference
+        elif kind == ONT["DerivedType"]:
+            resolution = self.derived_type_chains.resolve(type_iri) or {"base_type": None, "cardinality": None}
+            base_type = resolution["base_type"]
+            if base_type is None:
+                element = None
+            elif base_type in PRIMITIVE_TYPES:
+                element = self._primitives.setdefault(base_type, _primitive_validator(base_type))
+            else:
+                # 派生自枚举或选择类型
+                element = self._compile(self._names.get(base_type, INST[base_type]), kinds, members, visiting)
+            if element is not None:
+                validator = _aggregate_validator(type_iri.fragment, element, resolution["cardinality"])
+                if validator is None:
+                    validator = TypeValidator.compile(type_iri.fragment, "express:DerivedType",
+                                                      f"not a valid {type_iri.fragment} ({element.type_name})",
+                                                      element._scalar, element._vector)
+        elif kind == ONT["Select"]:
+            compiled = [self._compile(member, kinds, members, visiting) for member in members.get(type_iri, [])]
+            compiled = [member for member in compiled if member is not None]
+            if compiled:
+                validator = _union_validator(type_iri.fragment, compiled)
+        visiting.discard(type_iri)
+        if validator is not None:
+            self._validators[type_iri] = validator
+        return validator
+
+    @timer_wrapper
+    def _compile_validators(self):
+        g = self.ifc_schema_graph
+        compiled_kinds = [ONT["Enum"], ONT["PropertyEnumeration"], ONT["Select"], ONT["DerivedType"], ONT["Entity"]]
+        kinds: Dict[rdflib.URIRef, rdflib.URIRef] = {}
+        for kind in compiled_kinds:
+            for type_iri in g.subjects(predicate=RDF.type, object=kind):
+                kinds[type_iri] = kind
+                self._names[type_iri.fragment] = type_iri
+        members: Dict[rdflib.URIRef, List[rdflib.URIRef]] = {}
+        for type_iri, member in g.subject_objects(predicate=ONT["hasValue"]):
+            if type_iri in kinds:
+                members.setdefault(type_iri, []).append(member)
+
+        for type_iri, kind in kinds.items():
+            if kind != ONT["Entity"]:
+                self._compile(type_iri, kinds, members, set())
+
+    def model_post_init(self, __context):
+        if self.rdf_graph is None or not isinstance(self.rdf_graph, rdflib.Dataset):
+            raise ValueError("rdf_graph must be an instance of rdflib.Dataset")
+        if self.derived_type_chains is None:
+            self.derived_type_chains = DerivedTypeChains(rdf_graph=self.rdf_graph)
+        self._compile_validators()
@@ -0,0 +1,8 @@
+from .server import SchemaHttpService, QueryError, to_jsonable, concept_to_json
+
+__all__ = [
+    "SchemaHttpService",
+    "QueryError",
+    "to_jsonable",
+    "concept_to_json",
+]
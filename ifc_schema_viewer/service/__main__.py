@@ -0,0 +1,25 @@
+import argparse
+import logging
+
+from ifc_schema_viewer.core.loader import DEFAULT_SCHEMA_PATH, DEFAULT_ONTOLOGY_PATHS
+from .server import SchemaHttpService
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON query service over the IFC schema")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA_PATH, help="Path to the IFC schema TriG file")
+    parser.add_argument("--ontology", action="append", default=None, help="Extra ontology file (RDF/XML), repeatable")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Maximum number of cached responses")
+    parser.add_argument("--workers", type=int, default=4, help="Threads executing uncached lookups")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    SchemaHttpService(
+        host=args.host, port=args.port, schema_path=args.schema,
+        ontology_paths=args.ontology if args.ontology is not None else list(DEFAULT_ONTOLOGY_PATHS),
+        cache_size=args.cache_size, workers=args.workers
+    ).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""IFC 模式查询服务的压测脚本
+
+每个并发客户端持有一条 HTTP/1.1 长连接，按轮询方式发送请求，统计延迟分位数与吞吐量：
+
+    python -m ifc_schema_viewer.service.load_test --clients 32 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import time
+import urllib.parse
+
+import numpy as np
+
+from typing import List, Dict, Any, Tuple
+
+DEFAULT_PATHS = [
+    "/concept?name=IfcWall",
+    "/concept?name=IfcLabel",
+    "/concept?name=Pset_WallCommon",
+    "/hierarchy?name=IfcRoot",
+    "/psets?name=IfcWall",
+]
+
+class KeepAliveClient:
+    """基于 asyncio 流的最小 HTTP/1.1 客户端，复用同一连接"""
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.connections = 0
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.connections += 1
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> Tuple[int, bytes]:
+        if self.writer is None or self.writer.is_closing():
+            await self._connect()
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nConnection: keep-alive\r\n"
+        if body:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self.writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            # 服务端关闭了空闲连接，重连后重试一次
+            self.writer = None
+            return await self.request(method, path, body)
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.writer.close()
+            self.writer = None
+        return status, payload
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+async def run_client(host: str, port: int, paths: List[str], num_requests: int, offset: int, latencies: List[float], errors: List[int]):
+    client = KeepAliveClient(host, port)
+    try:
+        for i in range(num_requests):
+            path = paths[(offset + i) % len(paths)]
+            time_start = time.perf_counter()
+            status, _ = await client.request("GET", path)
+            latencies.append(time.perf_counter() - time_start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        await client.close()
+
+async def run_load_test(host: str, port: int, clients: int, requests_per_client: int, paths: List[str]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: List[int] = []
+    time_start = time.perf_counter()
+    await asyncio.gather(*[
+        run_client(host, port, paths, requests_per_client, offset, latencies, errors) for offset in range(clients)
+    ])
+    elapsed = time.perf_counter() - time_start
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed > 0 else float("inf"),
+        "p50_ms": float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else None,
+        "p99_ms": float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else None,
+        "max_ms": float(latencies_ms.max()) if len(latencies_ms) else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the IFC schema query service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32], help="Concurrent client counts to test")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    parser.add_argument("--path", action="append", default=None, help="Request path, repeatable")
+    parser.add_argument("--sparql", default=None, help="Also issue this SPARQL query (GET /sparql?query=...)")
+    args = parser.parse_args()
+
+    paths = args.path or list(DEFAULT_PATHS)
+    if args.sparql:
+        paths.append("/sparql?" + urllib.parse.urlencode({"query": args.sparql}))
+    for clients in args.clients:
+        report = asyncio.run(run_load_test(args.host, args.port, clients, args.requests, paths))
+        print(json.dumps(report))
+
+if __name__ == "__main__":
+    main()
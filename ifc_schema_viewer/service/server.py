@@ -0,0 +1,310 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import rdflib
+import tornado.web
+import tornado.httpserver
+
+from pydantic import BaseModel, PrivateAttr, Field
+from typing import List, Dict, Any, Optional, Callable
+
+from ifc_schema_viewer.core import SchemaQueryService, EntityConcept, load_ifc_schema, install_parse_lock
+from ifc_schema_viewer.core.loader import DEFAULT_SCHEMA_PATH, DEFAULT_ONTOLOGY_PATHS
+from ifc_schema_viewer.utils import get_metrics_registry
+
+class QueryError(Exception):
+    """带 HTTP 状态码的请求错误"""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def to_jsonable(value):
+    """将 rdflib 项及其容器转换为可 JSON 序列化的对象"""
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        return [to_jsonable(item) for item in value]
+    elif isinstance(value, rdflib.Literal):
+        python_value = value.toPython()
+        return python_value if isinstance(python_value, (str, int, float, bool)) else str(value)
+    elif isinstance(value, rdflib.term.Node):
+        return str(value)
+    return value
+
+def concept_to_json(concept) -> Dict[str, Any]:
+    """概念模型的 JSON 表示：公共字段加上各子类的数据属性"""
+    data = {
+        "iri": str(concept.iri),
+        "label": concept.label,
+        "express_type": concept.express_type,
+        "definitions": concept.definitions,
+    }
+    for name in ["members", "super_entities", "sub_entities", "direct_attributes", "inverse_attributes",
+                 "pset_templates", "props", "applicable_entities", "derived_from", "cardinality",
+                 "base_type", "derivation_chain"]:
+        if hasattr(concept, name):
+            data[name] = getattr(concept, name)
+    return to_jsonable(data)
+
+class SchemaHttpService(BaseModel):
+    """基于 asyncio（tornado）的本地 HTTP/JSON 查询服务
+
+    - 数据集只加载一次，与界面共用 load_ifc_schema 及 SchemaQueryService
+    - HTTP/1.1 长连接复用
+    - /batch 在一次往返中执行多个查询；相同的并发请求只计算一次
+    - 响应按 (路径, 参数) 做 LRU 缓存
+    """
+    host: str = Field(default="127.0.0.1", description="Host to bind")
+    port: int = Field(default=8765, description="Port to bind")
+    schema_path: str = Field(default=DEFAULT_SCHEMA_PATH, description="Path to the IFC schema TriG file")
+    ontology_paths: List[str] = Field(default_factory=lambda: list(DEFAULT_ONTOLOGY_PATHS), description="Extra ontology files")
+    cache_size: int = Field(default=4096, description="Maximum number of cached responses")
+    workers: int = Field(default=4, description="Threads executing uncached lookups")
+    idle_connection_timeout: float = Field(default=60.0, description="Seconds an idle keep-alive connection is kept")
+
+    _query_service: Optional[SchemaQueryService] = PrivateAttr(default=None)
+    _cache: "OrderedDict[str, bytes]" = PrivateAttr(default_factory=OrderedDict)
+    _inflight: Dict[str, asyncio.Future] = PrivateAttr(default_factory=dict)
+    _executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _stats: Dict[str, Any] = PrivateAttr(default_factory=lambda: {
+        "requests": 0, "cache_hits": 0, "coalesced": 0, "errors": 0, "started_at": time.time()})
+
+    @property
+    def query_service(self) -> SchemaQueryService:
+        return self._query_service
+
+    @property
+    def routes(self) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+        return {
+            "/concept": self.get_concept,
+            "/hierarchy": self.get_hierarchy,
+            "/psets": self.get_psets,
+            "/sparql": self.run_sparql,
+        }
+
+    def load(self, query_service: Optional[SchemaQueryService] = None):
+        """加载数据集；可传入已有的查询服务以复用其索引"""
+        # 查询在线程池中并发执行，rdflib 的解析器需串行化
+        install_parse_lock()
+        if query_service is None:
+            loaded_schema = load_ifc_schema(self.schema_path, self.ontology_paths)
+            query_service = SchemaQueryService(rdf_graph=loaded_schema.dataset, dataset_version=loaded_schema.dataset_version)
+        self._query_service = query_service
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="schema-query")
+        self._cache.clear()
+
+    def _resolve_iri(self, params: Dict[str, Any], key: str = "iri") -> rdflib.URIRef:
+        if params.get(key):
+            return rdflib.URIRef(params[key])
+        name = params.get("name") if key == "iri" else None
+        if name:
+            iri = self.query_service.find_by_name(name)
+            if iri is None:
+                raise QueryError(404, f"No concept named {name}")
+            return iri
+        raise QueryError(400, f"Missing parameter '{key}'" + (" or 'name'" if key == "iri" else ""))
+
+    def _get_concept(self, params: Dict[str, Any]):
+        iri = self._resolve_iri(params)
+        concept = self.query_service.get_concept(iri, params.get("express_type") or None)
+        if concept is None:
+            raise QueryError(404, f"{iri} is not a schema concept")
+        return concept
+
+    def get_concept(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return concept_to_json(self._get_concept(params))
+
+    def get_hierarchy(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        concept = self._get_concept(params)
+        if not isinstance(concept, EntityConcept):
+            raise QueryError(400, f"{concept.iri} is not an entity")
+        return to_jsonable({
+            "iri": concept.iri,
+            "super_entities": [{"name": entity["name"], "iri": entity["iri"]} for entity in concept.super_entities],
+            "sub_entities": [{"name": entity["name"], "iri": entity["iri"]} for entity in concept.sub_entities],
+        })
+
+    def get_psets(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        entity = self._resolve_iri({"iri": params.get("entity"), "name": params.get("name")})
+        include_subtypes = str(params.get("include_subtypes", "false")).lower() in ("1", "true", "yes")
+        applicability = self.query_service.pset_applicability
+        if include_subtypes:
+            psets = applicability.get_subtree_psets(entity)
+        else:
+            psets = applicability.get_inherited_psets(entity)
+        psets = sorted(psets, key=lambda pset: str(pset["name"]))
+        return to_jsonable({"entity": entity, "include_subtypes": include_subtypes, "psets": psets})
+
+    def run_sparql(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        query_str = params.get("query")
+        if not query_str:
+            raise QueryError(400, "Missing parameter 'query'")
+        try:
+            df = self.query_service.query(query_str)
+        except Exception as e:
+            raise QueryError(400, f"Error executing query: {e}")
+        return to_jsonable({"columns": list(df.columns), "rows": df.values.tolist()})
+
+    @staticmethod
+    def cache_key(path: str, params: Dict[str, Any]) -> str:
+        return path + "?" + json.dumps(params, sort_keys=True, ensure_ascii=False)
+
+    def _compute(self, path: str, params: Dict[str, Any]) -> bytes:
+        return json.dumps(self.routes[path](params), ensure_ascii=False).encode("utf-8")
+
+    async def handle(self, path: str, params: Dict[str, Any]) -> bytes:
+        """执行一次查询，返回 JSON 字节串；命中缓存直接返回，相同的进行中请求共享结果"""
+        self._stats["requests"] += 1
+        if path not in self.routes:
+            raise QueryError(404, f"Unknown endpoint {path}")
+        key = self.cache_key(path, params)
+        body = self._cache.get(key, None)
+        if body is not None:
+            self._cache.move_to_end(key)
+            self._stats["cache_hits"] += 1
+            return body
+        if key in self._inflight:
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._compute, path, params)
+        self._inflight[key] = future
+        try:
+            body = await future
+        finally:
+            self._inflight.pop(key, None)
+        self._cache[key] = body
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return body
+
+    async def handle_batch(self, requests: List[Dict[str, Any]]) -> bytes:
+        """一次往返执行多个查询，各子请求独立返回状态码"""
+        async def run_one(request: Dict[str, Any]):
+            try:
+                if not isinstance(request, dict):
+                    raise QueryError(400, "Batch item must be an object")
+                path, params = request.get("path", ""), request.get("params", {}) or {}
+                if not isinstance(path, str) or not isinstance(params, dict):
+                    raise QueryError(400, "'path' must be a string and 'params' an object")
+                body = await self.handle(path, params)
+                return {"status": 200, "body": json.loads(body)}
+            except QueryError as e:
+                self.record_error()
+                return {"status": e.status, "body": {"error": e.message}}
+            except Exception as e:
+                # 单个子请求的意外错误不影响同批次的其他请求
+                logging.exception("[SERVICE] batch item %r failed" % (request,))
+                self.record_error()
+                return {"status": 500, "body": {"error": f"Internal error: {e}"}}
+        responses = await asyncio.gather(*[run_one(request) for request in requests])
+        return json.dumps({"responses": responses}, ensure_ascii=False).encode("utf-8")
+
+    def record_error(self):
+        self._stats["errors"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "uptime": time.time() - self._stats["started_at"],
+            "cached_responses": len(self._cache),
+            "dataset_version": self.query_service.dataset_version if self.query_service else None,
+        }
+
+    def make_app(self) -> tornado.web.Application:
+        return tornado.web.Application([
+            (r"/health", _HealthHandler, {"service": self}),
+            (r"/stats", _StatsHandler, {"service": self}),
+            (r"/metrics", _MetricsHandler, {"service": self}),
+            (r"/batch", _BatchHandler, {"service": self}),
+            (r"(/concept|/hierarchy|/psets|/sparql)", _QueryHandler, {"service": self}),
+        ])
+
+    async def serve(self):
+        if self.query_service is None:
+            self.load()
+        server = tornado.httpserver.HTTPServer(self.make_app(), idle_connection_timeout=self.idle_connection_timeout)
+        server.listen(self.port, address=self.host)
+        logging.info("[SERVICE] IFC schema query service listening on http://%s:%d" % (self.host, self.port))
+        await asyncio.Event().wait()
+
+    def run(self):
+        asyncio.run(self.serve())
+
+class _JsonHandler(tornado.web.RequestHandler):
+    def initialize(self, service: SchemaHttpService):
+        self.service = service
+
+    def set_default_headers(self):
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+
+    def write_error_json(self, status: int, message: str):
+        self.set_status(status)
+        self.finish(json.dumps({"error": message}, ensure_ascii=False))
+
+    def write_error(self, status_code: int, **kwargs):
+        # 未捕获的异常同样以 JSON 返回，而不是 tornado 默认的 HTML 页面
+        self.service.record_error()
+        self.finish(json.dumps({"error": self._reason}, ensure_ascii=False))
+
+    def json_body(self) -> Dict[str, Any]:
+        if not self.request.body:
+            return {}
+        try:
+            body = json.loads(self.request.body)
+        except json.JSONDecodeError as e:
+            raise QueryError(400, f"Invalid JSON body: {e}")
+        if not isinstance(body, dict):
+            raise QueryError(400, "JSON body must be an object")
+        return body
+
+class _HealthHandler(_JsonHandler):
+    def get(self):
+        self.finish({"status": "ok"})
+
+class _StatsHandler(_JsonHandler):
+    def get(self):
+        self.finish(self.service.get_stats())
+
+class _MetricsHandler(_JsonHandler):
+    """各被测函数耗时分布，Prometheus 文本格式；?format=json 时返回 JSON"""
+    def get(self):
+        registry = get_metrics_registry()
+        if self.get_query_argument("format", "prometheus") == "json":
+            return self.finish(registry.to_json())
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.finish(registry.to_prometheus())
+
+class _QueryHandler(_JsonHandler):
+    async def _respond(self, path: str, params: Dict[str, Any]):
+        try:
+            self.finish(await self.service.handle(path, params))
+        except QueryError as e:
+            self.service.record_error()
+            self.write_error_json(e.status, e.message)
+
+    async def get(self, path):
+        params = {key: self.get_query_argument(key) for key in self.request.query_arguments}
+        await self._respond(path, params)
+
+    async def post(self, path):
+        try:
+            params = self.json_body()
+        except QueryError as e:
+            return self.write_error_json(e.status, e.message)
+        await self._respond(path, params)
+
+class _BatchHandler(_JsonHandler):
+    async def post(self):
+        try:
+            requests = self.json_body().get("requests", [])
+            if not isinstance(requests, list):
+                raise QueryError(400, "'requests' must be a list")
+        except QueryError as e:
+            return self.write_error_json(e.status, e.message)
+        self.finish(await self.service.handle_batch(requests))
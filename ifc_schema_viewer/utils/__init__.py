@@ -1,3 +1,4 @@
 from .echarts import EchartsUtility
 from .graph_algo import GraphAlgoUtility
-from .timer import timer_wrapper
\ No newline at end of file
+from .timer import timer_wrapper
+from .instrumentation import Histogram, Span, MetricsRegistry, get_metrics_registry, get_current_span, get_rss_bytes, span, write_json_atomic
\ No newline at end of file
@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+import functools
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+from typing import List, Dict, Any, Optional, Iterator
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+class Histogram:
+    """单个被测函数（或代码段）的耗时分布：累计次数、总耗时、最大值，以及最近若干次样本上的分位数"""
+    def __init__(self, name: str, reservoir_size: int = 2048):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=reservoir_size)
+        # 读取样本时复制，避免与并发的 observe 交错（deque mutated during iteration）
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            samples = list(self.samples)
+        return _percentile(sorted(samples), q)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            count, total, maximum, samples = self.count, self.total, self.max, list(self.samples)
+        ordered = sorted(samples)
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "p99": _percentile(ordered, 99),
+            "max": maximum,
+        }
+
+class Span:
+    """一次被测调用，子调用构成调用树"""
+    __slots__ = ("name", "start", "duration", "children", "attributes")
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.children: List["Span"] = []
+        self.attributes = attributes or {}
+
+    @property
+    def self_time(self) -> float:
+        return max(self.duration - sum(child.duration for child in self.children), 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "ms": round(self.duration * 1000, 3),
+            "self_ms": round(self.self_time * 1000, 3),
+            **({"attributes": self.attributes} if self.attributes else {}),
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    def format_tree(self, min_ms: float = 0.0, indent: int = 0) -> str:
+        """缩进文本形式的调用树，省略耗时低于 min_ms 的子树"""
+        lines = [f"{'  ' * indent}{self.name}: {self.duration * 1000:.1f} ms"]
+        for child in self.children:
+            if child.duration * 1000 >= min_ms:
+                lines.append(child.format_tree(min_ms, indent + 1))
+        return "\n".join(lines)
+
+    def summarize(self, top: int = 10) -> List[Dict[str, Any]]:
+        """按名称汇总整棵调用树：调用次数、累计耗时与自身耗时，按自身耗时降序"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        stack = list(self.children)
+        while stack:
+            node = stack.pop()
+            entry = totals.setdefault(node.name, {"name": node.name, "calls": 0, "ms": 0.0, "self_ms": 0.0})
+            entry["calls"] += 1
+            entry["ms"] += node.duration * 1000
+            entry["self_ms"] += node.self_time * 1000
+            stack.extend(node.children)
+        return sorted(totals.values(), key=lambda entry: entry["self_ms"], reverse=True)[:top]
+
+class MetricsRegistry:
+    """进程内所有被测函数的耗时直方图，以及最近的根调用树；可导出 Prometheus 文本或 JSON"""
+    def __init__(self, recent_traces: int = 50, recent_events: int = 500):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._recent_traces = deque(maxlen=recent_traces)
+        self._recent_events = deque(maxlen=recent_events)
+        self._last_saved = 0.0
+        # 各会话的脚本线程都会写出快照，同一时刻只有一个线程写出，其余直接跳过
+        self._save_lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(name, None)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(name)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: int = 1):
+        """计数器，如缓存命中/未命中"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def record_event(self, kind: str, seconds: float, **fields):
+        """记录一次查询等事件（种类、耗时及描述字段），只保留最近若干条"""
+        with self._lock:
+            self._recent_events.append({"kind": kind, "seconds": seconds, "timestamp": time.time(), **fields})
+
+    def get_counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def get_recent_events(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [event for event in self._recent_events if kind is None or event["kind"] == kind]
+
+    def record_trace(self, span: Span):
+        with self._lock:
+            self._recent_traces.append(span)
+
+    def get_histogram(self, name: str) -> Optional[Histogram]:
+        return self._histograms.get(name, None)
+
+    def get_recent_traces(self) -> List[Span]:
+        with self._lock:
+            return list(self._recent_traces)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._recent_traces.clear()
+            self._recent_events.clear()
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"timestamp": time.time(), "pid": os.getpid(), "histograms": self.snapshot(), "counters": self.get_counters()}
+
+    def to_prometheus(self, prefix: str = "ifc_schema_viewer") -> str:
+        metric = f"{prefix}_span_seconds"
+        lines = [
+            f"# HELP {metric} Wall time of instrumented functions.",
+            f"# TYPE {metric} summary",
+        ]
+        maxima = []
+        for name, summary in sorted(self.snapshot().items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f'{metric}{{span="{label}",quantile="{quantile}"}} {summary[key]:.6f}')
+            lines.append(f'{metric}_sum{{span="{label}"}} {summary["sum"]:.6f}')
+            lines.append(f'{metric}_count{{span="{label}"}} {summary["count"]}')
+            maxima.append(f'{metric}_max{{span="{label}"}} {summary["max"]:.6f}')
+        lines += [f"# HELP {metric}_max Slowest observed call.", f"# TYPE {metric}_max gauge"] + maxima
+        counter = f"{prefix}_events_total"
+        lines += [f"# HELP {counter} Counted events such as cache hits and misses.", f"# TYPE {counter} counter"]
+        for name, value in sorted(self.get_counters().items()):
+            lines.append(f'{counter}{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def save_json(self, path: str, min_interval: float = 0.0) -> bool:
+        """写出 JSON 快照；距上次写出不足 min_interval 秒或其他线程正在写出时跳过，写出失败时记录警告并返回 False"""
+        if not self._save_lock.acquire(blocking=False):
+            return False
+        try:
+            now = time.time()
+            if now - self._last_saved < min_interval:
+                return False
+            self._last_saved = now
+            try:
+                write_json_atomic(path, self.to_json())
+            except OSError as e:
+                logging.warning("[METRICS] failed to write %s: %s" % (path, e))
+                return False
+            return True
+        finally:
+            self._save_lock.release()
+
+def write_json_atomic(path: str, data: Any):
+    """先写入同目录下本次写出独有的临时文件再替换目标文件，多个线程或进程写出同一路径时互不干扰；失败时抛出 OSError"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=os.path.basename(path) + ".",
+                                     suffix=".tmp", delete=False) as f:
+        temp_path = f.name
+        try:
+            json.dump(data, f, ensure_ascii=False)
+        except BaseException:
+            f.close()
+            os.remove(temp_path)
+            raise
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def get_rss_bytes() -> int:
+    """当前进程的常驻内存；无 /proc 的平台上退化为峰值常驻内存"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 以字节计，Linux 以 KB 计
+        return peak if sys.platform == "darwin" else peak * 1024
+
+_registry = MetricsRegistry()
+# 当前线程（或协程）中正在执行的调用
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """记录一段代码的耗时，嵌套的 span 挂在外层 span 之下；没有外层 span 时作为根调用树保存"""
+    parent = _current_span.get()
+    current = Span(name, attributes)
+    if parent is not None:
+        parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _current_span.reset(token)
+        _registry.observe(name, current.duration)
+        if parent is None:
+            _registry.record_trace(current)
+
+def timer_wrapper(func):
+    """以函数的模块与限定名为 span 名称，记录每次调用的耗时"""
+    name = f"{func.__module__}.{func.__qualname__}"
+    @functools.wraps(func)
+    def func_wrapper(*args, **kwargs):
+        with span(name) as current:
+            result = func(*args, **kwargs)
+        logging.info('%s cost time: %.3f ms' % (name, current.duration * 1000))
+        return result
+    return func_wrapper
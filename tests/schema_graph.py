@@ -0,0 +1,93 @@
+import rdflib
+from rdflib import RDF, RDFS, OWL, SKOS, Literal
+
+ONT = rdflib.Namespace("http://www.semantic.org/zeyupan/ontologies/CoALA4IFC_Schema_Ont#")
+INST = rdflib.Namespace("http://www.semantic.org/zeyupan/instances/CoALA4IFC_Schema_Inst#")
+
+def build_dataset() -> rdflib.Dataset:
+    dataset = rdflib.Dataset()
+    dataset.bind("express", ONT)
+    # 本体位于默认图：express 类型是 express:SchematicConcept 的（间接）子类
+    for clss, super_clss in (
+        (ONT["Entity"], ONT["SchematicConcept"]),
+        (ONT["Type"], ONT["SchematicConcept"]),
+        (ONT["DerivedType"], ONT["Type"]),
+        (ONT["Enum"], ONT["Type"]),
+        (ONT["Select"], ONT["Type"]),
+        (ONT["PropertySetTemplate"], ONT["SchematicConcept"]),
+        (ONT["QuantitySetTemplate"], ONT["SchematicConcept"]),
+        (rdflib.URIRef("http://example.org/ext#Extension"), ONT["SchematicConcept"]),
+    ):
+        dataset.add((clss, RDF.type, OWL.Class))
+        dataset.add((clss, RDFS.subClassOf, super_clss))
+    dataset.add((ONT["SchematicConcept"], RDF.type, OWL.Class))
+    g = dataset.graph(INST["IFC_SCHEMA_GRAPH"])
+    def add_named(iri, express_type):
+        g.add((iri, RDF.type, express_type))
+        g.add((iri, ONT["name"], Literal(iri.fragment)))
+        g.add((iri, ONT["definitions"], Literal(f"Definition of {iri.fragment}.")))
+    # IfcRoot > IfcElement > IfcWall > IfcWallStandardCase
+    entities = [INST[name] for name in ("IfcRoot", "IfcElement", "IfcWall", "IfcWallStandardCase")]
+    for entity in entities:
+        add_named(entity, ONT["Entity"])
+    for super_entity, sub_entity in zip(entities, entities[1:]):
+        g.add((sub_entity, ONT["subClassOf"], super_entity))
+        g.add((super_entity, ONT["superClassOf"], sub_entity))
+    for pset, express_type, entity in (
+        (INST["Pset_ElementCommon"], ONT["PropertySetTemplate"], INST["IfcElement"]),
+        (INST["Pset_WallCommon"], ONT["PropertySetTemplate"], INST["IfcWall"]),
+        (INST["Qto_WallBaseQuantities"], ONT["QuantitySetTemplate"], INST["IfcWall"]),
+    ):
+        add_named(pset, express_type)
+        g.add((pset, ONT["applicableTo"], entity))
+    # 属性模板：Reference 由两个属性集共用，未命名的属性模板不计入使用
+    for pset, prop, name, datatype in (
+        (INST["Pset_ElementCommon"], INST["Pset_ElementCommon_Reference"], "Reference", INST["IfcLabel"]),
+        (INST["Pset_WallCommon"], INST["Pset_ElementCommon_Reference"], "Reference", INST["IfcLabel"]),
+        (INST["Pset_WallCommon"], INST["Pset_WallCommon_Width"], "Width", INST["IfcPositiveLengthMeasure"]),
+        (INST["Qto_WallBaseQuantities"], INST["Qto_WallBaseQuantities_Length"], "Length", INST["IfcPositiveLengthMeasure"]),
+        (INST["Pset_WallCommon"], INST["Pset_WallCommon_Unnamed"], None, INST["IfcLabel"]),
+    ):
+        g.add((pset, ONT["hasPropTemplate"], prop))
+        g.add((prop, ONT["dataType"], datatype))
+        if name is not None:
+            g.add((prop, ONT["name"], Literal(name)))
+    # IfcRoot.Name : IfcLabel，由所有子实体继承
+    attribute = INST["IfcRoot_Name"]
+    g.add((INST["IfcRoot"], ONT["hasDirectAttribute"], attribute))
+    g.add((attribute, ONT["attrRange"], INST["IfcLabel"]))
+    g.add((attribute, ONT["name"], Literal("Name")))
+    g.add((attribute, ONT["direct_attr_num"], Literal(1)))
+    g.add((attribute, ONT["cardinality"], Literal("1")))
+    # 派生类型：IfcPositiveLengthMeasure -> IfcLengthMeasure -> REAL，IfcCoords 为 REAL 的 LIST [2:3]
+    for derived_type, derived_from in (
+        (INST["IfcLabel"], INST["STRING"]),
+        (INST["IfcLengthMeasure"], INST["REAL"]),
+        (INST["IfcPositiveLengthMeasure"], INST["IfcLengthMeasure"]),
+        (INST["IfcCoords"], INST["REAL"]),
+    ):
+        add_named(derived_type, ONT["DerivedType"])
+        g.add((derived_type, ONT["derivedFrom"], derived_from))
+    g.add((INST["IfcCoords"], ONT["cardinality"], Literal("LIST [2:3] OF REAL")))
+    add_named(INST["IfcWallTypeEnum"], ONT["Enum"])
+    for value in ("SOLIDWALL", "NOTDEFINED"):
+        member = INST[f"IfcWallTypeEnum_{value}"]
+        g.add((INST["IfcWallTypeEnum"], ONT["hasValue"], member))
+        g.add((member, ONT["name"], Literal(value)))
+    add_named(INST["IfcSizeSelect"], ONT["Select"])
+    g.add((INST["IfcSizeSelect"], ONT["hasValue"], INST["IfcPositiveLengthMeasure"]))
+    g.add((INST["IfcSizeSelect"], ONT["hasValue"], INST["IfcWallTypeEnum"]))
+    # 模式根节点 > 概念层 > 概念组；缺少名称或定义的层与组不列出
+    g.add((INST["IFC4X3"], RDF.type, ONT["IfcSchema"]))
+    g.add((INST["CoreLayer"], RDF.type, ONT["Layer"]))
+    g.add((INST["CoreLayer"], ONT["name"], Literal("Core Layer")))
+    g.add((INST["CoreLayer"], SKOS.inScheme, INST["IFC4X3"]))
+    g.add((INST["UnnamedLayer"], RDF.type, ONT["Layer"]))
+    g.add((INST["UnnamedLayer"], SKOS.inScheme, INST["IFC4X3"]))
+    for group, definitions in ((INST["IfcKernel"], "Kernel definitions."), (INST["IfcDraft"], None)):
+        g.add((group, RDF.type, ONT["Group"]))
+        g.add((group, ONT["name"], Literal(group.fragment)))
+        if definitions is not None:
+            g.add((group, ONT["definitions"], Literal(definitions)))
+        g.add((INST["CoreLayer"], ONT["hasConceptualGroup"], group))
+    return dataset
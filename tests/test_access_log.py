@@ -0,0 +1,46 @@
+import json
+import threading
+
+from ifc_schema_viewer.core import AccessLog
+
+def test_concurrent_saves_do_not_collide_or_lose_records(tmp_path):
+    path = tmp_path / "access_log.json"
+    access_log = AccessLog(path=str(path))
+    errors = []
+    def record_and_save(worker: int):
+        try:
+            for i in range(300):
+                access_log.record(f"http://ex.org/C{worker}_{i % 10}", tab=f"tab{worker}")
+                access_log.save()
+        except Exception as e:
+            errors.append(e)
+    workers = [threading.Thread(target=record_and_save, args=(worker,)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert errors == []
+    # 最后一次保存可能被并发写出跳过，再保存一次后文件应包含全部记录
+    access_log.save()
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert sum(concept["count"] for concept in data["concepts"].values()) == 1200
+    assert data["tabs"] == {f"tab{worker}": 300 for worker in range(4)}
+    assert [p.name for p in tmp_path.iterdir()] == ["access_log.json"]
+
+def test_failed_save_keeps_records_pending(tmp_path):
+    blocker = tmp_path / "outputs"
+    blocker.write_text("not a directory")
+    access_log = AccessLog(path=str(blocker / "access_log.json"))
+    access_log.record("http://ex.org/IfcWall")
+    assert access_log.save() is False
+    access_log.path = str(tmp_path / "access_log.json")
+    assert access_log.save() is True
+
+def test_reload_and_hot_set(tmp_path):
+    path = tmp_path / "access_log.json"
+    access_log = AccessLog(path=str(path), hot_set_size=1)
+    for _ in range(3):
+        access_log.record("http://ex.org/IfcWall", tab="express:Entity")
+    access_log.record("http://ex.org/IfcSlab", tab="express:Entity")
+    access_log.save()
+    assert AccessLog(path=str(path), hot_set_size=1).get_hot_concepts() == ["http://ex.org/IfcWall"]
@@ -0,0 +1,13 @@
+from ifc_schema_viewer.core import AttributeReferences
+from schema_graph import INST, build_dataset
+
+def names(rows, key):
+    return sorted(str(row[key]) for row in rows)
+
+def test_attribute_references_expand_to_inheriting_entities():
+    references = AttributeReferences(rdf_graph=build_dataset())
+    rows = references.get_referencing_entities(INST["IfcLabel"])
+    assert names(rows, "entity") == ["IfcElement", "IfcRoot", "IfcWall", "IfcWallStandardCase"]
+    assert {str(row["attribute"]) for row in rows} == {"Name"}
+    assert references.get_subtree(INST["IfcWall"]) == frozenset({INST["IfcWall"], INST["IfcWallStandardCase"]})
+    assert references.get_referencing_entities(INST["IfcLengthMeasure"]) == []
@@ -0,0 +1,36 @@
+from ifc_schema_viewer.core import SchemaQueryService, CacheWarmer
+from ifc_schema_viewer.core.cache_warmer import WARMUP_INDEXES
+from schema_graph import INST, build_dataset
+
+def test_cache_warmer_builds_indexes_and_hot_concepts():
+    query_service = SchemaQueryService(rdf_graph=build_dataset(), dataset_version="test", cache_dir=None)
+    cache_warmer = CacheWarmer(query_service=query_service, max_workers=2,
+                               hot_concepts=["IfcWall", str(INST["IfcLabel"]), "IfcNoSuchConcept"])
+    cache_warmer.start()
+    # 重复启动不会再次提交任务
+    cache_warmer.start()
+    assert cache_warmer.wait(timeout=60)
+    progress = cache_warmer.get_progress()
+    assert progress["total"] == len(WARMUP_INDEXES) + 3
+    assert progress["completed"] == progress["total"]
+    assert (progress["done"], progress["skipped"], progress["failed"]) == (progress["total"] - 1, 1, 0)
+    assert {task["name"]: task["status"] for task in progress["tasks"]}["concept.IfcNoSuchConcept"] == "skipped"
+    assert all(query_service.is_index_built(name) for name in WARMUP_INDEXES)
+    assert query_service.is_concept_cached(INST["IfcWall"])
+    assert query_service.is_concept_cached(INST["IfcLabel"])
+
+class BrokenQueryService:
+    def __getattr__(self, name):
+        raise RuntimeError(f"{name} unavailable")
+
+    def find_by_name(self, name):
+        return None
+
+def test_cache_warmer_records_failed_tasks():
+    cache_warmer = CacheWarmer(query_service=BrokenQueryService(), max_workers=1, hot_concepts=["IfcWall"])
+    cache_warmer.start()
+    assert cache_warmer.wait(timeout=60)
+    progress = cache_warmer.get_progress()
+    assert progress["failed"] == len(WARMUP_INDEXES)
+    assert progress["skipped"] == 1
+    assert progress["finished"]
@@ -0,0 +1,16 @@
+from rdflib import Literal
+
+from ifc_schema_viewer.core import CollectionMembers
+from schema_graph import ONT, build_dataset
+
+def test_collection_members_are_bucketed_by_express_type():
+    collection_members = CollectionMembers(rdf_graph=build_dataset())
+    entities = collection_members.get_members([ONT["Entity"]])
+    assert list(entities) == sorted(entities, key=str)
+    assert [str(name) for name in entities] == ["IfcElement", "IfcRoot", "IfcWall", "IfcWallStandardCase"]
+    assert entities[Literal("IfcWall")]["express_type"] == "express:Entity"
+    merged = collection_members.get_members([ONT["PropertySetTemplate"], ONT["QuantitySetTemplate"]])
+    assert len(merged) == 3
+    # 合并结果是新字典，不影响共享的分桶
+    merged.clear()
+    assert len(collection_members.buckets[ONT["PropertySetTemplate"]]) == 2
@@ -0,0 +1,43 @@
+import os
+
+import rdflib
+
+from ifc_schema_viewer.core import DatasetProfile, compute_dataset_version
+from ifc_schema_viewer.core.dataset_profile import PROFILE_FILE_PATTERN
+
+EX = rdflib.Namespace("http://ex.org/")
+
+def build_dataset() -> rdflib.Dataset:
+    dataset = rdflib.Dataset()
+    graph = dataset.graph(EX.g)
+    graph.add((EX.a, EX.p, EX.b))
+    graph.add((EX.a, rdflib.RDF.type, EX.C))
+    return dataset
+
+def test_dataset_version_shares_source_key_across_versions(tmp_path):
+    source = tmp_path / "schema.trig"
+    source.write_text("a")
+    first = compute_dataset_version([str(source)])
+    source.write_text("ab")
+    second = compute_dataset_version([str(source)])
+    other = tmp_path / "other.trig"
+    other.write_text("a")
+    assert first != second
+    assert first.split("-")[0] == second.split("-")[0]
+    assert compute_dataset_version([str(other)]).split("-")[0] != first.split("-")[0]
+
+def test_save_cache_only_removes_stale_profiles_of_same_sources(tmp_path):
+    for version in ("aaaa-old", "bbbb-other", "legacyversion"):
+        (tmp_path / (PROFILE_FILE_PATTERN % version)).write_text("{}")
+    profile = DatasetProfile(rdf_graph=build_dataset(), dataset_version="aaaa-new", cache_dir=str(tmp_path))
+    assert not profile.loaded_from_cache
+    assert sorted(os.listdir(tmp_path)) == sorted(PROFILE_FILE_PATTERN % version for version in ("aaaa-new", "bbbb-other", "legacyversion"))
+    cached = DatasetProfile(rdf_graph=build_dataset(), dataset_version="aaaa-new", cache_dir=str(tmp_path))
+    assert cached.loaded_from_cache
+    assert cached.graphs == profile.graphs
+
+def test_save_cache_failure_is_not_fatal(tmp_path):
+    blocker = tmp_path / "outputs"
+    blocker.write_text("not a directory")
+    profile = DatasetProfile(rdf_graph=build_dataset(), dataset_version="aaaa-new", cache_dir=str(blocker))
+    assert profile.graphs
@@ -0,0 +1,20 @@
+from ifc_schema_viewer.core import DatatypeUsages
+from schema_graph import INST, build_dataset
+
+def test_usages_list_pset_templates_and_properties_per_datatype():
+    usages = DatatypeUsages(rdf_graph=build_dataset())
+    rows = usages.get_usages(INST["IfcPositiveLengthMeasure"])
+    assert [(str(row["Property Set"]), str(row["Property"]), row["express type"]) for row in rows] == [
+        ("Pset_WallCommon", "Width", "express:PropertySetTemplate"),
+        ("Qto_WallBaseQuantities", "Length", "express:QuantitySetTemplate"),
+    ]
+    assert rows[1]["pset template iri"] == INST["Qto_WallBaseQuantities"]
+    assert rows[1]["property iri"] == INST["Qto_WallBaseQuantities_Length"]
+
+def test_shared_property_templates_are_listed_once_per_pset():
+    usages = DatatypeUsages(rdf_graph=build_dataset())
+    rows = usages.get_usages(str(INST["IfcLabel"]))
+    # 未命名的属性模板不列出
+    assert [(str(row["Property Set"]), str(row["Property"])) for row in rows] == [
+        ("Pset_ElementCommon", "Reference"), ("Pset_WallCommon", "Reference")]
+    assert usages.get_usages(INST["IfcCoords"]) == []
@@ -0,0 +1,26 @@
+from rdflib import Literal
+
+from ifc_schema_viewer.core import DerivedTypeChains
+from schema_graph import ONT, INST, build_dataset
+
+def test_chains_resolve_to_the_base_type():
+    chains = DerivedTypeChains(rdf_graph=build_dataset())
+    assert chains.resolve(INST["IfcPositiveLengthMeasure"]) == {
+        "derived_from": "IfcLengthMeasure",
+        "cardinality": None,
+        "base_type": "REAL",
+        "chain": ["IfcPositiveLengthMeasure", "IfcLengthMeasure", "REAL"],
+    }
+    assert chains.resolve(str(INST["IfcCoords"]))["cardinality"] == Literal("LIST [2:3] OF REAL")
+    assert chains.get_base_type(INST["IfcLabel"]) == "STRING"
+    assert chains.resolve(INST["IfcWall"]) is None
+    assert chains.get_base_type(INST["IfcWall"]) is None
+
+def test_cyclic_derivations_terminate():
+    dataset = build_dataset()
+    g = dataset.graph(INST["IFC_SCHEMA_GRAPH"])
+    g.add((INST["IfcLoopA"], ONT["derivedFrom"], INST["IfcLoopB"]))
+    g.add((INST["IfcLoopB"], ONT["derivedFrom"], INST["IfcLoopA"]))
+    chains = DerivedTypeChains(rdf_graph=dataset)
+    assert chains.resolve(INST["IfcLoopA"])["chain"][:2] == ["IfcLoopA", "IfcLoopB"]
+    assert chains.resolve(INST["IfcLoopB"])["base_type"] in ("IfcLoopA", "IfcLoopB")
@@ -0,0 +1,89 @@
+import json
+import asyncio
+
+import tornado.httpserver
+from tornado.httpclient import AsyncHTTPClient
+from tornado.testing import bind_unused_port
+
+from ifc_schema_viewer.core import SchemaQueryService
+from ifc_schema_viewer.service.server import SchemaHttpService
+from schema_graph import INST, build_dataset
+
+def make_service() -> SchemaHttpService:
+    service = SchemaHttpService(workers=2)
+    service.load(SchemaQueryService(rdf_graph=build_dataset(), dataset_version="test", cache_dir=None))
+    return service
+
+def call(service, requests):
+    """在临时端口上启动服务，依次发送 (method, path, body) 请求，返回 (状态码, JSON) 列表"""
+    async def run():
+        sock, port = bind_unused_port()
+        server = tornado.httpserver.HTTPServer(service.make_app())
+        server.add_sockets([sock])
+        client = AsyncHTTPClient()
+        responses = []
+        try:
+            for method, path, body in requests:
+                response = await client.fetch(f"http://127.0.0.1:{port}{path}", method=method, raise_error=False,
+                                              body=body if method == "POST" else None)
+                responses.append((response.code, json.loads(response.body)))
+        finally:
+            server.stop()
+        return responses
+    return asyncio.run(run())
+
+def test_concept_and_batch_queries():
+    service = make_service()
+    batch = json.dumps({"requests": [
+        {"path": "/concept", "params": {"name": "IfcWall"}},
+        {"path": "/psets", "params": {"name": "IfcWallStandardCase"}},
+        {"path": "/concept", "params": {"name": "IfcNoSuchConcept"}},
+    ]})
+    (concept_status, concept), (batch_status, batch_body) = call(service, [
+        ("GET", "/concept?name=IfcWall", None),
+        ("POST", "/batch", batch),
+    ])
+    assert concept_status == 200
+    assert concept["iri"] == str(INST["IfcWall"])
+    assert [entity["name"] for entity in concept["super_entities"]] == ["IfcElement", "IfcRoot"]
+    assert batch_status == 200
+    statuses = [response["status"] for response in batch_body["responses"]]
+    assert statuses == [200, 200, 404]
+    assert sorted(pset["name"] for pset in batch_body["responses"][1]["body"]["psets"]) == [
+        "Pset_ElementCommon", "Pset_WallCommon", "Qto_WallBaseQuantities"]
+    # 第一个子请求与前面的 GET 参数相同，命中响应缓存
+    assert service.get_stats()["cache_hits"] == 1
+
+def test_non_object_bodies_are_rejected_with_json_errors():
+    service = make_service()
+    responses = call(service, [
+        ("POST", "/concept", "[1, 2]"),
+        ("POST", "/batch", "[1]"),
+        ("POST", "/batch", json.dumps({"requests": "IfcWall"})),
+        ("POST", "/sparql", "{not json"),
+    ])
+    assert [status for status, _ in responses] == [400, 400, 400, 400]
+    assert all("error" in body for _, body in responses)
+
+def test_batch_items_fail_independently(monkeypatch):
+    service = make_service()
+    def broken_get_concept(self, iri, express_type=None):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(SchemaQueryService, "get_concept", broken_get_concept)
+    batch = json.dumps({"requests": [
+        "IfcWall",
+        {"path": "/psets", "params": ["IfcWall"]},
+        {"path": "/concept", "params": {"name": "IfcWall"}},
+        {"path": "/psets", "params": {"name": "IfcWall"}},
+    ]})
+    [(status, body), (concept_status, concept_body)] = call(service, [
+        ("POST", "/batch", batch),
+        ("GET", "/concept?name=IfcWall", None),
+    ])
+    assert status == 200
+    assert [response["status"] for response in body["responses"]] == [400, 400, 500, 200]
+    assert "boom" in body["responses"][2]["body"]["error"]
+    # 单个查询的意外错误同样返回 JSON
+    assert concept_status == 500
+    assert "error" in concept_body
+    assert service.get_stats()["errors"] == 4
@@ -0,0 +1,50 @@
+import json
+import threading
+
+from ifc_schema_viewer.utils import MetricsRegistry, Histogram
+
+def run_concurrently(target, threads: int = 4):
+    errors = []
+    def guarded():
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+    workers = [threading.Thread(target=guarded) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return errors
+
+def test_concurrent_metrics_saves_do_not_collide(tmp_path):
+    registry = MetricsRegistry()
+    path = tmp_path / "metrics.json"
+    def save():
+        for i in range(300):
+            registry.observe("render", 0.001 * i)
+            registry.save_json(str(path))
+    assert run_concurrently(save) == []
+    assert "render" in json.loads(path.read_text(encoding="utf-8"))["histograms"]
+    assert [p.name for p in tmp_path.iterdir()] == ["metrics.json"]
+
+def test_unwritable_metrics_path_is_reported_not_raised(tmp_path):
+    blocker = tmp_path / "outputs"
+    blocker.write_text("not a directory")
+    assert MetricsRegistry().save_json(str(blocker / "metrics.json")) is False
+
+def test_histogram_percentile_during_concurrent_observe():
+    histogram = Histogram("query", reservoir_size=64)
+    stop = threading.Event()
+    def observe():
+        while not stop.is_set():
+            histogram.observe(0.01)
+    writer = threading.Thread(target=observe)
+    writer.start()
+    try:
+        for _ in range(2000):
+            histogram.percentile(99)
+            histogram.summary()
+    finally:
+        stop.set()
+        writer.join()
@@ -0,0 +1,23 @@
+from rdflib import Literal
+
+from ifc_schema_viewer.core import OntologyMetadata
+from schema_graph import INST, build_dataset
+
+def test_express_types_are_schematic_concept_subclasses_in_the_express_namespace():
+    metadata = OntologyMetadata(rdf_graph=build_dataset())
+    assert metadata.express_types == [
+        "DerivedType", "Entity", "Enum", "PropertySetTemplate", "QuantitySetTemplate", "Select", "Type"]
+
+def test_instance_counts_by_express_type():
+    metadata = OntologyMetadata(rdf_graph=build_dataset())
+    assert metadata.get_instance_count("Entity") == 4
+    assert metadata.get_instance_count("PropertySetTemplate") == 2
+    assert metadata.get_instance_count("DerivedType") == 4
+    assert metadata.get_instance_count("Group") == 2
+    assert metadata.get_instance_count("Unknown") == 0
+
+def test_layers_and_conceptual_groups():
+    metadata = OntologyMetadata(rdf_graph=build_dataset())
+    assert metadata.data_schemas == {INST["IFC4X3"]: {Literal("Core Layer"): INST["CoreLayer"]}}
+    assert metadata.conceptual_groups[INST["CoreLayer"]] == {
+        Literal("IfcKernel"): {"iri": INST["IfcKernel"], "definitions": Literal("Kernel definitions.")}}
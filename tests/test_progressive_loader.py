@@ -0,0 +1,60 @@
+import rdflib
+from rdflib import Dataset, BNode
+
+from ifc_schema_viewer.core import ProgressiveSchemaLoader
+import ifc_schema_viewer.core.progressive_loader as progressive_loader
+from ifc_schema_viewer.core.progressive_loader import split_trig, shares_bnode_labels
+
+IRI_NAMED_GRAPHS = """@prefix ex: <http://ex.org/> .
+ex:o a ex:Ontology .
+# comment before <http://ex.org/not-a-graph> .
+<http://ex.org/g1> { ex:a ex:p "x" . }
+GRAPH <http://ex.org/g2#part> { ex:b ex:p "y. {z}" . }
+ex:g3 { ex:c ex:p <http://ex.org/v.1> . }
+"""
+
+SHARED_BNODES = """@prefix ex: <http://ex.org/> .
+ex:g1 { _:b0 ex:p "1" . }
+ex:g2 { _:b0 ex:q "2" . }
+"""
+
+def load(tmp_path, text):
+    path = tmp_path / "schema.trig"
+    path.write_text(text, encoding="utf-8")
+    loader = ProgressiveSchemaLoader(schema_path=str(path), ontology_paths=[])
+    loader.start()
+    assert loader.wait(timeout=60), loader.error
+    return loader
+
+def quads(dataset):
+    return {(s, p, o, c.identifier if isinstance(c, rdflib.Graph) else c) for s, p, o, c in dataset.quads()}
+
+def test_split_trig_finds_iri_graph_names():
+    directives, default_text, graphs = split_trig(IRI_NAMED_GRAPHS)
+    assert [name for name, _ in graphs] == ["<http://ex.org/g1>", "<http://ex.org/g2#part>", "ex:g3"]
+    assert "ex:o a ex:Ontology" in default_text
+    assert "@prefix ex:" in directives
+
+def test_iri_named_graphs_load_like_a_whole_file_parse(tmp_path):
+    loader = load(tmp_path, IRI_NAMED_GRAPHS)
+    expected = Dataset()
+    expected.parse(data=IRI_NAMED_GRAPHS, format="trig")
+    assert quads(loader.result.dataset) == quads(expected)
+    assert loader.get_progress()["graphs_done"] == 3
+
+def test_shared_bnode_labels_are_parsed_as_a_whole(tmp_path):
+    assert shares_bnode_labels([body for _, body in split_trig(SHARED_BNODES)[2]])
+    loader = load(tmp_path, SHARED_BNODES)
+    subjects = {s for s, _, _, _ in loader.result.dataset.quads() if isinstance(s, BNode)}
+    assert len(subjects) == 1
+
+def test_failed_block_parse_falls_back_to_whole_file(tmp_path, monkeypatch):
+    # 模拟拆分结果与 rdflib 语法理解不一致：图内文本被截断
+    split = split_trig
+    monkeypatch.setattr(progressive_loader, "split_trig",
+                        lambda text: (lambda blocks: (blocks[0], blocks[1], [(name, body[:-4]) for name, body in blocks[2]]))(split(text)))
+    loader = load(tmp_path, IRI_NAMED_GRAPHS)
+    expected = Dataset()
+    expected.parse(data=IRI_NAMED_GRAPHS, format="trig")
+    assert loader.ready
+    assert quads(loader.result.dataset) == quads(expected)
@@ -0,0 +1,17 @@
+from rdflib import Literal
+
+from ifc_schema_viewer.core import PsetApplicability
+from schema_graph import INST, build_dataset
+
+def names(rows, key):
+    return sorted(str(row[key]) for row in rows)
+
+def test_pset_applicability_follows_inheritance_both_ways():
+    applicability = PsetApplicability(rdf_graph=build_dataset())
+    assert names(applicability.get_inherited_psets(INST["IfcWallStandardCase"]), "name") == [
+        "Pset_ElementCommon", "Pset_WallCommon", "Qto_WallBaseQuantities"]
+    assert names(applicability.get_inherited_psets(INST["IfcRoot"]), "name") == []
+    assert names(applicability.get_subtree_psets(INST["IfcRoot"]), "name") == [
+        "Pset_ElementCommon", "Pset_WallCommon", "Qto_WallBaseQuantities"]
+    assert list(applicability.get_psets_by_entities([INST["IfcElement"]], include_subtypes=False)) == [Literal("Pset_ElementCommon")]
+    assert len(applicability.get_psets_by_entities([INST["IfcElement"], INST["IfcWall"]])) == 3
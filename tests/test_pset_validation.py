@@ -0,0 +1,30 @@
+import pandas as pd
+
+from ifc_schema_viewer.core import PsetBatchValidator, SchemaValidators
+from schema_graph import build_dataset
+
+def test_pset_batch_validator_reports_violations_per_row():
+    validators = SchemaValidators(rdf_graph=build_dataset())
+    validator = PsetBatchValidator(pset_name="Pset_WallCommon", prop_specs=[
+        {"name": "Width", "kind": "derived", "base_type": "REAL", "cardinality": None},
+        {"name": "Coords", "kind": "derived", "base_type": "REAL", "cardinality": "LIST [2:3]"},
+        {"name": "Status", "kind": "enum", "values": ["NEW", "EXISTING"]},
+        {"name": "Host", "kind": "reference"},
+        {"name": "Size", "kind": "derived", "validator": validators.get_by_name("IfcSizeSelect")},
+    ])
+    df = pd.DataFrame({
+        "Width": ["0.2", "wide", None],
+        "Coords": ["[1, 2]", "[1]", ""],
+        "Status": ["NEW", "NEW", "OLD"],
+        "Host": ["3", "0", "2.5"],
+        "Size": ["SOLIDWALL", "1.0", "big"],
+        "Comment": ["a", "b", "c"],
+    })
+    report = validator.validate(df)
+    violations = report["violations"]
+    assert report["rows"] == 3
+    assert report["invalid_rows"] == 2
+    assert report["unknown_columns"] == ["Comment"]
+    assert violations.loc[violations["row"] == 1, "property"].tolist() == ["Coords", "Host", "Width"]
+    # 空值视为未填写，不计为违规
+    assert violations.loc[violations["row"] == 2, "property"].tolist() == ["Host", "Size", "Status"]
@@ -0,0 +1,76 @@
+import rdflib
+from rdflib import Dataset, Namespace
+from rdflib.paths import Path
+
+from ifc_schema_viewer.core import DatasetProfile, QueryOptimizer
+
+EX = Namespace("http://example.org/")
+PREFIXES = "PREFIX ex: <http://example.org/>\n"
+
+def make_optimizer():
+    dataset = Dataset()
+    graph = dataset.graph(EX.schema)
+    # 一条 20 层的继承链，每个类各有 5 个属性，只有 1 个属性的值域为 ex:Label
+    classes = [EX[f"C{i}"] for i in range(20)]
+    for parent, child in zip(classes, classes[1:]):
+        graph.add((parent, EX.superClassOf, child))
+    for i, clss in enumerate(classes):
+        for j in range(5):
+            attribute = EX[f"a{i}_{j}"]
+            graph.add((clss, EX.hasAttribute, attribute))
+            graph.add((attribute, EX.attrRange, EX.Label if (i, j) == (19, 0) else EX[f"T{j}"]))
+            graph.add((attribute, EX.name, rdflib.Literal(f"a{i}_{j}")))
+        graph.add((clss, EX.name, rdflib.Literal(f"C{i}")))
+    profile = DatasetProfile(rdf_graph=dataset, dataset_version="test", cache_dir=None)
+    return dataset, QueryOptimizer(dataset_profile=profile)
+
+def test_path_predicate_is_ordered_after_patterns_binding_its_endpoints():
+    dataset, optimizer = make_optimizer()
+    query = PREFIXES + """SELECT ?clss ?super WHERE {
+        ?super ex:superClassOf* ?clss .
+        ?clss ex:hasAttribute ?attribute .
+        ?attribute ex:attrRange ex:Label .
+    }"""
+    _, plans = optimizer.optimize(query)
+    ordered, estimates = plans[0]["ordered"], plans[0]["estimates"]
+    assert ordered[0][1] == EX.attrRange
+    assert isinstance(ordered[-1][1], Path)
+    assert all(estimate > 0 for estimate in estimates)
+
+def test_path_predicate_runs_from_its_first_bound_endpoint():
+    dataset, optimizer = make_optimizer()
+    query = PREFIXES + """SELECT ?name WHERE {
+        ?attribute ex:attrRange ex:Label .
+        ?clss ex:hasAttribute ?attribute .
+        ?clss ex:superClassOf* ?sub .
+        ?sub ex:name ?name .
+    }"""
+    _, plans = optimizer.optimize(query)
+    # ?sub ex:name ?name 单独执行需扫描全部名称，应在路径绑定 ?sub 之后
+    assert [pattern[1] for pattern in plans[0]["ordered"]][:2] == [EX.attrRange, EX.hasAttribute]
+    assert isinstance(plans[0]["ordered"][2][1], Path)
+
+def test_unknown_predicate_is_not_estimated_as_empty():
+    dataset, optimizer = make_optimizer()
+    _, plans = optimizer.optimize(PREFIXES + "SELECT * WHERE { ?s ex:missing ?o . ?s ex:hasAttribute ?a . }")
+    ordered, estimates = plans[0]["ordered"], plans[0]["estimates"]
+    assert ordered[0][1] == EX.hasAttribute
+    assert all(estimate >= 1.0 for estimate in estimates)
+
+def test_reordered_query_returns_the_same_rows():
+    dataset, optimizer = make_optimizer()
+    query_str = PREFIXES + """SELECT ?clss ?super WHERE {
+        ?super ex:superClassOf* ?clss .
+        ?clss ex:hasAttribute ?attribute .
+        ?attribute ex:attrRange ex:Label .
+    }"""
+    query, _ = optimizer.optimize(query_str)
+    graph = dataset.graph(EX.schema)
+    expected = {tuple(row) for row in graph.query(query_str)}
+    assert {tuple(row) for row in graph.query(query)} == expected
+    assert len(expected) == 20
+
+def test_explain_labels_the_written_position():
+    dataset, optimizer = make_optimizer()
+    plan = optimizer.explain(dataset.graph(EX.schema), PREFIXES + "SELECT * WHERE { ?s ex:hasAttribute ?a . ?a ex:attrRange ex:Label . }")
+    assert list(plan["WrittenPosition"]) == [2, 1]
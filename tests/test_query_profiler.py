@@ -0,0 +1,43 @@
+import threading
+import tracemalloc
+
+from rdflib.plugins.sparql import CUSTOM_EVALS
+
+from ifc_schema_viewer.core import profile_query
+from ifc_schema_viewer.core.query_profiler import PROFILER_EVAL_KEY
+
+from test_query_optimizer import make_optimizer, PREFIXES, EX
+
+QUERY = PREFIXES + """SELECT ?clss ?attribute WHERE {
+    ?clss ex:hasAttribute ?attribute .
+    ?attribute ex:attrRange ex:Label .
+}"""
+
+def test_profiler_hook_is_registered_once_before_other_custom_evals():
+    keys = list(CUSTOM_EVALS)
+    assert keys[0] == PROFILER_EVAL_KEY
+    assert keys.count(PROFILER_EVAL_KEY) == 1
+
+def test_optimized_bgp_is_profiled():
+    dataset, optimizer = make_optimizer()
+    query_profile = profile_query(dataset.graph(EX.schema), QUERY, optimizer=optimizer)
+    assert len(query_profile.result) == 1
+    bgp = next(operator for operator in query_profile.operators if operator["Operator"].strip() == "BGP")
+    assert bgp["Calls"] == 1 and bgp["Rows"] == 1
+
+def test_concurrent_profiles_are_serialized():
+    dataset, optimizer = make_optimizer()
+    results, errors = [], []
+    def run():
+        try:
+            results.append(profile_query(dataset.graph(EX.schema), QUERY, optimizer=optimizer))
+        except Exception as e:
+            errors.append(e)
+    workers = [threading.Thread(target=run) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert errors == []
+    assert all(len(query_profile.result) == 1 and query_profile.peak_memory for query_profile in results)
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,87 @@
+import time
+import threading
+
+import pytest
+
+from ifc_schema_viewer.core import QueryScheduler, INTERACTIVE, ADHOC
+from ifc_schema_viewer.core.query_scheduler import QueryQueueTimeout
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+class BlockingQuery:
+    """在后台线程中经调度器执行，直到 release 才结束"""
+    def __init__(self, scheduler, priority, session_id, log=None):
+        self.started, self.released = threading.Event(), threading.Event()
+        self.log = log
+        def func():
+            self.started.set()
+            if self.log is not None:
+                self.log.append((priority, session_id))
+            assert self.released.wait(timeout=10)
+        self.thread = threading.Thread(target=scheduler.run, args=(func, priority, session_id))
+        self.thread.start()
+
+    def release(self):
+        self.released.set()
+        self.thread.join(timeout=10)
+
+def test_interactive_queries_run_before_earlier_adhoc_queries():
+    scheduler = QueryScheduler(max_concurrency=1, reserved_interactive=0)
+    log = []
+    blocker = BlockingQuery(scheduler, INTERACTIVE, "a")
+    assert blocker.started.wait(timeout=10)
+    adhoc = BlockingQuery(scheduler, ADHOC, "b", log)
+    wait_until(lambda: scheduler.get_queue_depth()[ADHOC] == 1)
+    interactive = BlockingQuery(scheduler, INTERACTIVE, "c", log)
+    wait_until(lambda: scheduler.get_queue_depth()[INTERACTIVE] == 1)
+    blocker.release()
+    interactive.release()
+    adhoc.release()
+    assert log == [(INTERACTIVE, "c"), (ADHOC, "b")]
+
+def test_adhoc_queries_never_take_the_reserved_slots():
+    scheduler = QueryScheduler(max_concurrency=2, reserved_interactive=1, session_limits={INTERACTIVE: 4, ADHOC: 4})
+    first = BlockingQuery(scheduler, ADHOC, "a")
+    assert first.started.wait(timeout=10)
+    second = BlockingQuery(scheduler, ADHOC, "b")
+    wait_until(lambda: scheduler.get_queue_depth()[ADHOC] == 1)
+    # 保留的槽位仍可执行页面浏览的查找
+    assert scheduler.run(lambda: "concept", INTERACTIVE, "c") == "concept"
+    assert not second.started.is_set()
+    first.release()
+    assert second.started.wait(timeout=10)
+    second.release()
+    assert scheduler.get_metrics()[ADHOC]["completed"] == 2
+
+def test_session_limits_do_not_block_other_sessions():
+    scheduler = QueryScheduler(max_concurrency=4, reserved_interactive=0, session_limits={INTERACTIVE: 4, ADHOC: 1})
+    first = BlockingQuery(scheduler, ADHOC, "a")
+    assert first.started.wait(timeout=10)
+    same_session = BlockingQuery(scheduler, ADHOC, "a")
+    wait_until(lambda: scheduler.get_queue_depth()[ADHOC] == 1)
+    assert scheduler.run(lambda: "other", ADHOC, "b") == "other"
+    assert not same_session.started.is_set()
+    first.release()
+    assert same_session.started.wait(timeout=10)
+    same_session.release()
+
+def test_queued_query_times_out():
+    scheduler = QueryScheduler(max_concurrency=1, reserved_interactive=0, queue_timeout=0.2)
+    blocker = BlockingQuery(scheduler, INTERACTIVE, "a")
+    assert blocker.started.wait(timeout=10)
+    with pytest.raises(QueryQueueTimeout):
+        scheduler.run(lambda: None, ADHOC, "b")
+    blocker.release()
+    metrics = scheduler.get_metrics()
+    assert metrics[ADHOC]["timeouts"] == 1
+    assert metrics[ADHOC]["queue_depth"] == 0
+    assert scheduler.run(lambda: "after", ADHOC, "b") == "after"
+
+def test_nested_queries_run_directly():
+    scheduler = QueryScheduler(max_concurrency=1, reserved_interactive=0, queue_timeout=1)
+    assert scheduler.run(lambda: scheduler.run(lambda: "inner", INTERACTIVE, "a"), INTERACTIVE, "a") == "inner"
+    assert scheduler.get_metrics()[INTERACTIVE]["completed"] == 1
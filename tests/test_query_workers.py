@@ -0,0 +1,82 @@
+import os
+import time
+import signal
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from ifc_schema_viewer.core import SchemaQueryService, QueryWorkerPool
+import ifc_schema_viewer.core.sparql_parser as sparql_parser
+from schema_graph import ONT, INST, build_dataset
+
+ENTITY_QUERY = f"SELECT ?entity WHERE {{ ?entity a <{ONT['Entity']}> }}"
+
+@pytest.fixture(scope="module")
+def worker_pool(tmp_path_factory):
+    query_service = SchemaQueryService(rdf_graph=build_dataset(), dataset_version="test", cache_dir=None)
+    worker_pool = QueryWorkerPool(workers=1, snapshot_path=str(tmp_path_factory.mktemp("workers") / "snapshot.pkl"))
+    # 其他线程持有解析锁时启动：子进程不能继承这把锁，否则其中的查询永久阻塞
+    release = threading.Event()
+    def hold_parse_lock():
+        with sparql_parser._parse_lock:
+            release.wait(timeout=60)
+    holder = threading.Thread(target=hold_parse_lock)
+    holder.start()
+    try:
+        worker_pool.start(query_service)
+    finally:
+        release.set()
+        holder.join()
+    yield worker_pool
+    worker_pool.shutdown()
+
+def wait_for_restarts(worker_pool, restarts, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not (worker_pool.restarts >= restarts and worker_pool.is_running):
+        assert time.monotonic() < deadline, "query worker processes were not restarted"
+        time.sleep(0.1)
+
+def test_workers_do_not_inherit_parse_lock(worker_pool):
+    assert worker_pool.start_method in ("forkserver", "spawn")
+    with sparql_parser._parse_lock:
+        df = worker_pool.run_sparql(ENTITY_QUERY, timeout=15, optimize=True)
+    assert sorted(str(iri) for iri in df["entity"]) == sorted(
+        str(INST[name]) for name in ("IfcRoot", "IfcElement", "IfcWall", "IfcWallStandardCase"))
+
+def test_worker_concepts_are_detached(worker_pool):
+    concept = worker_pool.get_concept(INST["IfcWall"], timeout=15)
+    assert concept.label == "IfcWall"
+    assert concept.rdf_graph is None
+
+def test_broken_pool_is_restarted(worker_pool):
+    restarts = worker_pool.restarts
+    pid = worker_pool._interactive.submit(os.getpid).result(timeout=15)
+    os.kill(pid, signal.SIGKILL)
+    with pytest.raises(BrokenProcessPool):
+        # 管理线程发现子进程退出之前提交的任务可能仍被接受，最终同样以 BrokenProcessPool 失败
+        for _ in range(100):
+            worker_pool.get_concept(INST["IfcWall"], timeout=15)
+            time.sleep(0.1)
+    wait_for_restarts(worker_pool, restarts + 1)
+    assert worker_pool.get_concept(INST["IfcWall"], timeout=15).label == "IfcWall"
+
+class FailingWorkerPool:
+    def __init__(self, error):
+        self.error = error
+        self.calls = []
+
+    def get_concept(self, iri, express_type=None, timeout=None):
+        self.calls.append(timeout)
+        raise self.error
+
+@pytest.mark.parametrize("error", [FutureTimeoutError(), BrokenProcessPool("worker died")])
+def test_service_builds_concept_in_process_when_workers_fail(error):
+    query_service = SchemaQueryService(rdf_graph=build_dataset(), dataset_version="test", cache_dir=None, worker_timeout=5)
+    failing_pool = FailingWorkerPool(error)
+    query_service.attach_worker_pool(failing_pool)
+    concept = query_service.get_concept(INST["IfcWall"])
+    assert concept.label == "IfcWall"
+    assert concept.rdf_graph is not None
+    assert failing_pool.calls == [5]
@@ -0,0 +1,17 @@
+import pandas as pd
+
+from ifc_schema_viewer.core import SchemaValidators
+from schema_graph import build_dataset
+
+def test_schema_validators_scalar_and_vector_agree():
+    validators = SchemaValidators(rdf_graph=build_dataset())
+    cases = {
+        "IfcPositiveLengthMeasure": (["1.5", "2", "abc", "1e3"], [True, True, False, True]),
+        "IfcCoords": (["[1, 2]", "1;2;3", "[1]", "[1, x]"], [True, True, False, False]),
+        "IfcWallTypeEnum": ([".solidwall.", "NOTDEFINED", "CURTAIN"], [True, True, False]),
+        "IfcSizeSelect": (["2.0", ".NOTDEFINED.", "foo"], [True, True, False]),
+    }
+    for type_name, (values, expected) in cases.items():
+        assert [validators.validate(type_name, value) for value in values] == expected, type_name
+        assert validators.validate(type_name, pd.Series(values)).tolist() == expected, type_name
+    assert validators.get_by_name("IfcLabel")("anything")
@@ -0,0 +1,40 @@
+import rdflib
+
+from pydantic import BaseModel, PrivateAttr
+from typing import Any
+
+from ifc_schema_viewer.core import Concept
+from ifc_schema_viewer.apps.sessions import estimate_object_size, SessionRegistry
+
+class FakeConceptInfo(BaseModel):
+    # 与界面层的 ConceptInfo 一样：引用共享的 Concept，另持有会话自己的展示数据
+    concept: Any
+    _rows: list = PrivateAttr(default_factory=lambda: ["row %d" % i for i in range(100)])
+
+def make_shared_concept() -> Concept:
+    concept = Concept(iri="http://ex.org/IfcWall", rdf_graph=rdflib.Graph())
+    concept._definitions = "x" * 1_000_000
+    return concept
+
+def test_size_estimate_excludes_shared_concepts():
+    concept_info = FakeConceptInfo(concept=make_shared_concept())
+    size = estimate_object_size({"http://ex.org/IfcWall": concept_info})
+    assert 0 < size < 100_000
+    assert size >= estimate_object_size(concept_info._rows)
+
+def test_eviction_is_applied_by_the_owning_session():
+    registry = SessionRegistry(memory_budget_mb=0.001, idle_eviction_seconds=0.0)
+    idle_state = {"cached_concept_info": {"http://ex.org/IfcWall": 1, "http://ex.org/IfcSlab": 2}, "entities": [1, 2, 3]}
+    registry.touch("idle", 0.1, {"cached_concept_info": 10_000, "entities": 5_000})
+    registry.touch("current", 0.1, {})
+
+    evicted = registry.enforce_budget(current_session_id="current", keep_concepts={"http://ex.org/IfcWall"})
+    assert evicted == [{"session_id": "idle", "freed_bytes": 15_000}]
+    # 只做标记，其他会话的状态不被改动；重复检查不会重复标记
+    assert "entities" in idle_state and len(idle_state["cached_concept_info"]) == 2
+    assert registry.enforce_budget(current_session_id="current") == []
+
+    assert registry.apply_pending_eviction("idle", idle_state) > 0
+    assert "entities" not in idle_state
+    assert list(idle_state["cached_concept_info"]) == ["http://ex.org/IfcWall"]
+    assert registry.apply_pending_eviction("idle", idle_state) == 0
@@ -0,0 +1,51 @@
+import sys
+import subprocess
+import threading
+import multiprocessing
+
+import rdflib
+import rdflib.plugins.sparql.parser as rdflib_parser
+import rdflib.plugins.sparql.processor as rdflib_processor
+
+import ifc_schema_viewer.core.sparql_parser as sparql_parser
+from ifc_schema_viewer.core import parse_query, install_parse_lock
+
+QUERY = "SELECT ?s WHERE { ?s ?p ?o }"
+
+def test_importing_core_leaves_rdflib_unpatched():
+    # 在新进程中检查，本进程中其他测试可能已调用 install_parse_lock
+    code = ("import ifc_schema_viewer.core, rdflib.plugins.sparql.parser as parser, rdflib.plugins.sparql.processor as processor;"
+            "assert processor.parseQuery is parser.parseQuery")
+    subprocess.run([sys.executable, "-c", code], check=True, timeout=120)
+
+def test_install_parse_lock_routes_graph_queries_through_the_lock():
+    install_parse_lock()
+    install_parse_lock()
+    assert rdflib_processor.parseQuery is parse_query
+    assert rdflib_parser.parseQuery is not parse_query
+    graph = rdflib.Graph()
+    graph.add((rdflib.URIRef("http://ex.org/a"), rdflib.URIRef("http://ex.org/p"), rdflib.Literal(1)))
+    assert len(graph.query(QUERY)) == 1
+
+def _parse_in_child():
+    parse_query(QUERY)
+
+def test_forked_child_does_not_inherit_held_parse_lock():
+    locked, release = threading.Event(), threading.Event()
+    def hold_parse_lock():
+        with sparql_parser._parse_lock:
+            locked.set()
+            release.wait(timeout=60)
+    holder = threading.Thread(target=hold_parse_lock)
+    holder.start()
+    try:
+        assert locked.wait(timeout=15)
+        process = multiprocessing.get_context("fork").Process(target=_parse_in_child)
+        process.start()
+        process.join(timeout=30)
+        if process.is_alive():
+            process.kill()
+        assert process.exitcode == 0
+    finally:
+        release.set()
+        holder.join()
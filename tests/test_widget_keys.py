@@ -0,0 +1,34 @@
+from streamlit.testing.v1 import AppTest
+
+def widget_key_app():
+    import streamlit as st
+    from ifc_schema_viewer.apps.widget_keys import (
+        allocate_widget_key, widget_key_fragment, widget_key_scope, begin_widget_key_run, get_widget_key_stats)
+
+    @widget_key_fragment
+    def concept_fragment():
+        with widget_key_scope("fragment"):
+            st.checkbox("first", key=allocate_widget_key("x"))
+            st.checkbox("second", key=allocate_widget_key("x"))
+
+    # fragment_only 模拟 fragment 单独重新运行：页面其余部分不执行，上一次运行的控件键仍然登记着
+    if not st.session_state.get("fragment_only", False):
+        begin_widget_key_run()
+        st.checkbox("main", key=allocate_widget_key("x"))
+        st.checkbox("main again", key=allocate_widget_key("x"))
+    concept_fragment()
+    st.session_state.stats = dict(get_widget_key_stats())
+
+def test_keys_are_stable_across_full_and_fragment_reruns():
+    at = AppTest.from_function(widget_key_app).run()
+    assert not at.exception
+    assert [checkbox.key for checkbox in at.checkbox] == ["x", "x#2", "fragment/x", "fragment/x#2"]
+    at.checkbox(key="fragment/x#2").check().run()
+    assert at.checkbox(key="fragment/x#2").value
+    at.session_state.fragment_only = True
+    at.run()
+    assert not at.exception
+    assert [checkbox.key for checkbox in at.checkbox] == ["fragment/x", "fragment/x#2"]
+    assert at.checkbox(key="fragment/x#2").value
+    # 每次运行中各有两个键追加了序号（fragment 单独运行时只有它自己的一个）
+    assert at.session_state.stats == {"allocated": 10, "suffixed": 5}